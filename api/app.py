@@ -2,7 +2,10 @@ import os
 import sys
 import uuid
 import io
+import json
 import sqlite3
+import socket
+import zipfile
 import time
 import threading
 import argparse
@@ -13,19 +16,44 @@ BASE_PATH = os.path.dirname(os.path.abspath(__file__))
 sys.path.append(BASE_PATH)
 
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS, cross_origin
 from PIL import Image
 
 from src.utils import (
     load_json_file,
+    save_json_file,
+    validate_image_header,
+    decode_image,
     check_directory_path_existence,
     generate_time_stamp,
 )
+from src.admission_controller import AdmissionController
+from src.batcher import SubmissionBatcher
+from src.fair_scheduler import FairScheduler
+from src.completion_notifier import CompletionNotifier
+from src.database_pool import DatabaseConnectionPool
+from src.lease_renewer import LeaseRenewer
+from src.mask_encoding import MASK_FORMATS, encode_mask, decode_mask
+from src.mask_summary import MASK_OUTPUTS, summarize_mask
+from src.metrics import (
+    registry,
+    queue_wait_seconds,
+    workflow_execution_seconds,
+    fetch_seconds,
+    queue_depth,
+    in_flight_jobs,
+)
+from src.partial_results import PartialResultStore
+from src.prediction_cache import PredictionCache, generate_cache_key
+from src.submission_signal import SubmissionSignal
+from src.worker_pool import PredictionWorkerPool
+from src.workflow_loader import WorkflowLoader, WorkflowUnavailableError
 from src.workflows.workflow_000 import Workflow000
+from src.workflows.context import WorkflowContext
 from src.workflows.workflow_001 import Workflow001
 
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 
 
 # Creates flask app & enables CORS.
@@ -35,22 +63,37 @@ CORS(app)
 # Creates an empty dictionary to store loaded workflows.
 workflows = dict()
 
+# Creates a signal used by submit_image to wake the prediction workers when a new submission is queued.
+submission_signal = SubmissionSignal()
+
+# Creates a notifier used by the prediction workers to wake requests waiting for a submission to be completed.
+completion_notifier = CompletionNotifier()
+
+# Creates a store for the results of the stages published by multi-stage workflows, before submissions are completed.
+partial_result_store = PartialResultStore()
+
+# Creates the unique id of this replica, which owns the leases on the submissions it is working on. A random suffix is
+# added, so that a restarted container with the same host name does not take over the leases of its previous run.
+replica_id = f"{socket.gethostname()}-{uuid.uuid4().hex[:8]}"
 
-def load_workflows(models_base_url: str) -> None:
-    """Loads all the models & utility files for all workflows.
 
-    Loads all the models & utility files for all workflows.
+def load_workflows(serving_configuration: Dict[str, Any]) -> None:
+    """Creates all workflows, & loads their configuration files.
+
+    Creates all workflows, & loads their configuration files. Their models are loaded concurrently by the workflow
+    loader, in the background or on first use.
 
     Args:
-        models_base_url: A string for the base URL where the model's in the workflow are served.
+        serving_configuration: A dictionary for the transport & addresses used to reach the models served by
+            TensorFlow Serving.
 
     Returns:
         None.
     """
     # Checks types & values of arguments.
     assert isinstance(
-        models_base_url, str
-    ), "Variable models_base_url should be of type 'str'."
+        serving_configuration, dict
+    ), "Variable serving_configuration should be of type 'dict'."
 
     # Loads the version numbers for all workflows.
     home_directory_path = os.getcwd()
@@ -65,369 +108,2409 @@ def load_workflows(models_base_url: str) -> None:
     for name in available_workflow_names:
         # Creates on object for the Workflow 000.
         if name == "workflow_000":
-            workflows[name] = Workflow000(workflow_versions[name], models_base_url)
+            workflows[name] = Workflow000(
+                workflow_versions[name], serving_configuration
+            )
 
         # Creates on object for the Workflow 001.
         elif name == "workflow_001":
-            workflows[name] = Workflow001(workflow_versions[name], models_base_url)
+            workflows[name] = Workflow001(
+                workflow_versions[name],
+                serving_configuration,
+                api_configuration["results"]["summary"],
+            )
 
         # Loads the workflow configuration file for current version.
         workflows[name].load_workflow_configuration()
 
-        # Loads each model & utility files in the workflow.
-        workflows[name].load_workflow_models()
-
 
-def initialize_databases():
+def initialize_databases(database_configuration: Dict[str, Any]) -> None:
     """Initializes SQLite3 databases used to track the progress of submissions to the ML showcase API.
 
-    Initializes SQLite3 databases used to track the progress of submissions to the ML showcase API.
+    Initializes SQLite3 databases used to track the progress of submissions to the ML showcase API. The database is
+    opened in WAL mode, so that readers do not block the writer, & accessed through a pool of connections, so that
+    request & worker threads do not share a connection. Pending submissions are ordered by a monotonic sequence
+    number, & leased by the prediction workers of a replica until a lease expiry time. Submissions identical to a
+    submission in flight are linked to it instead of being queued, whichever replica they were submitted to. The
+    database can be shared by several replicas on the same host.
 
     Args:
-        None.
+        database_configuration: A dictionary for the path to the database file, the size of the connection pool, &
+            the number of seconds a statement waits for the write lock.
 
     Returns:
         None.
     """
-    global cursor, connection
+    global database_pool
+
+    # Creates the pool of connections to the SQLite3 database, which are lent to request & worker threads.
+    database_directory_path = os.path.dirname(database_configuration["path"])
+    if database_directory_path != "":
+        os.makedirs(database_directory_path, exist_ok=True)
+    database_pool = DatabaseConnectionPool(
+        database_configuration["path"], database_configuration
+    )
 
-    # Establish a connection to the SQLite3 database and create a cursor.
-    connection = sqlite3.connect("ml_showcase_db.sqlite3", check_same_thread=False)
-    cursor = connection.cursor()
+    # Enables WAL mode, which is kept in the database file, & in which commits only need to be synced to disk at
+    # checkpoints.
+    with database_pool.writer() as cursor:
+        cursor.execute("PRAGMA journal_mode=WAL")
+
+    # Creates or migrates the tables in a single write transaction, so that replicas started at the same time do not
+    # both create them.
+    with database_pool.transaction() as cursor:
+        # Check if the 'submissions_info' table exists, if not, create it.
+        try:
+            cursor.execute("SELECT * FROM submissions_info LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute(
+                """
+                CREATE TABLE submissions_info (
+                    submission_id TEXT PRIMARY KEY NOT NULL,
+                    workflow_name TEXT NOT NULL,
+                    submission_time_stamp TEXT NOT NULL,
+                    file_extension TEXT NOT NULl,
+                    sequence_number INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expiry REAL NOT NULL DEFAULT 0,
+                    enqueue_time REAL NOT NULL DEFAULT 0,
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    deadline REAL,
+                    cache_key TEXT,
+                    leader_submission_id TEXT
+                )
+                """
+            )
+            print("'submissions_info' does not exist. Creating a new one.")
+            print()
 
-    # Check if the 'submissions_info' table exists, if not, create it.
-    try:
-        cursor.execute("SELECT * FROM submissions_info LIMIT 1")
-    except sqlite3.OperationalError:
+        # Adds the sequence number, lease, enqueue time, priority, deadline & coalescing columns to a table created by
+        # an earlier version, keeping the insertion order. Submissions claimed by an earlier version are available
+        # again, as their lease expiry is 0.
+        cursor.execute("PRAGMA table_info(submissions_info)")
+        column_names = [column[1] for column in cursor.fetchall()]
+        if "sequence_number" not in column_names:
+            cursor.execute(
+                "ALTER TABLE submissions_info ADD COLUMN sequence_number INTEGER NOT NULL DEFAULT 0"
+            )
+            cursor.execute("UPDATE submissions_info SET sequence_number = rowid")
+        if "lease_expiry" not in column_names:
+            cursor.execute("ALTER TABLE submissions_info ADD COLUMN lease_owner TEXT")
+            cursor.execute(
+                "ALTER TABLE submissions_info ADD COLUMN lease_expiry REAL NOT NULL DEFAULT 0"
+            )
+            cursor.execute("DROP INDEX IF EXISTS submissions_info_queue")
+            cursor.execute("DROP INDEX IF EXISTS submissions_info_workflow_queue")
+        if "enqueue_time" not in column_names:
+            cursor.execute(
+                "ALTER TABLE submissions_info ADD COLUMN enqueue_time REAL NOT NULL DEFAULT 0"
+            )
+        if "priority" not in column_names:
+            cursor.execute(
+                "ALTER TABLE submissions_info ADD COLUMN priority INTEGER NOT NULL DEFAULT 0"
+            )
+            cursor.execute("DROP INDEX IF EXISTS submissions_info_workflow_sequence")
+        if "deadline" not in column_names:
+            cursor.execute("ALTER TABLE submissions_info ADD COLUMN deadline REAL")
+        if "leader_submission_id" not in column_names:
+            cursor.execute("ALTER TABLE submissions_info ADD COLUMN cache_key TEXT")
+            cursor.execute(
+                "ALTER TABLE submissions_info ADD COLUMN leader_submission_id TEXT"
+            )
+
+        # Creates the indexes used to find the oldest available submissions of all workflows, & the available
+        # submissions of a workflow with the highest priority, oldest first. The scan in index order only skips the
+        # submissions currently leased, which are at most the in-flight batches of the replicas.
         cursor.execute(
             """
-            CREATE TABLE submissions_info (
-                submission_id TEXT PRIMARY KEY NOT NULL,
-                workflow_name TEXT NOT NULL,
-                submission_time_stamp TEXT NOT NULL,
-                file_extension TEXT NOT NULl
-            )
+            CREATE INDEX IF NOT EXISTS submissions_info_sequence 
+            ON submissions_info (sequence_number)
+            """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS submissions_info_workflow_priority 
+            ON submissions_info (workflow_name, priority DESC, sequence_number)
             """
         )
-        print("'submissions_info' does not exist. Creating a new one.")
-        print()
 
-    # Check if the 'submissions_completion_info' table exists, if not, create it.
-    try:
-        cursor.execute("SELECT * FROM submissions_completion_info LIMIT 1")
-    except sqlite3.OperationalError:
+        # Creates the indexes used to find the submission in flight for an image & workflow, & the submissions
+        # waiting for it.
         cursor.execute(
             """
-            CREATE TABLE submissions_completion_info (
-                submission_id TEXT PRIMARY KEY NOT NULL,
-                workflow_name TEXT NOT NULL,
-                submission_time_stamp TEXT NOT NULL,
-                completion_time_stamp TEXT NOT NULL
-            )
+            CREATE INDEX IF NOT EXISTS submissions_info_cache_key 
+            ON submissions_info (cache_key)
+            """
+        )
+        cursor.execute(
+            """
+            CREATE INDEX IF NOT EXISTS submissions_info_leader 
+            ON submissions_info (leader_submission_id)
             """
         )
-        print("'submissions_completion_info' does not exist. Creating a new one.")
-        print()
 
-    # Commit changes and reset the cursor.
-    connection.commit()
+        # Check if the 'submissions_completion_info' table exists, if not, create it.
+        try:
+            cursor.execute("SELECT * FROM submissions_completion_info LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute(
+                """
+                CREATE TABLE submissions_completion_info (
+                    submission_id TEXT PRIMARY KEY NOT NULL,
+                    workflow_name TEXT NOT NULL,
+                    submission_time_stamp TEXT NOT NULL,
+                    completion_time_stamp TEXT NOT NULL
+                )
+                """
+            )
+            print("'submissions_completion_info' does not exist. Creating a new one.")
+            print()
+
+        # Check if the 'submission_batches_info' table exists, if not, create it.
+        try:
+            cursor.execute("SELECT * FROM submission_batches_info LIMIT 1")
+        except sqlite3.OperationalError:
+            cursor.execute(
+                """
+                CREATE TABLE submission_batches_info (
+                    batch_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    submission_id TEXT NOT NULL,
+                    PRIMARY KEY (batch_id, position)
+                )
+                """
+            )
+            print("'submission_batches_info' does not exist. Creating a new one.")
+            print()
+
     print("Databases initialized successfully.")
     print()
 
 
-@app.route("/api/v1/submit_image/", methods=["POST"])
-@cross_origin()
-def submit_image() -> Dict[str, str]:
-    """Submits the image to the API, validates the input, and stores the submission information in the database.
+def find_leader_submission(
+    cursor: sqlite3.Cursor, cache_key: Optional[str]
+) -> Optional[str]:
+    """Finds the submission in flight for the same image & workflow, which an identical submission can wait for.
 
-    Submits the image to the API, validates the input, and stores the submission information in the database.
+    Finds the submission in flight for the same image & workflow, which an identical submission can wait for, from
+    any replica. Should be called in the transaction which inserts the identical submission, so that the submission
+    found cannot be completed before it is linked to it.
 
     Args:
-        None.
+        cursor: A SQLite3 cursor in a write transaction.
+        cache_key: A string for the cache key of the image & workflow, or None if the submission is not coalesced.
 
     Returns:
-        A dictionary which contains the status of the image & its validity.
+        A string for the unique id of the submission in flight, or None if there is none.
     """
-    # Checks if the request contains an image.
-    if "image" not in request.files:
-        return (
-            jsonify({"status": "Failure", "message": "Image was not submitted."}),
-            400,
-        )
+    if cache_key is None or not prediction_cache.enabled:
+        return None
+    cursor.execute(
+        """
+        SELECT submission_id FROM submissions_info 
+        WHERE cache_key = ? AND leader_submission_id IS NULL LIMIT 1
+        """,
+        (cache_key,),
+    )
+    row = cursor.fetchone()
+    return row[0] if row is not None else None
 
-    # Gets the uploaded file.
-    image = request.files["image"]
 
-    # Checks if the file has a valid extension.
-    if image.filename.endswith(".png"):
-        file_type = "image/png"
-    elif image.filename.endswith(".jpg"):
-        file_type = "image/jpg"
-    elif image.filename.endswith(".jpeg"):
-        file_type = "image/jpeg"
-    else:
-        return (
-            jsonify(
-                {
-                    "status": "Failure",
-                    "message": "File should have '.png', '.jpg', or '.jpeg' as extension.",
-                }
-            ),
-            400,
-        )
+def insert_submission(
+    submission_id: str,
+    workflow_name: str,
+    file_extension: str,
+    priority: int,
+    deadline: Optional[float],
+    cache_key: Optional[str] = None,
+) -> Optional[str]:
+    """Inserts a submission into the submissions info table, after the last sequence number.
 
-    # Checks if the request contains workflow id.
-    if "workflow_name" not in request.form:
-        return (
-            jsonify(
-                {
-                    "status": "Failure",
-                    "message": "Request should include 'workflow_name'.",
-                }
-            ),
-            400,
-        )
-    else:
-        workflow_name = request.form.get("workflow_name")
+    Inserts a submission into the submissions info table, after the last sequence number. The sequence number is
+    computed in the transaction, which holds the write lock, so that it is unique & monotonic. If an identical
+    submission is in flight, the submission is linked to it instead of being queued, & is completed with its output.
 
-    # Checks if the workflow name entered is correct.
-    try:
-        workflows[workflow_name]
-    except KeyError:
-        return (
-            jsonify(
-                {
-                    "status": "Failure",
-                    "message": "Incorrect 'workflow_name' included in the request.",
-                }
+    Args:
+        submission_id: A string for the unique id of the submission.
+        workflow_name: A string for the name of the workflow.
+        file_extension: A string for the extension of the stored image file.
+        priority: An integer for the priority of the submission. Higher priorities are predicted first.
+        deadline: A floating point value for the time after which the submission is no longer predicted, or None.
+        cache_key: A string for the cache key of the image & workflow, or None if the submission is not coalesced.
+
+    Returns:
+        A string for the unique id of the identical submission in flight, or None if the submission was queued.
+    """
+    with database_pool.transaction() as cursor:
+        leader_submission_id = find_leader_submission(cursor, cache_key)
+        cursor.execute(
+            """
+            INSERT INTO submissions_info 
+            (submission_id, workflow_name, submission_time_stamp, file_extension, sequence_number, enqueue_time, 
+            priority, deadline, cache_key, leader_submission_id) 
+            SELECT ?, ?, ?, ?, IFNULL(MAX(sequence_number), 0) + 1, ?, ?, ?, ?, ? FROM submissions_info
+            """,
+            (
+                submission_id,
+                workflow_name,
+                generate_time_stamp(),
+                file_extension,
+                time.time(),
+                priority,
+                deadline,
+                cache_key,
+                leader_submission_id,
             ),
-            404,
         )
+    return leader_submission_id
 
-    # Read the content in the file as bytes.
-    image_content = image.read()
-
-    # Generates a unique id for the submission.
-    submission_id = str(uuid.uuid4())
-
-    # Converts bytes into a NumPy array.
-    try:
-        image = Image.open(io.BytesIO(image_content))
-    except Exception as e:
-        return jsonify({"status": "Failure", "message": str(e)})
 
-    # Checks if the following directory path exists.
-    uploaded_data_directory_path = check_directory_path_existence("data/in")
+def insert_completed_submission(submission_id: str, workflow_name: str) -> None:
+    """Inserts a submission completed at submit time into the submissions completion info table.
 
-    # Saves the image as a PNG image.
-    image.save(os.path.join(uploaded_data_directory_path, f"{submission_id}.png"))
+    Inserts a submission completed at submit time into the submissions completion info table.
 
-    # Updates image submissions info table, with the uploaded image information.
-    cursor.execute(
-        """
-        INSERT INTO submissions_info (submission_id, workflow_name, submission_time_stamp, file_extension) 
-        VALUES (?, ?, ?, ?)
-        """,
-        (submission_id, workflow_name, generate_time_stamp(), "png"),
-    )
-    connection.commit()
+    Args:
+        submission_id: A string for the unique id of the submission.
+        workflow_name: A string for the name of the workflow.
 
-    # Returns the success message along with the unique id.
-    return (
-        jsonify(
-            {
-                "status": "Success",
-                "submission_id": submission_id,
-                "file_type": file_type,
-                "message": "File submitted.",
-            }
-        ),
-        200,
-    )
+    Returns:
+        None.
+    """
+    time_stamp = generate_time_stamp()
+    with database_pool.writer() as cursor:
+        cursor.execute(
+            """
+            INSERT INTO submissions_completion_info
+            (submission_id, workflow_name, submission_time_stamp, completion_time_stamp)
+            VALUES (?, ?, ?, ?)
+            """,
+            (submission_id, workflow_name, time_stamp, time_stamp),
+        )
 
 
-def prediction() -> None:
-    """Performs prediction for the uploaded input based on the workflow name.
+def insert_submission_batch(
+    batch_id: str,
+    submission_ids: List[str],
+    workflow_name: str,
+    file_extensions: Dict[str, str],
+    cache_keys: Dict[str, str],
+    priority: int,
+    deadline: Optional[float],
+) -> None:
+    """Inserts the submissions of a bulk submission, & the batch they belong to, in a single transaction.
 
-    Performs prediction for the uploaded input based on the workflow name.
+    Inserts the submissions of a bulk submission, & the batch they belong to, in a single transaction. Submissions
+    with a stored image are inserted into the submissions info table with consecutive sequence numbers, & linked to
+    an identical submission in flight if there is one, while submissions completed from the cache are inserted into
+    the submissions completion info table.
 
     Args:
-        None.
+        batch_id: A string for the unique id of the batch.
+        submission_ids: A list of strings for the unique ids of the submissions, in the order they were uploaded.
+        workflow_name: A string for the name of the workflow.
+        file_extensions: A dictionary for the extension of the stored image of each pending submission. Submissions
+            missing from it are completed.
+        cache_keys: A dictionary for the cache key of the image of each pending submission.
+        priority: An integer for the priority of the pending submissions. Higher priorities are predicted first.
+        deadline: A floating point value for the time after which the pending submissions are no longer predicted,
+            or None.
 
     Returns:
         None.
     """
-    wait_time = 2
-    while True:
-        # Checks if an image has been uploaded to the API.
-        cursor.execute(
+    time_stamp = generate_time_stamp()
+    enqueue_time = time.time()
+    pending_submission_ids = [
+        submission_id
+        for submission_id in submission_ids
+        if submission_id in file_extensions
+    ]
+    with database_pool.transaction() as cursor:
+        # Computes the last sequence number, which cannot change while the transaction holds the write lock.
+        cursor.execute("SELECT IFNULL(MAX(sequence_number), 0) FROM submissions_info")
+        sequence_number = cursor.fetchone()[0]
+
+        # Inserts the pending submissions one by one, so that each can be linked to an identical submission in
+        # flight, including one inserted before it in the same batch.
+        for index, submission_id in enumerate(pending_submission_ids):
+            cursor.execute(
+                """
+                INSERT INTO submissions_info 
+                (submission_id, workflow_name, submission_time_stamp, file_extension, sequence_number, enqueue_time, 
+                priority, deadline, cache_key, leader_submission_id) 
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    submission_id,
+                    workflow_name,
+                    time_stamp,
+                    file_extensions[submission_id],
+                    sequence_number + index + 1,
+                    enqueue_time,
+                    priority,
+                    deadline,
+                    cache_keys[submission_id],
+                    find_leader_submission(cursor, cache_keys[submission_id]),
+                ),
+            )
+
+        # Inserts the completed submissions, & the position of each submission in the batch.
+        cursor.executemany(
             """
-            SELECT submission_id, workflow_name, submission_time_stamp, file_extension 
-            FROM submissions_info 
-            ORDER BY submission_time_stamp ASC 
-            LIMIT 1
+            INSERT INTO submissions_completion_info
+            (submission_id, workflow_name, submission_time_stamp, completion_time_stamp)
+            VALUES (?, ?, ?, ?)
+            """,
+            [
+                (submission_id, workflow_name, time_stamp, time_stamp)
+                for submission_id in submission_ids
+                if submission_id not in file_extensions
+            ],
+        )
+        cursor.executemany(
             """
+            INSERT INTO submission_batches_info (batch_id, position, submission_id) 
+            VALUES (?, ?, ?)
+            """,
+            [
+                (batch_id, position, submission_id)
+                for position, submission_id in enumerate(submission_ids)
+            ],
         )
-        row = cursor.fetchone()
-
-        # If no new image has been uploaded, then checks after wait time seconds.
-        if row is None:
-            print(f"No new data was uploaded. Will check again after {wait_time} secs.")
-            print()
-            time.sleep(wait_time)
-            continue
-
-        # Extracts submission id, workflow name & submission time stamp from row.
-        submission_id, workflow_name, submission_time_stamp, file_extension = row
 
-        # Checks if the following directory path exists.
-        uploaded_data_directory_path = check_directory_path_existence("data/in")
 
-        # Generates parameters required for workflow result.
-        workflows[workflow_name].generate_prediction_parameters(
-            submission_id,
-            f"{uploaded_data_directory_path}/{submission_id}.{file_extension}",
-        )
+def fetch_batch_submission_ids(batch_id: str) -> List[str]:
+    """Fetches the unique ids of the submissions in a batch.
 
-        # Executes workflow to complete the prediction task.
-        workflows[workflow_name].workflow_prediction()
+    Fetches the unique ids of the submissions in a batch, in the order they were uploaded.
 
-        # Deletes submission id from submissions info table.
-        cursor.execute(
-            "DELETE FROM submissions_info WHERE submission_id=?",
-            (submission_id,),
-        )
+    Args:
+        batch_id: A string for the unique id of the batch.
 
-        # Updates image submissions completion info table, with the latest prediction.
+    Returns:
+        A list of strings for the unique ids of the submissions. Empty if the batch does not exist.
+    """
+    with database_pool.cursor() as cursor:
         cursor.execute(
             """
-            INSERT INTO submissions_completion_info 
-            (submission_id, workflow_name, submission_time_stamp, completion_time_stamp) 
-            VALUES (?, ?, ?, ?)
+            SELECT submission_id FROM submission_batches_info 
+            WHERE batch_id = ? ORDER BY position ASC
             """,
-            (
-                submission_id,
-                workflow_name,
-                submission_time_stamp,
-                generate_time_stamp(),
-            ),
+            (batch_id,),
         )
-        connection.commit()
+        return [row[0] for row in cursor.fetchall()]
 
 
-@app.route("/api/v1/fetch_result/<submission_id>", methods=["GET"])
-@cross_origin()
-def fetch_result(submission_id: str) -> Dict[str, Any]:
-    """Checks the status of the prediction, and returns it if is ready.
+def delete_batch(batch_id: str) -> None:
+    """Deletes a batch, once its results have been returned.
 
-    Checks the status of the prediction, and returns it if is ready.
+    Deletes a batch, once its results have been returned.
 
     Args:
-        submission_id: A string for the unique id of the submission.
+        batch_id: A string for the unique id of the batch.
 
     Returns:
-        A dictionary which contains the status, corresponding message, and if possible the extracted document.
+        None.
     """
-    # Validates input type.
-    if not isinstance(submission_id, str):
-        return (
-            jsonify({"status": "Failure", "message": "Invalid submission_id type."}),
-            400,
-        )
-
-    try:
-        # Checks if prediction for submission ID is already completed.
+    with database_pool.writer() as cursor:
         cursor.execute(
-            "SELECT completion_time_stamp FROM submissions_completion_info WHERE submission_id = ?",
-            (submission_id,),
+            "DELETE FROM submission_batches_info WHERE batch_id = ?", (batch_id,)
         )
-        row = cursor.fetchone()
 
-        # If no completion record exists, checks if the submission is still in progress.
-        if row is None:
-            cursor.execute(
-                "SELECT submission_time_stamp FROM submissions_info WHERE submission_id = ?",
-                (submission_id,),
-            )
-            row = cursor.fetchone()
 
-            # If submission ID doesn't exist in either table, returns an error message.
-            if row is None:
-                return (
-                    jsonify({"status": "Failure", "message": "Invalid submission_id."}),
-                    404,
-                )
+def detect_file_type(file_name: str) -> Tuple[str, str]:
+    """Detects the file type & extension of an uploaded file from its name.
 
-            # If submission exists but is still in progress, returns an in-progress status.
-            return (
-                jsonify(
-                    {
-                        "status": "In Progress",
-                        "message": "Workflow is still extracting information.",
-                    }
-                ),
-                202,
-            )
+    Detects the file type & extension of an uploaded file from its name.
 
-        # Checks and retrieves the directory path for results.
-        results_directory_path = check_directory_path_existence("data/out")
+    Args:
+        file_name: A string for the name of the uploaded file.
 
-        # Loads the result from the JSON file.
-        result = load_json_file(submission_id, results_directory_path)
+    Returns:
+        A tuple for the MIME type & the extension of the file.
 
-        # Deletes the JSON file after loading the result.
-        os.remove(f"{results_directory_path}/{submission_id}.json")
+    Exceptions:
+        ValueError: If the file does not have a supported extension.
+    """
+    if file_name.endswith(".png"):
+        file_type = "image/png"
+    elif file_name.endswith(".jpg"):
+        file_type = "image/jpg"
+    elif file_name.endswith(".jpeg"):
+        file_type = "image/jpeg"
+    elif file_name.endswith(".npy"):
+        file_type = "application/x-npy"
+    else:
+        raise ValueError(
+            "File should have '.png', '.jpg', '.jpeg', or '.npy' as extension."
+        )
+    return file_type, file_name.rsplit(".", 1)[-1]
 
-        # Checks if the submission PNG or TXT file exists, and deletes it.
-        if os.path.exists(os.path.join("data/in", f"{submission_id}.png")):
-            os.remove(os.path.join("data/in", f"{submission_id}.png"))
-        elif os.path.exists(os.path.join("data/in", f"{submission_id}.txt")):
-            os.remove(os.path.join("data/in", f"{submission_id}.txt"))
 
-        # Loads and returns the result as a JSON object.
-        return jsonify(result), 200
+def parse_priority() -> int:
+    """Parses & validates the optional priority of a submission.
 
-    except sqlite3.Error as e:
-        # Handles SQLite database errors.
-        return (
-            jsonify({"status": "Failure", "message": f"Database error: {str(e)}"}),
-            500,
-        )
+    Parses & validates the optional 'priority' form field of a submission, which defaults to 0. Submissions with a
+    higher priority are predicted before the other pending submissions.
 
-    except Exception as e:
-        # Handles unexpected errors.
-        return (
-            jsonify({"status": "Failure", "message": f"Unexpected error: {str(e)}"}),
-            500,
-        )
+    Args:
+        None.
 
+    Returns:
+        An integer for the priority of the submission.
 
-if __name__ == "__main__":
-    print()
-    # Parses the arguments.
-    parser = argparse.ArgumentParser()
-    parser.add_argument(
-        "-dt",
-        "--deployment_type",
-        type=str,
-        required=True,
-        help="Type of the deployment.",
-    )
-    args = parser.parse_args()
+    Exceptions:
+        ValueError: If the priority is not an integer between 0 & the maximum priority.
+    """
+    max_priority = api_configuration["scheduling"]["max_priority"]
+    try:
+        priority = int(request.form.get("priority", 0))
+    except ValueError:
+        priority = -1
+    if not 0 <= priority <= max_priority:
+        raise ValueError(
+            f"Incorrect 'priority' included in the request. Expected an integer between 0 and {max_priority}."
+        )
+    return priority
 
-    # Initializes SQLite3 databases used to track the progress of submissions to the ML showcase API.
-    initialize_databases()
 
-    # Sets API host.
-    host_name = "localhost" if args.deployment_type == "dev" else "serving"
-    API_HOST = f"http://{host_name}:8501"
+def parse_deadline() -> Optional[float]:
+    """Parses & validates the optional deadline of a submission.
 
-    # Loads all the models & utility files for all workflows.
-    load_workflows(API_HOST)
+    Parses & validates the optional 'deadline' form field of a submission, which is the number of seconds after
+    which the client no longer needs the result. A submission still queued after its deadline is not predicted.
+    The deadline is relative to the submission, so that it does not depend on the clock of the client.
 
-    # Implements multi-threading for extract information function.
-    processing_thread = threading.Thread(target=prediction)
-    processing_thread.start()
+    Args:
+        None.
+
+    Returns:
+        A floating point value for the time after which the submission is no longer predicted, or None if the
+            request has no deadline.
+
+    Exceptions:
+        ValueError: If the deadline is not a positive number of seconds.
+    """
+    if "deadline" not in request.form:
+        return None
+    try:
+        deadline = float(request.form["deadline"])
+    except ValueError:
+        deadline = 0.0
+    if not deadline > 0:
+        raise ValueError(
+            "Incorrect 'deadline' included in the request. Expected a positive number of seconds."
+        )
+    return time.time() + deadline
+
+
+def save_upload(submission_id: str, image_content: bytes, file_extension: str) -> str:
+    """Saves an uploaded image, so that it is read by the prediction worker.
+
+    Saves the original bytes of an uploaded image, or re-encodes it as a PNG image in the legacy storage mode, so
+    that it is read by the prediction worker.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+        image_content: A bytes object for the content of the uploaded file.
+        file_extension: A string for the extension of the uploaded file.
+
+    Returns:
+        A string for the extension of the stored image file.
+    """
+    # Checks if the following directory path exists.
+    uploaded_data_directory_path = check_directory_path_existence("data/in")
+
+    # Saves the original bytes of the upload, or re-encodes the image as a PNG image in the legacy storage mode.
+    if api_configuration["ingest"]["storage_mode"] == "png" and file_extension != "npy":
+        file_extension = "png"
+        Image.open(io.BytesIO(image_content)).save(
+            os.path.join(uploaded_data_directory_path, f"{submission_id}.png")
+        )
+    else:
+        with open(
+            os.path.join(
+                uploaded_data_directory_path, f"{submission_id}.{file_extension}"
+            ),
+            "wb",
+        ) as image_file:
+            image_file.write(image_content)
+    return file_extension
+
+
+def enqueue_submission(
+    submission_id: str,
+    workflow_name: str,
+    image_content: bytes,
+    file_extension: str,
+    cache_key: str,
+    priority: int,
+    deadline: Optional[float],
+) -> None:
+    """Stores an uploaded image, & queues its submission for the prediction workers.
+
+    Stores an uploaded image, & queues its submission for the prediction workers, unless it joins an identical
+    submission in flight, in any replica, in which case it is completed with the output of that submission.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+        workflow_name: A string for the name of the workflow.
+        image_content: A bytes object for the content of the uploaded file.
+        file_extension: A string for the extension of the uploaded file.
+        cache_key: A string for the cache key of the image & workflow.
+        priority: An integer for the priority of the submission.
+        deadline: A floating point value for the time after which the submission is no longer predicted, or None.
+
+    Returns:
+        None.
+    """
+    # Saves the uploaded image for the prediction worker.
+    file_extension = save_upload(submission_id, image_content, file_extension)
+
+    # Updates image submissions info table, with the uploaded image information, & wakes the prediction workers,
+    # unless the submission joined an identical submission in flight.
+    leader_submission_id = insert_submission(
+        submission_id, workflow_name, file_extension, priority, deadline, cache_key
+    )
+    if leader_submission_id is None:
+        submission_signal.set()
+
+
+def format_cached_output(
+    output: Dict[str, Any], submission_id: str, lookup_start_time: float
+) -> Dict[str, Any]:
+    """Fills in the submission specific fields of a cached output, which are removed before caching.
+
+    Fills in the submission specific fields of a cached output, which are removed before caching. The submission
+    did not wait in the queue, & its time taken is the time taken to look up the cache.
+
+    Args:
+        output: A dictionary for the cached output of the workflow.
+        submission_id: A string for the unique id of the submission.
+        lookup_start_time: A floating point value for the time at which the cache lookup started.
+
+    Returns:
+        A dictionary for the output of the submission.
+    """
+    output["submission_id"] = submission_id
+    output["queue_wait_time"] = "0.000 sec."
+    output["time_taken"] = f"{(time.time() - lookup_start_time):.3f} sec."
+    return output
+
+
+def check_admission(
+    workflow_name: str, n_submissions: int
+) -> Tuple[Optional[int], Optional[float]]:
+    """Checks if new submissions are admitted to the queue, & estimates when the last of them will be completed.
+
+    Checks if new submissions are admitted to the queue, based on the depth of the queue & of the workflow's share
+    of the queue, & estimates when the last of them will be completed, at the observed drain rate.
+
+    Args:
+        workflow_name: A string for the name of the workflow of the new submissions.
+        n_submissions: An integer for the number of new submissions.
+
+    Returns:
+        A tuple for the number of seconds after which the client should retry, or None if the submissions are
+            admitted, & the estimated number of seconds until they are completed, or None if it is unknown.
+    """
+    queue_depths = fetch_queue_depths()
+    retry_after = admission_controller.compute_retry_after(
+        workflow_name, n_submissions, queue_depths
+    )
+    estimated_completion_time = admission_controller.estimate_completion_time(
+        sum(queue_depths.values()) + n_submissions - 1
+    )
+    return retry_after, estimated_completion_time
+
+
+def generate_rejection_response(
+    retry_after: int,
+) -> Tuple[Response, int, Dict[str, str]]:
+    """Generates the response for submissions rejected as the queue is full.
+
+    Generates the response for submissions rejected as the queue is full, with the number of seconds after which
+    the client should retry in the Retry-After header.
+
+    Args:
+        retry_after: An integer for the number of seconds after which the client should retry.
+
+    Returns:
+        A tuple for the JSON response, the 429 status code, & the Retry-After header.
+    """
+    return (
+        jsonify(
+            {
+                "status": "Failure",
+                "message": f"Server is busy. Please retry after {retry_after} sec.",
+                "retry_after": retry_after,
+            }
+        ),
+        429,
+        {"Retry-After": str(retry_after)},
+    )
+
+
+@app.route("/api/v1/submit_image/", methods=["POST"])
+@cross_origin()
+def submit_image() -> Dict[str, str]:
+    """Submits the image to the API, validates the input, and stores the submission information in the database.
+
+    Submits the image to the API, validates the input, and stores the submission information in the database.
+
+    Args:
+        None.
+
+    Returns:
+        A dictionary which contains the status of the image & its validity.
+    """
+    # Checks if the request contains an image.
+    if "image" not in request.files:
+        return (
+            jsonify({"status": "Failure", "message": "Image was not submitted."}),
+            400,
+        )
+
+    # Gets the uploaded file.
+    image = request.files["image"]
+
+    # Checks if the file has a valid extension.
+    try:
+        file_type, file_extension = detect_file_type(image.filename)
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+
+    # Checks if the request contains workflow id.
+    if "workflow_name" not in request.form:
+        return (
+            jsonify(
+                {
+                    "status": "Failure",
+                    "message": "Request should include 'workflow_name'.",
+                }
+            ),
+            400,
+        )
+    else:
+        workflow_name = request.form.get("workflow_name")
+
+    # Checks if the workflow name entered is correct.
+    try:
+        workflows[workflow_name]
+    except KeyError:
+        return (
+            jsonify(
+                {
+                    "status": "Failure",
+                    "message": "Incorrect 'workflow_name' included in the request.",
+                }
+            ),
+            404,
+        )
+
+    # Read the content in the file as bytes.
+    image_content = image.read()
+
+    # Generates a unique id for the submission.
+    submission_id = str(uuid.uuid4())
+
+    # Validates the priority & deadline, & the image by reading only its header, as the pixels are decoded by the
+    # prediction worker.
+    try:
+        priority = parse_priority()
+        deadline = parse_deadline()
+        validate_image_header(image_content, file_extension)
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+
+    # Completes the submission at submit time, if the output for the same image & workflow is already cached.
+    lookup_start_time = time.time()
+    cache_key = generate_cache_key(
+        image_content, workflow_name, workflows[workflow_name]
+    )
+    cached_output = prediction_cache.get(cache_key)
+    if cached_output is not None:
+        save_json_file(
+            format_cached_output(cached_output, submission_id, lookup_start_time),
+            submission_id,
+            "data/out",
+            compact=True,
+        )
+        insert_completed_submission(submission_id, workflow_name)
+        estimated_completion_time = 0.0
+    else:
+        # Rejects the submission if the queue is full, with the number of seconds after which to retry. Admission
+        # is checked before the image is stored or joins an identical submission in flight, so that a rejected
+        # submission leaves nothing behind.
+        retry_after, estimated_completion_time = check_admission(workflow_name, 1)
+        if retry_after is not None:
+            return generate_rejection_response(retry_after)
+
+        # Stores the uploaded image, & queues the submission for the prediction workers.
+        enqueue_submission(
+            submission_id,
+            workflow_name,
+            image_content,
+            file_extension,
+            cache_key,
+            priority,
+            deadline,
+        )
+
+    # Returns the success message along with the unique id, & the estimated number of seconds until completion.
+    return (
+        jsonify(
+            {
+                "status": "Success",
+                "submission_id": submission_id,
+                "file_type": file_type,
+                "message": "File submitted.",
+                "estimated_completion_time": estimated_completion_time,
+            }
+        ),
+        200,
+    )
+
+
+def is_overloaded() -> bool:
+    """Checks if an inline prediction should be queued instead, as the server is overloaded.
+
+    Checks if an inline prediction should be queued instead, as the server is overloaded. The server is overloaded
+    if the queue is deeper than the configured maximum, so that inline predictions do not overtake a backlog, or if
+    the maximum number of inline predictions are already running. If not overloaded, a slot for the inline
+    prediction is taken, which should be released once it is done.
+
+    Args:
+        None.
+
+    Returns:
+        A boolean value for whether the server is overloaded.
+    """
+    if fetch_queue_depth() > api_configuration["predict"]["max_queue_depth"]:
+        return True
+    return not inline_prediction_slots.acquire(blocking=False)
+
+
+@app.route("/api/v1/predict/", methods=["POST"])
+@cross_origin()
+def predict() -> Dict[str, Any]:
+    """Predicts the output for an image inline, & returns it in the response.
+
+    Predicts the output for an image inline, in the request thread, & returns it in the response, without writing
+    the image or the output to disk, or polling for the result. Segmentation masks are returned as in fetch_result,
+    based on the 'mask_format' & 'mask_output' query parameters. If the server is overloaded, the image is queued
+    as by submit_image instead, & the unique id of the submission is returned to fetch its result.
+
+    Args:
+        None.
+
+    Returns:
+        A dictionary which contains the result extracted by the workflow, or the unique id of the queued submission.
+    """
+    # Checks if the request contains an image, with a valid extension.
+    if "image" not in request.files:
+        return (
+            jsonify({"status": "Failure", "message": "Image was not submitted."}),
+            400,
+        )
+    image = request.files["image"]
+    try:
+        _, file_extension = detect_file_type(image.filename)
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+
+    # Checks if the workflow name entered is correct.
+    workflow_name = request.form.get("workflow_name")
+    if workflow_name is None:
+        return (
+            jsonify(
+                {
+                    "status": "Failure",
+                    "message": "Request should include 'workflow_name'.",
+                }
+            ),
+            400,
+        )
+    if workflow_name not in workflows:
+        return (
+            jsonify(
+                {
+                    "status": "Failure",
+                    "message": "Incorrect 'workflow_name' included in the request.",
+                }
+            ),
+            404,
+        )
+
+    # Validates the query parameters, & the image by reading only its header.
+    image_content = image.read()
+    try:
+        output_options, _, _ = parse_result_arguments(0.0)
+        priority = parse_priority()
+        deadline = parse_deadline()
+        validate_image_header(image_content, file_extension)
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+
+    # Returns the cached output for the same image & workflow, if any.
+    submission_id = str(uuid.uuid4())
+    lookup_start_time = time.time()
+    cache_key = generate_cache_key(
+        image_content, workflow_name, workflows[workflow_name]
+    )
+    output = prediction_cache.get(cache_key)
+    if output is not None:
+        output["submission_id"] = submission_id
+        output["time_taken"] = f"{(time.time() - lookup_start_time):.3f} sec."
+        if "image" in output.get("prediction", {}):
+            format_segmentation_result(output["prediction"], output_options)
+        return jsonify(output), 200
+
+    # Queues the image if the server is overloaded, & returns the unique id of the submission, unless the queue is
+    # full as well.
+    if is_overloaded():
+        retry_after, estimated_completion_time = check_admission(workflow_name, 1)
+        if retry_after is not None:
+            return generate_rejection_response(retry_after)
+        enqueue_submission(
+            submission_id,
+            workflow_name,
+            image_content,
+            file_extension,
+            cache_key,
+            priority,
+            deadline,
+        )
+        return (
+            jsonify(
+                {
+                    "status": "In Progress",
+                    "submission_id": submission_id,
+                    "message": "Server is busy. Image was queued, & its result can be fetched with its submission_id.",
+                    "estimated_completion_time": estimated_completion_time,
+                }
+            ),
+            202,
+        )
+
+    try:
+        # Loads the models of the workflow if they are not loaded yet.
+        workflow_loader.load(workflow_name)
+
+        # Executes the workflow for the image decoded in memory, & caches the output.
+        context = workflows[workflow_name].generate_inline_prediction_parameters(
+            submission_id, decode_image(image_content, file_extension)
+        )
+        with in_flight_jobs.track_in_progress(workflow=workflow_name):
+            with workflow_execution_seconds.time(workflow=workflow_name):
+                workflows[workflow_name].workflow_batch_prediction([context])
+        prediction_cache.add(cache_key, context.output)
+
+        # Converts the segmentation mask in the output to the requested format & output, & returns it.
+        output = context.output
+        if "image" in output.get("prediction", {}):
+            format_segmentation_result(output["prediction"], output_options)
+        return jsonify(output), 200
+
+    except WorkflowUnavailableError as e:
+        # Handles a workflow whose models are not available.
+        return jsonify({"status": "Failure", "message": str(e)}), 503
+
+    except Exception as e:
+        # Handles unexpected errors.
+        return (
+            jsonify({"status": "Failure", "message": f"Unexpected error: {str(e)}"}),
+            500,
+        )
+
+    finally:
+        inline_prediction_slots.release()
+
+
+def read_bulk_uploads(max_images: int) -> List[Tuple[str, bytes]]:
+    """Reads the files uploaded to the bulk submission endpoint, & the files in the uploaded archive.
+
+    Reads the files uploaded as 'images', followed by the files in the '.zip' archive uploaded as 'archive', if
+    any. Directories, & hidden files added by archivers, are skipped. The number of files is checked before they
+    are read, so that a large archive is not decompressed.
+
+    Args:
+        max_images: An integer for the maximum number of images in a bulk submission.
+
+    Returns:
+        A list of tuples for the name & content of each file, in the order they were uploaded.
+
+    Exceptions:
+        ValueError: If the archive is not a valid '.zip' file, or too many files are uploaded.
+    """
+    # Reads the uploaded files.
+    images = request.files.getlist("images")
+    if len(images) > max_images:
+        raise ValueError(f"At most {max_images} images can be submitted at once.")
+    uploads = [(image.filename, image.read()) for image in images]
+
+    # Reads the files in the uploaded archive, if any.
+    if "archive" in request.files:
+        try:
+            archive_content = request.files["archive"].read()
+            with zipfile.ZipFile(io.BytesIO(archive_content)) as archive:
+                members = [
+                    member
+                    for member in archive.infolist()
+                    if not member.is_dir()
+                    and not member.filename.startswith("__MACOSX/")
+                    and not os.path.basename(member.filename).startswith(".")
+                ]
+                if len(uploads) + len(members) > max_images:
+                    raise ValueError(
+                        f"At most {max_images} images can be submitted at once."
+                    )
+                uploads.extend(
+                    (os.path.basename(member.filename), archive.read(member))
+                    for member in members
+                )
+        except zipfile.BadZipFile:
+            raise ValueError("Archive should be a valid '.zip' file.")
+    return uploads
+
+
+@app.route("/api/v1/submit_images/", methods=["POST"])
+@cross_origin()
+def submit_images() -> Dict[str, Any]:
+    """Submits several images to the API for one workflow, & stores the submissions as a batch in the database.
+
+    Submits several images to the API for one workflow, uploaded as 'images' files, or in a '.zip' file uploaded
+    as 'archive'. All the images are validated before any is stored, & the submissions are inserted in a single
+    transaction. The unique id of each submission is returned, in the order the images were uploaded, along with the
+    unique id of the batch, whose results can be fetched together.
+
+    Args:
+        None.
+
+    Returns:
+        A dictionary which contains the status, the unique id of the batch & the unique ids of the submissions.
+    """
+    # Reads the uploaded images.
+    try:
+        uploads = read_bulk_uploads(api_configuration["ingest"]["max_bulk_images"])
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+    if len(uploads) == 0:
+        return (
+            jsonify({"status": "Failure", "message": "Images were not submitted."}),
+            400,
+        )
+
+    # Checks if the workflow name entered is correct.
+    workflow_name = request.form.get("workflow_name")
+    if workflow_name is None:
+        return (
+            jsonify(
+                {
+                    "status": "Failure",
+                    "message": "Request should include 'workflow_name'.",
+                }
+            ),
+            400,
+        )
+    if workflow_name not in workflows:
+        return (
+            jsonify(
+                {
+                    "status": "Failure",
+                    "message": "Incorrect 'workflow_name' included in the request.",
+                }
+            ),
+            404,
+        )
+
+    # Validates the priority & deadline, & the extension & header of every image, before any is stored.
+    try:
+        priority = parse_priority()
+        deadline = parse_deadline()
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+    file_extensions = list()
+    for file_name, image_content in uploads:
+        try:
+            file_extensions.append(detect_file_type(file_name)[1])
+            validate_image_header(image_content, file_extensions[-1])
+        except ValueError as e:
+            return (
+                jsonify({"status": "Failure", "message": f"{file_name}: {str(e)}"}),
+                400,
+            )
+
+    # Rejects the batch if the queue is full, with the number of seconds after which to retry.
+    retry_after, estimated_completion_time = check_admission(
+        workflow_name, len(uploads)
+    )
+    if retry_after is not None:
+        return generate_rejection_response(retry_after)
+
+    # Completes the submissions whose output is cached, & saves the other images for the prediction workers.
+    batch_id = str(uuid.uuid4())
+    submission_ids = [str(uuid.uuid4()) for _ in uploads]
+    stored_file_extensions, cache_keys = dict(), dict()
+    for submission_id, (_, image_content), file_extension in zip(
+        submission_ids, uploads, file_extensions
+    ):
+        lookup_start_time = time.time()
+        cache_key = generate_cache_key(
+            image_content, workflow_name, workflows[workflow_name]
+        )
+        cached_output = prediction_cache.get(cache_key)
+        if cached_output is not None:
+            save_json_file(
+                format_cached_output(cached_output, submission_id, lookup_start_time),
+                submission_id,
+                "data/out",
+                compact=True,
+            )
+            continue
+        stored_file_extensions[submission_id] = save_upload(
+            submission_id, image_content, file_extension
+        )
+        cache_keys[submission_id] = cache_key
+
+    # Inserts the submissions & the batch in a single transaction, & wakes the prediction workers.
+    insert_submission_batch(
+        batch_id,
+        submission_ids,
+        workflow_name,
+        stored_file_extensions,
+        cache_keys,
+        priority,
+        deadline,
+    )
+    if len(stored_file_extensions) > 0:
+        submission_signal.set()
+
+    # Returns the success message along with the unique ids of the batch & submissions.
+    return (
+        jsonify(
+            {
+                "status": "Success",
+                "batch_id": batch_id,
+                "submission_ids": submission_ids,
+                "message": f"{len(submission_ids)} files submitted.",
+                "estimated_completion_time": estimated_completion_time,
+            }
+        ),
+        200,
+    )
+
+
+def claim_pending_submissions(workflow_name: Optional[str], limit: int) -> List[Tuple]:
+    """Claims the pending submissions with the highest priority from the submissions info table, oldest first.
+
+    Claims the pending submissions with the highest priority from the submissions info table, oldest first, which are
+    not leased, or whose lease has expired, optionally filtered by workflow name. Submissions waiting for an
+    identical submission in flight are not claimed. The submissions are selected & leased by this replica in a single
+    transaction, so that each submission is claimed by one worker of one replica at a time. A submission whose
+    replica crashed is claimed again once its lease expires.
+
+    Args:
+        workflow_name: A string for the name of the workflow to filter by. If None, submissions from all workflows
+            are claimed.
+        limit: An integer for the maximum number of submissions to claim.
+
+    Returns:
+        A list of rows for the claimed submissions, by decreasing priority & in the order they were submitted.
+    """
+    # Builds the filter for the query, which uses the index on the workflow name if given.
+    current_time = time.time()
+    where_clause = "WHERE lease_expiry < ? AND leader_submission_id IS NULL"
+    parameters = [current_time]
+    if workflow_name is not None:
+        where_clause += " AND workflow_name = ?"
+        parameters.append(workflow_name)
+
+    # Fetches the available submissions with the highest priority, oldest first, & leases them.
+    with database_pool.transaction() as cursor:
+        cursor.execute(
+            f"""
+            SELECT submission_id, workflow_name, submission_time_stamp, file_extension, enqueue_time, deadline, 
+            cache_key 
+            FROM submissions_info 
+            {where_clause} 
+            ORDER BY priority DESC, sequence_number ASC 
+            LIMIT ?
+            """,
+            (*parameters, limit),
+        )
+        rows = cursor.fetchall()
+        if len(rows) > 0:
+            cursor.execute(
+                f"""
+                UPDATE submissions_info SET lease_owner = ?, lease_expiry = ? 
+                WHERE submission_id IN ({', '.join('?' * len(rows))})
+                """,
+                (
+                    replica_id,
+                    current_time + api_configuration["queue"]["lease_timeout"],
+                    *[row[0] for row in rows],
+                ),
+            )
+    return rows
+
+
+def fetch_pending_priorities() -> Dict[str, int]:
+    """Fetches the highest priority of the pending submissions of each workflow.
+
+    Fetches the highest priority of the submissions of each workflow which are not leased, or whose lease has
+    expired, & which do not wait for an identical submission in flight.
+
+    Args:
+        None.
+
+    Returns:
+        A dictionary for the highest pending priority, by workflow name. Workflows without pending submissions are
+            missing from it.
+    """
+    with database_pool.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT workflow_name, MAX(priority) FROM submissions_info 
+            WHERE lease_expiry < ? AND leader_submission_id IS NULL 
+            GROUP BY workflow_name
+            """,
+            (time.time(),),
+        )
+        return dict(cursor.fetchall())
+
+
+def select_next_workflow() -> Optional[str]:
+    """Chooses the workflow of the next batch, so that the workflows share the prediction workers by weight.
+
+    Chooses the workflow of the next batch among the workflows with pending submissions, using weighted fair queuing
+    across the workflows with the highest pending priority.
+
+    Args:
+        None.
+
+    Returns:
+        A string for the name of the chosen workflow, or None if no submissions are pending.
+    """
+    return scheduler.select_workflow(fetch_pending_priorities())
+
+
+def release_submissions(submission_ids: List[str]) -> None:
+    """Releases the leases of this replica on submissions, so that they are picked up by the prediction workers.
+
+    Releases the leases of this replica on submissions, so that they are picked up by the prediction workers of any
+    replica. Submissions leased by another replica since are left as they are.
+
+    Args:
+        submission_ids: A list of strings for the unique ids of the submissions.
+
+    Returns:
+        None.
+    """
+    if len(submission_ids) == 0:
+        return
+    with database_pool.writer() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE submissions_info SET lease_owner = NULL, lease_expiry = 0 
+            WHERE lease_owner = ? AND submission_id IN ({', '.join('?' * len(submission_ids))})
+            """,
+            (replica_id, *submission_ids),
+        )
+
+
+def complete_submissions(submission_ids: List[str]) -> int:
+    """Moves completed submissions from submissions info table to submissions completion info table.
+
+    Moves completed submissions from submissions info table to submissions completion info table, in a single
+    transaction for the whole batch. Only the submissions still leased by this replica are moved, so that a
+    submission whose lease expired, & which was claimed by another replica, is completed once by that replica. The
+    identical submissions still waiting for the completed submissions, such as the ones waiting for a failed
+    submission, are queued for prediction in the same transaction, so that none is left waiting.
+
+    Args:
+        submission_ids: A list of strings for the unique ids of the completed submissions.
+
+    Returns:
+        An integer for the number of identical submissions queued for prediction.
+    """
+    placeholders = ", ".join("?" * len(submission_ids))
+    with database_pool.transaction() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO submissions_completion_info 
+            (submission_id, workflow_name, submission_time_stamp, completion_time_stamp) 
+            SELECT submission_id, workflow_name, submission_time_stamp, ? 
+            FROM submissions_info WHERE lease_owner = ? AND submission_id IN ({placeholders})
+            """,
+            (generate_time_stamp(), replica_id, *submission_ids),
+        )
+        cursor.execute(
+            f"DELETE FROM submissions_info WHERE lease_owner = ? AND submission_id IN ({placeholders})",
+            (replica_id, *submission_ids),
+        )
+        cursor.execute(
+            f"""
+            UPDATE submissions_info SET leader_submission_id = NULL 
+            WHERE leader_submission_id IN ({placeholders}) 
+            AND leader_submission_id NOT IN (SELECT submission_id FROM submissions_info)
+            """,
+            submission_ids,
+        )
+        return cursor.rowcount
+
+
+def fetch_queue_depth() -> int:
+    """Computes the number of submissions waiting in the queue.
+
+    Computes the number of submissions waiting in the queue, across all replicas, which are not leased by a
+    prediction worker, & do not wait for an identical submission in flight.
+
+    Args:
+        None.
+
+    Returns:
+        An integer for the number of submissions waiting in the queue.
+    """
+    with database_pool.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM submissions_info 
+            WHERE lease_expiry < ? AND leader_submission_id IS NULL
+            """,
+            (time.time(),),
+        )
+        return cursor.fetchone()[0]
+
+
+def fetch_queue_depths() -> Dict[str, int]:
+    """Computes the number of submissions in the queue for each workflow.
+
+    Computes the number of submissions in the queue for each workflow, across all replicas, including the
+    submissions being predicted, but not the submissions waiting for an identical submission in flight.
+
+    Args:
+        None.
+
+    Returns:
+        A dictionary for the number of submissions in the queue, by workflow name.
+    """
+    with database_pool.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT workflow_name, COUNT(*) FROM submissions_info 
+            WHERE leader_submission_id IS NULL 
+            GROUP BY workflow_name
+            """
+        )
+        return dict(cursor.fetchall())
+
+
+def claim_followers(leader_submission_ids: List[str]) -> List[Tuple]:
+    """Claims the identical submissions waiting for completed submissions, from any replica.
+
+    Claims the identical submissions waiting for completed submissions, whichever replica they were submitted to, so
+    that they are completed with the same output. The submissions are selected & leased by this replica in a single
+    transaction, so that a submission being cancelled is not claimed.
+
+    Args:
+        leader_submission_ids: A list of strings for the unique ids of the completed submissions.
+
+    Returns:
+        A list of rows of (submission_id, leader_submission_id, enqueue_time) for the claimed submissions.
+    """
+    if len(leader_submission_ids) == 0:
+        return list()
+    current_time = time.time()
+    with database_pool.transaction() as cursor:
+        cursor.execute(
+            f"""
+            SELECT submission_id, leader_submission_id, enqueue_time FROM submissions_info 
+            WHERE leader_submission_id IN ({', '.join('?' * len(leader_submission_ids))}) AND lease_expiry < ?
+            """,
+            (*leader_submission_ids, current_time),
+        )
+        rows = cursor.fetchall()
+        if len(rows) > 0:
+            cursor.execute(
+                f"""
+                UPDATE submissions_info SET lease_owner = ?, lease_expiry = ? 
+                WHERE submission_id IN ({', '.join('?' * len(rows))})
+                """,
+                (
+                    replica_id,
+                    current_time + api_configuration["queue"]["lease_timeout"],
+                    *[row[0] for row in rows],
+                ),
+            )
+    return rows
+
+
+def renew_leases() -> int:
+    """Extends the leases held by this replica on the submissions it is working on.
+
+    Extends the leases held by this replica on the submissions it is working on, by the lease timeout.
+
+    Args:
+        None.
+
+    Returns:
+        An integer for the number of leases extended.
+    """
+    with database_pool.writer() as cursor:
+        cursor.execute(
+            "UPDATE submissions_info SET lease_expiry = ? WHERE lease_owner = ?",
+            (time.time() + api_configuration["queue"]["lease_timeout"], replica_id),
+        )
+        return cursor.rowcount
+
+
+def publish_partial_result(context: WorkflowContext) -> None:
+    """Stores the result of the stages published by a workflow for a submission, & wakes the requests waiting for it.
+
+    Stores the result of the stages published by a workflow for a submission, & wakes the requests waiting for it.
+
+    Args:
+        context: A WorkflowContext object for the submission.
+
+    Returns:
+        None.
+    """
+    partial_result_store.publish(context.submission_id, context.stages, context.output)
+    completion_notifier.notify([context.submission_id])
+
+
+def fail_submissions(rows: List[Tuple], message: str) -> None:
+    """Completes claimed submissions with a failure, without predicting them.
+
+    Completes claimed submissions with a failure, without predicting them, & wakes the requests waiting for them.
+    The identical submissions which waited for them are queued for prediction, as they may still be predicted.
+
+    Args:
+        rows: A list of rows for the claimed submissions which failed.
+        message: A string for the reason of the failure.
+
+    Returns:
+        None.
+    """
+    submission_ids = [row[0] for row in rows]
+    for submission_id, workflow_name, _, _, _, _, _ in rows:
+        save_json_file(
+            {
+                "submission_id": submission_id,
+                "workflow_id": workflow_name,
+                "status": "Failure",
+                "message": message,
+            },
+            submission_id,
+            "data/out",
+            compact=True,
+        )
+    n_queued_submissions = complete_submissions(submission_ids)
+    completion_notifier.notify(submission_ids)
+    if n_queued_submissions > 0:
+        submission_signal.set()
+
+
+def predict_batch(rows: List[Tuple], stop_event: threading.Event) -> None:
+    """Predicts a batch of claimed submissions of the same workflow, & completes them.
+
+    Predicts a batch of claimed submissions of the same workflow, & completes them. Submissions whose deadline has
+    passed, or whose image could not be loaded, are completed with a failure instead of being predicted.
+
+    Args:
+        rows: A list of rows for the claimed submissions.
+        stop_event: An event which is set when the worker should stop.
+
+    Returns:
+        None.
+    """
+    # Completes the submissions whose deadline has passed with a failure, without predicting them.
+    claim_time = time.time()
+    expired_rows = [row for row in rows if row[5] is not None and row[5] < claim_time]
+    if len(expired_rows) > 0:
+        fail_submissions(
+            expired_rows, "Deadline exceeded before the submission was predicted."
+        )
+        rows = [row for row in rows if row not in expired_rows]
+        if len(rows) == 0:
+            return
+
+    # Loads the models of the workflow if they are not loaded yet. If they could not be loaded, releases the
+    # submissions back to the queue, & waits before claiming again.
+    workflow_name = rows[0][1]
+    try:
+        workflow_loader.load(workflow_name)
+    except WorkflowUnavailableError:
+        release_submissions([row[0] for row in rows])
+        stop_event.wait(api_configuration["startup"]["retry_interval"])
+        return
+
+    # Generates parameters required for workflow result, for each submission in the batch. A submission whose image
+    # could not be loaded, such as a truncated image, is completed with a failure without failing the batch.
+    uploaded_data_directory_path = check_directory_path_existence("data/in")
+    contexts, loaded_rows = list(), list()
+    for row in rows:
+        submission_id, _, _, file_extension, _, _, _ = row
+        try:
+            contexts.append(
+                workflows[workflow_name].generate_prediction_parameters(
+                    submission_id,
+                    f"{uploaded_data_directory_path}/{submission_id}.{file_extension}",
+                )
+            )
+            loaded_rows.append(row)
+        except Exception as e:
+            fail_submissions([row], f"Image could not be loaded: {str(e)}")
+    rows = loaded_rows
+    if len(rows) == 0:
+        return
+
+    # Records how long each submission waited in the queue.
+    for context, row in zip(contexts, rows):
+        context.output["queue_wait_time"] = f"{(claim_time - row[4]):.3f} sec."
+        queue_wait_seconds.observe(claim_time - row[4], workflow=workflow_name)
+        context.set_stage_listener(publish_partial_result)
+
+    # Executes workflow to complete the prediction task for the batch, & records its execution time for the
+    # scheduler.
+    execution_start_time = time.time()
+    with in_flight_jobs.track_in_progress(len(contexts), workflow=workflow_name):
+        with workflow_execution_seconds.time(workflow=workflow_name):
+            workflows[workflow_name].workflow_batch_prediction(contexts)
+    scheduler.record_execution_time(workflow_name, time.time() - execution_start_time)
+
+    # Caches the successful outputs, & completes the identical submissions which waited for them, in any replica,
+    # with the same output & their own queue wait time, until the batch was claimed.
+    completed_submission_ids = [row[0] for row in rows]
+    successful_outputs = dict()
+    for context, row in zip(contexts, rows):
+        if context.output.get("status") != "Success":
+            continue
+        if row[6] is not None:
+            prediction_cache.add(row[6], context.output)
+        successful_outputs[context.submission_id] = context.output
+    for follower_submission_id, leader_submission_id, enqueue_time in claim_followers(
+        list(successful_outputs)
+    ):
+        save_json_file(
+            {
+                **successful_outputs[leader_submission_id],
+                "submission_id": follower_submission_id,
+                "queue_wait_time": f"{max(0.0, claim_time - enqueue_time):.3f} sec.",
+            },
+            follower_submission_id,
+            "data/out",
+            compact=True,
+        )
+        completed_submission_ids.append(follower_submission_id)
+
+    # Moves the completed submissions to submissions completion info table, which also queues the submissions which
+    # waited for a failed submission.
+    n_queued_submissions = complete_submissions(completed_submission_ids)
+    admission_controller.record_completions(len(completed_submission_ids))
+
+    # Drops the partial results of the completed submissions, & wakes the requests waiting for them.
+    partial_result_store.discard(completed_submission_ids)
+    completion_notifier.notify(completed_submission_ids)
+    if n_queued_submissions > 0:
+        submission_signal.set()
+
+
+def release_failed_batch(rows: List[Tuple]) -> None:
+    """Releases a claimed batch whose prediction failed unexpectedly back to the queue.
+
+    Releases a claimed batch whose prediction failed unexpectedly back to the queue, so that no submission stays
+    leased by this replica without being worked on. The identical submissions waiting for the batch keep waiting.
+    Submissions of the batch which were completed before the failure are left as they are.
+
+    Args:
+        rows: A list of rows for the claimed submissions of the batch.
+
+    Returns:
+        None.
+    """
+    submission_ids = [row[0] for row in rows]
+    release_submissions(submission_ids)
+    partial_result_store.discard(submission_ids)
+    submission_signal.set()
+
+
+def prediction(stop_event: threading.Event) -> None:
+    """Performs prediction for the uploaded input based on the workflow name.
+
+    Performs prediction for the uploaded input based on the workflow name. Pending submissions of the same workflow are
+    grouped into batches, so that each model is called once per batch. The workflow of each batch is chosen by
+    weighted fair queuing, so that a burst of a heavy workflow does not delay the other workflows. Several workers
+    can run this function concurrently, in this & other replicas, as each batch is leased before it is executed.
+    When the queue is empty, waits until submit_image signals a new submission. The submissions info table remains
+    the durable record of the queue, so submissions of a crashed replica are picked up once their leases expire.
+    Results of the stages published by multi-stage workflows are kept until the submissions are completed. If a
+    batch fails unexpectedly, its submissions are released back to the queue, & the worker keeps running.
+
+    Args:
+        stop_event: An event which is set when the worker should stop.
+
+    Returns:
+        None.
+    """
+    while not stop_event.is_set():
+        # Claims the next batch of submissions uploaded to the API. Reads the number of signals sent first, so that a
+        # submission queued while the queue is checked still wakes this worker.
+        sequence_number = submission_signal.sequence_number()
+        rows = batcher.next_batch(claim_pending_submissions, select_next_workflow)
+
+        # If no new image has been uploaded, then waits until a submission is signalled, or the idle timeout.
+        if len(rows) == 0:
+            submission_signal.wait(
+                sequence_number, api_configuration["dispatch"]["idle_timeout"]
+            )
+            continue
+
+        # Predicts the batch. If it fails unexpectedly, releases its submissions instead of leaving them leased, &
+        # waits before claiming again.
+        try:
+            predict_batch(rows, stop_event)
+        except Exception as e:
+            print(f"Failed to predict a batch of {rows[0][1]}: {e}")
+            print()
+            release_failed_batch(rows)
+            stop_event.wait(api_configuration["startup"]["retry_interval"])
+        finally:
+            batcher.complete_batch(rows)
+
+
+def convert_mask_format(encoded_mask: Dict[str, Any], mask_format: str) -> Any:
+    """Converts an encoded segmentation mask to the requested format.
+
+    Converts an encoded segmentation mask to the requested format. The mask is returned as it is if it is already
+    in the requested format.
+
+    Args:
+        encoded_mask: A dictionary for the format, shape & data of the encoded mask.
+        mask_format: A string for the format in which the mask should be returned.
+
+    Returns:
+        A dictionary for the mask encoded in the requested format, or a nested list for the 'list' format.
+    """
+    if isinstance(encoded_mask, dict) and encoded_mask["format"] == mask_format:
+        return encoded_mask
+    return encode_mask(decode_mask(encoded_mask), mask_format)
+
+
+def format_segmentation_result(
+    prediction: Dict[str, Any], output_options: Dict[str, str]
+) -> None:
+    """Replaces the segmentation mask in a prediction with the requested mask output.
+
+    Replaces the segmentation mask in a prediction with the requested mask output. The mask is converted to the
+    requested format, & its summary of area, bounding box, centroid & contours is added if requested. The summary is
+    stored with the result by the prediction worker, & only computed here for results stored without one.
+
+    Args:
+        prediction: A dictionary for the prediction in the result, which contains the encoded mask as 'image'.
+        output_options: A dictionary for the requested mask format & mask output.
+
+    Returns:
+        None.
+    """
+    encoded_mask = prediction.pop("image")
+    summary = prediction.pop("summary", None)
+
+    # Adds the summary of the mask, whose size does not depend on the resolution of the mask.
+    if output_options["mask_output"] in ("summary", "both"):
+        if summary is None:
+            summary = summarize_mask(
+                decode_mask(encoded_mask),
+                api_configuration["results"]["summary"]["max_contours"],
+                api_configuration["results"]["summary"]["max_contour_points"],
+            )
+        prediction["summary"] = summary
+
+    # Adds the mask in the requested format.
+    if output_options["mask_output"] in ("mask", "both"):
+        prediction["image"] = convert_mask_format(
+            encoded_mask, output_options["mask_format"]
+        )
+
+
+def fetch_submission_status(submission_id: str) -> str:
+    """Checks if a submission is completed, still in progress, or does not exist.
+
+    Checks if a submission is completed, still in progress, or does not exist. Both tables are checked by a single
+    statement, which reads one snapshot of the database, so that a submission moved between the tables by a
+    prediction worker is not reported as missing.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+
+    Returns:
+        A string for the status of the submission, which is one of 'completed', 'in_progress' or 'missing'.
+    """
+    # Checks if prediction for submission ID is already completed, else if it is still in progress.
+    with database_pool.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT 
+                EXISTS (SELECT 1 FROM submissions_completion_info WHERE submission_id = ?), 
+                EXISTS (SELECT 1 FROM submissions_info WHERE submission_id = ?)
+            """,
+            (submission_id, submission_id),
+        )
+        is_completed, is_in_progress = cursor.fetchone()
+    if is_completed:
+        return "completed"
+    if is_in_progress:
+        return "in_progress"
+    return "missing"
+
+
+def wait_for_completion(
+    submission_id: str, wait_time: float, seen_stages: Optional[int] = None
+) -> str:
+    """Waits until a submission is completed, or until the wait time has elapsed.
+
+    Waits until a submission is completed, or until the wait time has elapsed. The request thread is woken by the
+    prediction worker which completes the submission, if it runs in this replica, else the status is checked again
+    every poll interval. If the number of stages already seen by the client is given, also returns as soon as the
+    workflow publishes a later stage.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+        wait_time: A float for the maximum number of seconds to wait.
+        seen_stages: An integer for the number of finished stages already seen by the client, or None to wait
+            only for the completion.
+
+    Returns:
+        A string for the status of the submission, which is one of 'completed', 'in_progress' or 'missing'.
+    """
+    # Returns the current status if the client does not want to wait.
+    if wait_time <= 0:
+        return fetch_submission_status(submission_id)
+
+    # Subscribes before checking the status, so that a completion in between is not missed.
+    deadline = time.time() + wait_time
+    completion_event = completion_notifier.subscribe(submission_id)
+    try:
+        while True:
+            # Returns if the submission is completed or missing, or if a stage not seen by the client is published.
+            status = fetch_submission_status(submission_id)
+            if status != "in_progress" or (
+                seen_stages is not None
+                and partial_result_store.count_finished_stages(submission_id)
+                > seen_stages
+            ):
+                return status
+
+            # Waits for the next completion or stage in this replica, or the poll interval for the other replicas,
+            # & clears the event before checking the status again.
+            remaining_time = deadline - time.time()
+            if remaining_time <= 0:
+                return status
+            if completion_event.wait(
+                min(remaining_time, api_configuration["results"]["poll_interval"])
+            ):
+                completion_event.clear()
+    finally:
+        completion_notifier.unsubscribe(submission_id, completion_event)
+
+
+def format_in_progress_result(submission_id: str) -> Dict[str, Any]:
+    """Creates the response for a submission in progress, with the result of the stages published so far.
+
+    Creates the response for a submission in progress, with the result of the stages published so far. The status
+    of each stage & the partial prediction are included only if the workflow has published a stage.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+
+    Returns:
+        A dictionary for the in-progress status & message, & the partial result if available.
+    """
+    result = {
+        "status": "In Progress",
+        "message": "Workflow is still extracting information.",
+    }
+    partial_result = partial_result_store.get(submission_id)
+    if partial_result is not None:
+        result.update(partial_result)
+    return result
+
+
+def load_result(submission_id: str, output_options: Dict[str, str]) -> Dict[str, Any]:
+    """Loads the result of a completed submission, & deletes its files.
+
+    Loads the result of a completed submission, & deletes its files.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+        output_options: A dictionary for the format & output in which segmentation masks should be returned.
+
+    Returns:
+        A dictionary for the result extracted by the workflow.
+    """
+    # Checks and retrieves the directory path for results.
+    results_directory_path = check_directory_path_existence("data/out")
+
+    # Loads the result from the JSON file.
+    result = load_json_file(submission_id, results_directory_path)
+
+    # Converts the segmentation mask in the result to the requested format & output.
+    if "image" in result.get("prediction", {}):
+        format_segmentation_result(result["prediction"], output_options)
+
+    # Deletes the JSON file after loading the result.
+    os.remove(f"{results_directory_path}/{submission_id}.json")
+
+    # Checks if the submitted file exists, and deletes it.
+    for file_extension in ("png", "jpg", "jpeg", "npy", "txt"):
+        if os.path.exists(os.path.join("data/in", f"{submission_id}.{file_extension}")):
+            os.remove(os.path.join("data/in", f"{submission_id}.{file_extension}"))
+            break
+    return result
+
+
+def parse_result_arguments(
+    max_wait_time: float,
+) -> Tuple[Dict[str, str], float, Optional[int]]:
+    """Parses & validates the query parameters used to fetch a result.
+
+    Parses & validates the query parameters used to fetch a result. The 'mask_format' & 'mask_output' parameters
+    default to the values in the API configuration, the 'wait' parameter is capped at the maximum wait time, & the
+    optional 'seen_stages' parameter is the number of finished stages already seen by the client.
+
+    Args:
+        max_wait_time: A float for the maximum number of seconds a request is allowed to wait.
+
+    Returns:
+        A tuple for the dictionary of mask format & mask output, the number of seconds to wait for the result, &
+            the number of stages seen by the client or None.
+
+    Exceptions:
+        ValueError: If the mask format, mask output, wait time or seen stages in the request is invalid.
+    """
+    # Validates the requested mask format.
+    mask_format = request.args.get(
+        "mask_format", api_configuration["results"]["mask_format"]
+    )
+    if mask_format not in MASK_FORMATS:
+        raise ValueError(
+            f"Incorrect 'mask_format' included in the request. Expected one of {MASK_FORMATS}."
+        )
+
+    # Validates the requested mask output.
+    mask_output = request.args.get(
+        "mask_output", api_configuration["results"]["mask_output"]
+    )
+    if mask_output not in MASK_OUTPUTS:
+        raise ValueError(
+            f"Incorrect 'mask_output' included in the request. Expected one of {MASK_OUTPUTS}."
+        )
+
+    # Validates the requested wait time.
+    try:
+        wait_time = float(request.args.get("wait", 0))
+    except ValueError:
+        raise ValueError("Incorrect 'wait' included in the request.")
+
+    # Validates the number of stages seen by the client, if given.
+    seen_stages = None
+    if "seen_stages" in request.args:
+        try:
+            seen_stages = int(request.args["seen_stages"])
+        except ValueError:
+            raise ValueError("Incorrect 'seen_stages' included in the request.")
+    output_options = {"mask_format": mask_format, "mask_output": mask_output}
+    return output_options, min(max(wait_time, 0.0), max_wait_time), seen_stages
+
+
+@app.route("/api/v1/fetch_result/<submission_id>", methods=["GET"])
+@cross_origin()
+def fetch_result(submission_id: str) -> Dict[str, Any]:
+    """Checks the status of the prediction, and returns it if is ready.
+
+    Checks the status of the prediction, and returns it if is ready. Segmentation masks in the result are
+    returned in the format given by the 'mask_format' query parameter ('rle', 'bitpack', 'png' or the legacy
+    'list'), or in the default format from the API configuration. The 'mask_output' query parameter selects
+    whether the mask, its summary of area, bounding box, centroid & contours, or both are returned. If the 'wait'
+    query parameter is given, the request blocks for up to that many seconds, & returns as soon as the submission
+    is completed. While a multi-stage workflow is in progress, the status of each stage & the prediction of the
+    finished stages are returned with the in-progress status, & if the 'seen_stages' query parameter is given, a
+    waiting request also returns as soon as more stages than that are finished.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+
+    Returns:
+        A dictionary which contains the status, corresponding message, and if possible the extracted document.
+    """
+    start_time = time.perf_counter()
+
+    # Validates input type.
+    if not isinstance(submission_id, str):
+        return (
+            jsonify({"status": "Failure", "message": "Invalid submission_id type."}),
+            400,
+        )
+
+    # Validates the query parameters.
+    try:
+        output_options, wait_time, seen_stages = parse_result_arguments(
+            api_configuration["results"]["max_wait_time"]
+        )
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+
+    try:
+        # Waits for the submission to be completed, if requested.
+        status = wait_for_completion(submission_id, wait_time, seen_stages)
+
+        # If submission ID doesn't exist in either table, returns an error message. If submission exists but is
+        # still in progress, returns an in-progress status, with the partial result. Else, loads and returns the
+        # result as a JSON object.
+        if status == "missing":
+            response = (
+                jsonify({"status": "Failure", "message": "Invalid submission_id."}),
+                404,
+            )
+        elif status == "in_progress":
+            response = jsonify(format_in_progress_result(submission_id)), 202
+        else:
+            response = jsonify(load_result(submission_id, output_options)), 200
+
+        # Records the latency of the request, including the long-poll wait.
+        fetch_seconds.observe(time.perf_counter() - start_time, status=status)
+        return response
+
+    except sqlite3.Error as e:
+        # Handles SQLite database errors.
+        return (
+            jsonify({"status": "Failure", "message": f"Database error: {str(e)}"}),
+            500,
+        )
+
+    except Exception as e:
+        # Handles unexpected errors.
+        return (
+            jsonify({"status": "Failure", "message": f"Unexpected error: {str(e)}"}),
+            500,
+        )
+
+
+def cancel_queued_submission(submission_id: str) -> str:
+    """Cancels a submission still waiting in the queue, by completing it with a failure.
+
+    Cancels a submission still waiting in the queue, by completing it with a failure. The submission is leased by
+    this replica in a single transaction, so that no prediction worker claims it, & its output is saved before it
+    is moved to the submissions completion info table, as done by the prediction workers. A submission waiting for
+    an identical submission in flight is cancelled as well, unless it was already claimed to be completed with the
+    output of that submission. Identical submissions which waited for the cancelled submission are queued for
+    prediction. The cancelled submission is completed rather than deleted, so that its result & the result of its
+    batch can still be fetched.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+
+    Returns:
+        A string for the status of the submission, which is one of 'cancelled', 'in_progress', 'completed' or
+            'missing'.
+    """
+    with database_pool.transaction() as cursor:
+        # Checks if the submission is queued, else if it is already completed.
+        cursor.execute(
+            "SELECT workflow_name, lease_expiry FROM submissions_info WHERE submission_id = ?",
+            (submission_id,),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            cursor.execute(
+                "SELECT 1 FROM submissions_completion_info WHERE submission_id = ?",
+                (submission_id,),
+            )
+            return "completed" if cursor.fetchone() is not None else "missing"
+
+        # Leaves the submission as it is if a prediction worker is predicting it, or completing it with the output
+        # of an identical submission.
+        workflow_name, lease_expiry = row
+        if lease_expiry >= time.time():
+            return "in_progress"
+
+        # Leases the submission to this replica, so that no prediction worker claims it while it is cancelled.
+        cursor.execute(
+            "UPDATE submissions_info SET lease_owner = ?, lease_expiry = ? WHERE submission_id = ?",
+            (
+                replica_id,
+                time.time() + api_configuration["queue"]["lease_timeout"],
+                submission_id,
+            ),
+        )
+
+    # Saves the output of the cancelled submission.
+    save_json_file(
+        {
+            "submission_id": submission_id,
+            "workflow_id": workflow_name,
+            "status": "Failure",
+            "message": "Submission was cancelled.",
+        },
+        submission_id,
+        "data/out",
+        compact=True,
+    )
+    # Moves the cancelled submission to the submissions completion info table, which also queues the identical
+    # submissions which waited for it, & wakes the prediction workers.
+    if complete_submissions([submission_id]) > 0:
+        submission_signal.set()
+    return "cancelled"
+
+
+@app.route("/api/v1/submissions/<submission_id>", methods=["DELETE"])
+@cross_origin()
+def cancel_submission(submission_id: str) -> Dict[str, Any]:
+    """Cancels a submission still waiting in the queue, so that it is not predicted.
+
+    Cancels a submission still waiting in the queue, so that it is not predicted. Submissions being predicted, or
+    already completed, cannot be cancelled. The result of a cancelled submission is a failure. Identical submissions
+    which waited for the cancelled submission are queued for prediction.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+
+    Returns:
+        A dictionary which contains the status & the corresponding message.
+    """
+    try:
+        # Cancels the submission if it is still queued, else returns why it could not be cancelled.
+        status = cancel_queued_submission(submission_id)
+        if status == "missing":
+            return (
+                jsonify({"status": "Failure", "message": "Invalid submission_id."}),
+                404,
+            )
+        elif status == "completed":
+            return (
+                jsonify(
+                    {"status": "Failure", "message": "Submission is already completed."}
+                ),
+                409,
+            )
+        elif status == "in_progress":
+            return (
+                jsonify(
+                    {
+                        "status": "Failure",
+                        "message": "Submission is being predicted, & cannot be cancelled.",
+                    }
+                ),
+                409,
+            )
+
+        # Wakes the requests waiting for the cancelled submission.
+        completion_notifier.notify([submission_id])
+        return (
+            jsonify(
+                {
+                    "status": "Success",
+                    "submission_id": submission_id,
+                    "message": "Submission cancelled.",
+                }
+            ),
+            200,
+        )
+
+    except sqlite3.Error as e:
+        # Handles SQLite database errors.
+        return (
+            jsonify({"status": "Failure", "message": f"Database error: {str(e)}"}),
+            500,
+        )
+
+    except Exception as e:
+        # Handles unexpected errors.
+        return (
+            jsonify({"status": "Failure", "message": f"Unexpected error: {str(e)}"}),
+            500,
+        )
+
+
+def count_completed_batch_submissions(batch_id: str) -> int:
+    """Counts the submissions of a batch which are completed.
+
+    Counts the submissions of a batch which are completed, with a single statement.
+
+    Args:
+        batch_id: A string for the unique id of the batch.
+
+    Returns:
+        An integer for the number of completed submissions in the batch.
+    """
+    with database_pool.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM submissions_completion_info 
+            WHERE submission_id IN (SELECT submission_id FROM submission_batches_info WHERE batch_id = ?)
+            """,
+            (batch_id,),
+        )
+        return cursor.fetchone()[0]
+
+
+@app.route("/api/v1/fetch_batch_result/<batch_id>", methods=["GET"])
+@cross_origin()
+def fetch_batch_result(batch_id: str) -> Dict[str, Any]:
+    """Checks the status of the predictions of a batch, and returns them together once all are ready.
+
+    Checks the status of the predictions of a batch, and returns them together once all are ready, in the order
+    the images were uploaded. Until then, the number of completed submissions is returned with the in-progress
+    status. The 'wait', 'mask_format' & 'mask_output' query parameters are handled as in fetch_result. The batch is
+    deleted once its results are returned. Results already fetched by their submission id are returned as failures.
+
+    Args:
+        batch_id: A string for the unique id of the batch.
+
+    Returns:
+        A dictionary which contains the status, corresponding message, and if possible the extracted documents.
+    """
+    # Validates the query parameters.
+    try:
+        output_options, wait_time, _ = parse_result_arguments(
+            api_configuration["results"]["max_wait_time"]
+        )
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+
+    try:
+        # If batch ID doesn't exist, returns an error message.
+        submission_ids = fetch_batch_submission_ids(batch_id)
+        if len(submission_ids) == 0:
+            return (
+                jsonify({"status": "Failure", "message": "Invalid batch_id."}),
+                404,
+            )
+
+        # Waits for each submission of the batch to be completed, until the deadline, if requested.
+        deadline = time.time() + wait_time
+        for submission_id in submission_ids:
+            remaining_time = deadline - time.time()
+            if remaining_time <= 0:
+                break
+            wait_for_completion(submission_id, remaining_time)
+
+        # If some submissions are still in progress, returns an in-progress status, with the number completed.
+        n_completed = count_completed_batch_submissions(batch_id)
+        if n_completed < len(submission_ids):
+            return (
+                jsonify(
+                    {
+                        "status": "In Progress",
+                        "message": "Workflow is still extracting information.",
+                        "n_completed": n_completed,
+                        "n_submissions": len(submission_ids),
+                    }
+                ),
+                202,
+            )
+
+        # Loads and returns the results as a JSON object, & deletes the batch. A result which was already fetched
+        # with its submission_id is reported as a failure, instead of failing the whole batch.
+        results_directory_path = check_directory_path_existence("data/out")
+        results = [
+            (
+                load_result(submission_id, output_options)
+                if os.path.exists(f"{results_directory_path}/{submission_id}.json")
+                else {
+                    "submission_id": submission_id,
+                    "status": "Failure",
+                    "message": "Result was already fetched.",
+                }
+            )
+            for submission_id in submission_ids
+        ]
+        delete_batch(batch_id)
+        return (
+            jsonify({"status": "Success", "batch_id": batch_id, "results": results}),
+            200,
+        )
+
+    except sqlite3.Error as e:
+        # Handles SQLite database errors.
+        return (
+            jsonify({"status": "Failure", "message": f"Database error: {str(e)}"}),
+            500,
+        )
+
+    except Exception as e:
+        # Handles unexpected errors.
+        return (
+            jsonify({"status": "Failure", "message": f"Unexpected error: {str(e)}"}),
+            500,
+        )
+
+
+def format_event(event_name: str, data: Dict[str, Any]) -> str:
+    """Formats a server-sent event.
+
+    Formats a server-sent event.
+
+    Args:
+        event_name: A string for the name of the event.
+        data: A dictionary for the data sent with the event.
+
+    Returns:
+        A string for the event in the text/event-stream format.
+    """
+    return f"event: {event_name}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.route("/api/v1/stream_result/<submission_id>", methods=["GET"])
+@cross_origin()
+def stream_result(submission_id: str) -> Response:
+    """Streams the status of the prediction as server-sent events, & the result once it is ready.
+
+    Streams the status of the prediction as server-sent events, & the result once it is ready. An 'in_progress'
+    event is sent every heartbeat interval while the workflow is running, & a 'partial' event whenever a
+    multi-stage workflow finishes a stage, followed by a single 'result', 'error' or 'timeout' event, after which
+    the stream is closed. The 'wait' query parameter sets the number of seconds
+    after which the stream times out, & 'mask_format' & 'mask_output' are handled as in fetch_result.
+
+    Args:
+        submission_id: A string for the unique id of the submission.
+
+    Returns:
+        A Response object for the stream of events.
+    """
+    # Validates the query parameters.
+    try:
+        output_options, wait_time, seen_stages = parse_result_arguments(
+            api_configuration["results"]["max_stream_time"]
+        )
+    except ValueError as e:
+        return jsonify({"status": "Failure", "message": str(e)}), 400
+    if "wait" not in request.args:
+        wait_time = api_configuration["results"]["max_stream_time"]
+    heartbeat_interval = api_configuration["results"]["heartbeat_interval"]
+
+    def generate_events():
+        """Generates the events for the stream until the submission is completed or the stream times out."""
+        deadline = time.time() + wait_time
+        n_sent_stages = seen_stages or 0
+        try:
+            while True:
+                # Waits for the submission to be completed, or to finish a stage, for up to one heartbeat interval.
+                remaining_time = deadline - time.time()
+                status = wait_for_completion(
+                    submission_id,
+                    min(heartbeat_interval, max(remaining_time, 0.0)),
+                    n_sent_stages,
+                )
+
+                # Sends the result, or the error, & closes the stream.
+                if status == "missing":
+                    yield format_event(
+                        "error",
+                        {"status": "Failure", "message": "Invalid submission_id."},
+                    )
+                    return
+                if status == "completed":
+                    yield format_event(
+                        "result", load_result(submission_id, output_options)
+                    )
+                    return
+
+                # Closes the stream if the submission is not completed before the deadline.
+                if time.time() >= deadline:
+                    yield format_event(
+                        "timeout",
+                        {
+                            "status": "In Progress",
+                            "message": "Workflow is still extracting information.",
+                        },
+                    )
+                    return
+
+                # Sends the partial result if the workflow finished a stage, else a heartbeat.
+                n_finished_stages = partial_result_store.count_finished_stages(
+                    submission_id
+                )
+                if n_finished_stages > n_sent_stages:
+                    n_sent_stages = n_finished_stages
+                    yield format_event(
+                        "partial", format_in_progress_result(submission_id)
+                    )
+                    continue
+                yield format_event(
+                    "in_progress",
+                    {
+                        "status": "In Progress",
+                        "message": "Workflow is still extracting information.",
+                    },
+                )
+        except Exception as e:
+            # Sends unexpected errors as an event, since the response status has already been sent.
+            yield format_event(
+                "error", {"status": "Failure", "message": f"Unexpected error: {str(e)}"}
+            )
+
+    return Response(
+        stream_with_context(generate_events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.route("/healthz", methods=["GET"])
+def healthz() -> Dict[str, Any]:
+    """Reports that the API process is alive.
+
+    Reports that the API process is alive, whether or not its workflows are loaded.
+
+    Args:
+        None.
+
+    Returns:
+        A dictionary for the status & the id of the replica.
+    """
+    return jsonify({"status": "ok", "replica_id": replica_id}), 200
+
+
+@app.route("/readyz", methods=["GET"])
+def readyz() -> Dict[str, Any]:
+    """Reports whether the API is ready to accept traffic, & the state of each workflow.
+
+    Reports whether the API is ready to accept traffic, & the state of each workflow. When the workflows are
+    preloaded, the API is ready as soon as its first workflow is loaded, while the others keep loading in the
+    background. When they are loaded on first use, the API is ready once started.
+
+    Args:
+        None.
+
+    Returns:
+        A dictionary for the readiness of the API & the state of each workflow, with status code 200 if ready, or
+            503 if not.
+    """
+    ready = workflow_loader.is_ready() or not api_configuration["startup"]["preload"]
+    return (
+        jsonify(
+            {
+                "status": "ready" if ready else "not_ready",
+                "workflows": workflow_loader.fetch_states(),
+            }
+        ),
+        200 if ready else 503,
+    )
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics() -> Response:
+    """Exposes the latency histograms & gauges of the API in the Prometheus text format.
+
+    Exposes the latency histograms of the stages of a prediction, & the gauges for the queue depth & the in-flight
+    jobs of this replica, in the Prometheus text format. The queue depth is read from the database when scraped.
+
+    Args:
+        None.
+
+    Returns:
+        A Response object for the exposition of the metrics.
+    """
+    queue_depth.set(fetch_queue_depth())
+    return Response(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+if __name__ == "__main__":
+    print()
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-dt",
+        "--deployment_type",
+        type=str,
+        required=True,
+        help="Type of the deployment.",
+    )
+    parser.add_argument(
+        "-t",
+        "--transport",
+        type=str,
+        choices=["rest", "grpc"],
+        default=None,
+        help="Transport used to reach TensorFlow Serving. Overrides the API configuration.",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=8100,
+        help="Port on which the API is served, so that several replicas can run on the same host.",
+    )
+    args = parser.parse_args()
+
+    # Loads the API configuration, which includes the database, serving, batching & worker parameters.
+    api_configuration = load_json_file(
+        "configuration", os.path.join(os.getcwd(), "configs", "api")
+    )
+
+    # Initializes SQLite3 databases used to track the progress of submissions to the ML showcase API.
+    initialize_databases(api_configuration["database"])
+
+    # Sets API host, & the transport used to reach the models served by TensorFlow Serving.
+    host_name = "localhost" if args.deployment_type == "dev" else "serving"
+    serving_configuration = {
+        "transport": args.transport or api_configuration["serving"]["transport"],
+        "rest_base_url": f"http://{host_name}:{api_configuration['serving']['rest_port']}",
+        "grpc_address": f"{host_name}:{api_configuration['serving']['grpc_port']}",
+        "connection": api_configuration["serving"]["connection"],
+        "circuit_breaker": api_configuration["serving"]["circuit_breaker"],
+    }
+
+    # Creates all workflows, & starts loading their models concurrently in the background unless they are loaded on
+    # first use.
+    load_workflows(serving_configuration)
+    workflow_loader = WorkflowLoader(
+        workflows,
+        api_configuration["startup"]["max_workers"],
+        api_configuration["startup"]["retry_interval"],
+    )
+    if api_configuration["startup"]["preload"]:
+        workflow_loader.start()
+
+    # Creates the cache of workflow outputs, keyed by the content of the submitted images.
+    prediction_cache = PredictionCache(api_configuration["cache"])
+
+    # Creates the scheduler, which shares the prediction workers between the workflows by weight.
+    scheduler = FairScheduler(api_configuration["scheduling"])
+
+    # Creates the admission controller, which limits the depth of the queue based on the observed drain rate.
+    admission_controller = AdmissionController(api_configuration["admission"])
+
+    # Creates the slots limiting the number of inline predictions running at once.
+    inline_prediction_slots = threading.BoundedSemaphore(
+        api_configuration["predict"]["max_concurrent"]
+    )
+
+    # Creates the batcher shared by the prediction workers.
+    batcher = SubmissionBatcher(
+        api_configuration["batching"]["max_batch_size"],
+        api_configuration["batching"]["max_wait_time"],
+        submission_signal,
+    )
+
+    # Starts the pool of prediction workers, which drain the queue concurrently.
+    worker_pool = PredictionWorkerPool(
+        prediction, api_configuration["workers"], fetch_queue_depth
+    )
+    worker_pool.start()
+
+    # Starts renewing the leases held by this replica, so that only the submissions of a crashed replica are re-run.
+    lease_renewer = LeaseRenewer(
+        renew_leases, api_configuration["queue"]["renew_interval"]
+    )
+    lease_renewer.start()
+    print(f"Started replica '{replica_id}'.")
+    print()
 
-    # Runs the app on host '0.0.0.0' and port 8100.
-    app.run(host="0.0.0.0", port=8100, threaded=True)
+    # Runs the app on host '0.0.0.0' and port 8100, or the given port.
+    app.run(host="0.0.0.0", port=args.port, threaded=True)
@@ -0,0 +1,335 @@
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import sqlite3
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager, redirect_stdout
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_PATH)
+
+import numpy as np
+
+import app
+
+from typing import Dict, Any, Iterator, List
+
+
+class SharedConnection(object):
+    """Serializes all threads on a single connection, as the API did before the connection pool."""
+
+    def __init__(self, database_path: str) -> None:
+        """Creates object attributes for the SharedConnection class.
+
+        Creates object attributes for the SharedConnection class.
+
+        Args:
+            database_path: A string for the path to the SQLite3 database file.
+
+        Returns:
+            None.
+        """
+        # Initializes class variables.
+        self.connection = sqlite3.connect(
+            database_path, timeout=5.0, check_same_thread=False, isolation_level=None
+        )
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def cursor(self) -> Iterator[sqlite3.Cursor]:
+        """Lends the cursor of the shared connection, while holding the lock."""
+        with self.lock:
+            yield self.connection.cursor()
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Cursor]:
+        """Lends the cursor of the shared connection for writes, while holding the lock."""
+        with self.cursor() as cursor:
+            yield cursor
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Runs the statements in the block as a single write transaction on the shared connection."""
+        with self.cursor() as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+
+
+def run_poller(
+    submission_ids: List[str],
+    stop_event: threading.Event,
+    think_time: float,
+    latencies: List[float],
+) -> None:
+    """Checks the status of submissions, as the fetch_result requests of polling clients do.
+
+    Checks the status of submissions, as the fetch_result requests of polling clients do, until the stop event is
+    set. Every submission checked should exist.
+
+    Args:
+        submission_ids: A list of strings for the unique ids of the submitted submissions.
+        stop_event: An event which is set when the benchmark ends.
+        think_time: A floating point value for the number of seconds between requests of a client.
+        latencies: A list to which the number of seconds taken by each check is appended.
+
+    Returns:
+        None.
+    """
+    while not stop_event.is_set():
+        submission_id = random.choice(submission_ids)
+        start_time = time.perf_counter()
+        assert app.fetch_submission_status(submission_id) != "missing"
+        latencies.append(time.perf_counter() - start_time)
+        time.sleep(think_time)
+
+
+def run_submitter(
+    stop_event: threading.Event, submission_ids: List[str], latencies: List[float]
+) -> None:
+    """Queues new submissions, as submit_image does, until the stop event is set.
+
+    Queues new submissions, as submit_image does, until the stop event is set.
+
+    Args:
+        stop_event: An event which is set when the benchmark ends.
+        submission_ids: A list to which the unique ids of the queued submissions are appended.
+        latencies: A list to which the number of seconds taken by each submission is appended.
+
+    Returns:
+        None.
+    """
+    while not stop_event.is_set():
+        submission_id = str(uuid.uuid4())
+        start_time = time.perf_counter()
+        app.insert_submission(submission_id, "workflow_000", "png", 0, None)
+        latencies.append(time.perf_counter() - start_time)
+        submission_ids.append(submission_id)
+        app.submission_signal.set()
+
+
+def run_worker(
+    stop_event: threading.Event, batch_size: int, claimed_ids: List[str]
+) -> None:
+    """Claims & completes batches of submissions, as a prediction worker does, until the queue is drained.
+
+    Claims & completes batches of submissions, as a prediction worker does, until the stop event is set & the
+    queue is empty.
+
+    Args:
+        stop_event: An event which is set when the submitters have stopped.
+        batch_size: An integer for the maximum number of submissions claimed at once.
+        claimed_ids: A list to which the unique ids of the claimed submissions are appended.
+
+    Returns:
+        None.
+    """
+    while True:
+        sequence_number = app.submission_signal.sequence_number()
+        rows = app.claim_pending_submissions(None, batch_size)
+        if len(rows) == 0:
+            if stop_event.is_set() and app.fetch_queue_depth() == 0:
+                return
+            app.submission_signal.wait(sequence_number, 0.001)
+            continue
+        claimed_ids.extend(row[0] for row in rows)
+        app.complete_submissions([row[0] for row in rows])
+
+
+def run_other_replica(
+    stop_event: threading.Event, database_path: str, hold_time: float
+) -> None:
+    """Holds the write lock of the database periodically, as the writes of another replica do.
+
+    Holds the write lock of the database for the hold time every 10 milliseconds, as the writes & checkpoints of
+    another replica sharing the database do, until the stop event is set.
+
+    Args:
+        stop_event: An event which is set when the benchmark ends.
+        database_path: A string for the path to the SQLite3 database file.
+        hold_time: A floating point value for the number of seconds the write lock is held.
+
+    Returns:
+        None.
+    """
+    connection = sqlite3.connect(database_path, timeout=5.0, isolation_level=None)
+    while not stop_event.is_set():
+        connection.execute("BEGIN IMMEDIATE")
+        time.sleep(hold_time)
+        connection.execute("COMMIT")
+        time.sleep(0.01)
+    connection.close()
+
+
+def benchmark_layer(
+    name: str,
+    database_layer: Any,
+    n_pollers: int,
+    hold_time: float,
+    args: argparse.Namespace,
+) -> Dict[str, Any]:
+    """Runs concurrent pollers, submitters & workers through a database access layer, & checks the results.
+
+    Runs concurrent pollers, submitters & workers through a database access layer for the duration of the
+    benchmark, then drains the queue, & checks that every submission was claimed exactly once & completed.
+
+    Args:
+        name: A string for the name of the access layer.
+        database_layer: An object for the access layer, which provides cursor, writer & transaction context
+            managers.
+        n_pollers: An integer for the number of concurrent polling clients.
+        hold_time: A floating point value for the number of seconds another replica holds the write lock, or 0.
+        args: An object for the parsed arguments of the benchmark.
+
+    Returns:
+        A dictionary for the throughput & 99th percentile latency of status checks & submissions, & the results
+            of the checks.
+    """
+    app.database_pool = database_layer
+    with database_layer.writer() as cursor:
+        cursor.execute("DELETE FROM submissions_info")
+        cursor.execute("DELETE FROM submissions_completion_info")
+
+    # Queues the first submissions, so that the pollers have submissions to check.
+    submission_ids = [str(uuid.uuid4()) for _ in range(100)]
+    for submission_id in submission_ids:
+        app.insert_submission(submission_id, "workflow_000", "png", 0, None)
+
+    # Starts the pollers, submitters & workers, & the writer of another replica if requested.
+    read_latencies, submit_latencies, claimed_ids = list(), list(), list()
+    stop_event, drain_event = threading.Event(), threading.Event()
+    threads = [
+        threading.Thread(
+            target=run_poller,
+            args=(list(submission_ids), stop_event, args.think_time, read_latencies),
+        )
+        for _ in range(n_pollers)
+    ]
+    threads += [
+        threading.Thread(
+            target=run_submitter, args=(stop_event, submission_ids, submit_latencies)
+        )
+        for _ in range(args.n_submitters)
+    ]
+    if hold_time > 0:
+        threads.append(
+            threading.Thread(
+                target=run_other_replica,
+                args=(stop_event, "ml_showcase_db.sqlite3", hold_time),
+            )
+        )
+    workers = [
+        threading.Thread(
+            target=run_worker, args=(drain_event, args.batch_size, claimed_ids)
+        )
+        for _ in range(args.n_workers)
+    ]
+    for thread in threads + workers:
+        thread.start()
+    time.sleep(args.duration)
+    stop_event.set()
+    for thread in threads:
+        thread.join()
+    drain_event.set()
+    for thread in workers:
+        thread.join()
+
+    # Checks that every submission was claimed once, & moved to the completion table.
+    with database_layer.cursor() as cursor:
+        cursor.execute("SELECT COUNT(*) FROM submissions_info")
+        n_pending = cursor.fetchone()[0]
+        cursor.execute("SELECT submission_id FROM submissions_completion_info")
+        completed_ids = {row[0] for row in cursor.fetchall()}
+    return {
+        "layer": name,
+        "n_pollers": n_pollers,
+        "other_replica_hold_ms": hold_time * 1000,
+        "reads_per_second": len(read_latencies) / args.duration,
+        "read_p99_ms": float(np.percentile(read_latencies, 99)) * 1000,
+        "submissions_per_second": (len(submission_ids) - 100) / args.duration,
+        "submission_p99_ms": float(np.percentile(submit_latencies, 99)) * 1000,
+        "claimed_once": sorted(claimed_ids) == sorted(submission_ids),
+        "all_completed": n_pending == 0 and completed_ids == set(submission_ids),
+    }
+
+
+if __name__ == "__main__":
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=2.0,
+        help="Number of seconds each scenario runs for.",
+    )
+    parser.add_argument(
+        "-t",
+        "--think_time",
+        type=float,
+        default=0.001,
+        help="Number of seconds between the requests of a polling client.",
+    )
+    parser.add_argument(
+        "-s", "--n_submitters", type=int, default=2, help="Number of submitters."
+    )
+    parser.add_argument(
+        "-w", "--n_workers", type=int, default=2, help="Number of workers."
+    )
+    parser.add_argument(
+        "-b", "--batch_size", type=int, default=8, help="Batch size of the workers."
+    )
+    parser.add_argument(
+        "-c",
+        "--check",
+        action="store_true",
+        help="Exits with a non-zero status unless every submission was claimed once & completed in every scenario.",
+    )
+    args = parser.parse_args()
+
+    # Creates the tables in a temporary database, keeping stdout for the results, & compares both access layers
+    # with & without another replica writing to the database.
+    results = list()
+    with tempfile.TemporaryDirectory() as directory_path:
+        os.chdir(directory_path)
+        app.api_configuration = {"queue": {"lease_timeout": 30}}
+        with redirect_stdout(sys.stderr):
+            app.initialize_databases(
+                {
+                    "path": "ml_showcase_db.sqlite3",
+                    "pool_size": 64,
+                    "busy_timeout": 5.0,
+                }
+            )
+        layers = [
+            ("shared_connection", SharedConnection("ml_showcase_db.sqlite3")),
+            ("connection_pool", app.database_pool),
+        ]
+        for hold_time in (0.0, 0.005):
+            for n_pollers in (8, 32):
+                for name, database_layer in layers:
+                    results.append(
+                        benchmark_layer(
+                            name, database_layer, n_pollers, hold_time, args
+                        )
+                    )
+
+    # Prints the results as JSON, so that runs can be compared.
+    print(json.dumps(results, indent=4))
+
+    # Fails the check if a submission was claimed more than once, or left incomplete, in any scenario.
+    if args.check and not all(
+        result["claimed_once"] and result["all_completed"] for result in results
+    ):
+        print("Check failed.", file=sys.stderr)
+        sys.exit(1)
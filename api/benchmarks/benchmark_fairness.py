@@ -0,0 +1,486 @@
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_PATH)
+
+from PIL import Image
+import numpy as np
+import requests
+
+from typing import Dict, Any, List
+
+# Shape of the random images submitted to each workflow, similar to the sample images of the frontends.
+IMAGE_SHAPES = {"workflow_000": (64, 64), "workflow_001": (256, 256, 3)}
+
+
+def parse_weights(weights: str) -> Dict[str, float]:
+    """Parses the scheduling weights of the workflows.
+
+    Parses the scheduling weights of the workflows, given as comma separated '<workflow_name>=<weight>' pairs.
+
+    Args:
+        weights: A string for the weights, for example 'workflow_000=4,workflow_001=1'.
+
+    Returns:
+        A dictionary for the weight of each workflow name.
+    """
+    parsed_weights = dict()
+    for pair in weights.split(","):
+        workflow_name, weight = pair.split("=")
+        assert (
+            workflow_name in IMAGE_SHAPES
+        ), f"Workflow '{workflow_name}' should be one of {sorted(IMAGE_SHAPES)}."
+        parsed_weights[workflow_name] = float(weight)
+    return parsed_weights
+
+
+def create_configuration(directory_path: str, args: argparse.Namespace) -> None:
+    """Copies the configuration files into the working directory of the API, & adjusts them for the run.
+
+    Copies the configuration files into the working directory of the API, & adjusts them so that the API reaches the
+    fake TensorFlow Serving over REST, predicts every submission instead of serving it from the cache, admits the
+    whole flood into the queue, & schedules the workflows with the given weights.
+
+    Args:
+        directory_path: A string for the working directory of the API.
+        args: An object for the parsed arguments of the benchmark.
+
+    Returns:
+        None.
+    """
+    shutil.copytree(
+        os.path.join(BASE_PATH, "configs"), os.path.join(directory_path, "configs")
+    )
+    configuration_file_path = os.path.join(
+        directory_path, "configs", "api", "configuration.json"
+    )
+    with open(configuration_file_path) as configuration_file:
+        api_configuration = json.load(configuration_file)
+    api_configuration["serving"]["transport"] = "rest"
+    api_configuration["serving"]["rest_port"] = args.serving_port
+    api_configuration["cache"]["enabled"] = False
+    api_configuration["admission"]["max_queue_depth"] = 1000000
+    api_configuration["admission"]["max_workflow_queue_depth"] = dict()
+    api_configuration["scheduling"]["weights"] = parse_weights(args.weights)
+    with open(configuration_file_path, "w") as configuration_file:
+        json.dump(api_configuration, configuration_file, indent=2)
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    """Waits until the API is ready to accept traffic.
+
+    Waits until the API is ready to accept traffic, which it reports on '/readyz' once its first workflow
+    is loaded.
+
+    Args:
+        base_url: A string for the URL of the API.
+        process: A subprocess.Popen object for the process of the API.
+        timeout: A floating point value for the maximum number of seconds to wait.
+
+    Returns:
+        None.
+
+    Exceptions:
+        RuntimeError: If the API exits before answering.
+        TimeoutError: If the API does not answer before the timeout.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API at {base_url} exited while starting.")
+        try:
+            if requests.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"API at {base_url} did not start in {timeout} sec.")
+
+
+def generate_image(workflow_name: str, seed: int) -> bytes:
+    """Generates a random PNG image for a workflow.
+
+    Generates a random PNG image with the shape of the images submitted to the workflow.
+
+    Args:
+        workflow_name: A string for the name of the workflow.
+        seed: An integer for the seed of the random pixels.
+
+    Returns:
+        A bytes object for the content of the PNG image.
+    """
+    pixels = np.random.default_rng(seed).integers(
+        0, 256, IMAGE_SHAPES[workflow_name], dtype=np.uint8
+    )
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def run_flood(
+    base_url: str,
+    images: List[bytes],
+    rate: float,
+    batch_size: int,
+    stop_time: float,
+    counts: Dict[str, int],
+) -> None:
+    """Submits heavy workflow images in bulk at a fixed rate without waiting for their results, until the stop time.
+
+    Submits 'workflow_001' images in bulk submissions at a fixed rate without waiting for their results, as an
+    open-loop client does, so that a backlog of the heavy workflow builds up in the queue. Bulk submissions keep the
+    cost of the flood's requests to the API low. The number of submissions accepted & rejected is added to the
+    counts.
+
+    Args:
+        base_url: A string for the URL of the API.
+        images: A list of bytes objects for the images submitted in turn.
+        rate: A floating point value for the number of submissions per second.
+        batch_size: An integer for the number of images in each bulk submission.
+        stop_time: A floating point value for the time after which no more images are submitted.
+        counts: A dictionary for the number of submissions accepted & rejected.
+
+    Returns:
+        None.
+    """
+    index = 0
+    next_time = time.time()
+    while time.time() < stop_time:
+        response = requests.post(
+            f"{base_url}/api/v1/submit_images/",
+            files=[
+                (
+                    "images",
+                    (f"{index + offset}.png", images[(index + offset) % len(images)]),
+                )
+                for offset in range(batch_size)
+            ],
+            data={"workflow_name": "workflow_001"},
+        )
+        counts["accepted" if response.status_code == 200 else "rejected"] += batch_size
+        index += batch_size
+        next_time += batch_size / rate
+        time.sleep(max(next_time - time.time(), 0))
+
+
+def run_probe(
+    base_url: str,
+    seed: int,
+    stop_time: float,
+    timeout: float,
+    records: List[Dict[str, Any]],
+) -> None:
+    """Submits light workflow images & long-polls for their results one after another, until the stop time.
+
+    Submits a 'workflow_000' image, & long-polls for its result before submitting the next one, as a closed-loop
+    client does, until the stop time. The latencies of each submission are appended to the records.
+
+    Args:
+        base_url: A string for the URL of the API.
+        seed: An integer for the seed of the random images.
+        stop_time: A floating point value for the time after which no more images are submitted.
+        timeout: A floating point value for the maximum number of seconds to wait for each result.
+        records: A list to which a dictionary for the latencies of each submission is appended.
+
+    Returns:
+        None.
+    """
+    index = 0
+    while time.time() < stop_time:
+        image = generate_image("workflow_000", seed * 1000000 + index)
+        index += 1
+
+        # Submits the image.
+        start_time = time.time()
+        response = requests.post(
+            f"{base_url}/api/v1/submit_image/",
+            files={"image": (f"{index}.png", image)},
+            data={"workflow_name": "workflow_000"},
+        )
+        if response.status_code != 200:
+            records.append({"start_time": start_time, "ok": False})
+            continue
+        submission_id = response.json()["submission_id"]
+
+        # Long-polls for the result, until it is completed or the timeout has elapsed.
+        deadline = start_time + timeout
+        result = None
+        while time.time() < deadline:
+            response = requests.get(
+                f"{base_url}/api/v1/fetch_result/{submission_id}",
+                params={"wait": min(5, max(deadline - time.time(), 0))},
+            )
+            if response.status_code == 200:
+                result = response.json()
+                break
+            if response.status_code != 202:
+                break
+        end_time = time.time()
+        if result is None or result.get("status") != "Success":
+            records.append({"start_time": start_time, "ok": False})
+            continue
+        records.append(
+            {
+                "start_time": start_time,
+                "ok": True,
+                "end_to_end": end_time - start_time,
+                "queue_wait": float(result["queue_wait_time"].split()[0]),
+            }
+        )
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Computes the latency percentiles of the light workflow submissions.
+
+    Computes the p50, p95, p99 & maximum latencies in milliseconds of the light workflow submissions, end to end &
+    in the queue.
+
+    Args:
+        records: A list of dictionaries for the latencies of each submission.
+
+    Returns:
+        A dictionary for the number of submissions & the latency percentiles.
+    """
+    completed = [record for record in records if record["ok"]]
+    summary = {
+        "n_submissions": len(records),
+        "n_completed": len(completed),
+        "n_failed": len(records) - len(completed),
+    }
+    for stage in ["end_to_end", "queue_wait"]:
+        latencies = [record[stage] * 1000 for record in completed]
+        summary[f"{stage}_ms"] = {
+            **{
+                f"p{percentile}": (
+                    float(np.percentile(latencies, percentile)) if latencies else None
+                )
+                for percentile in [50, 95, 99]
+            },
+            "max": max(latencies) if latencies else None,
+        }
+    return summary
+
+
+def fetch_queue_depth(base_url: str) -> int:
+    """Fetches the number of submissions waiting in the queue from the metrics of the API.
+
+    Fetches the number of submissions waiting in the queue from the metrics of the API.
+
+    Args:
+        base_url: A string for the URL of the API.
+
+    Returns:
+        An integer for the number of submissions waiting in the queue.
+    """
+    for line in requests.get(f"{base_url}/metrics").text.splitlines():
+        if line.startswith("ml_showcase_queue_depth "):
+            return int(float(line.split()[1]))
+    return 0
+
+
+def run_benchmark(directory_path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Runs the API against the fake TensorFlow Serving, & floods it with the heavy workflow while probing the light one.
+
+    Runs the fake TensorFlow Serving REST endpoints & the API in a temporary working directory. The flood of
+    'workflow_001' submissions starts first, so that a backlog builds up during the warmup, & the closed-loop
+    'workflow_000' clients are measured while the flood goes on.
+
+    Args:
+        directory_path: A string for the working directory of the API.
+        args: An object for the parsed arguments of the benchmark.
+
+    Returns:
+        A dictionary for the settings of the run, the latencies of the light workflow, & the size of the flood.
+    """
+    create_configuration(directory_path, args)
+    processes: List[subprocess.Popen] = list()
+    log_file = open(os.path.join(directory_path, "benchmark.log"), "w")
+    base_url = f"http://localhost:{args.port}"
+    try:
+        # Starts the fake TensorFlow Serving REST endpoints, & the API.
+        processes.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.join(
+                        BASE_PATH, "src", "serving", "fake_prediction_service.py"
+                    ),
+                    "--transport",
+                    "rest",
+                    "--port",
+                    str(args.serving_port),
+                    "--latency",
+                    str(args.latency),
+                    "--item_latency",
+                    str(args.item_latency),
+                ],
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+        )
+        processes.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.join(BASE_PATH, "app.py"),
+                    "--deployment_type",
+                    "dev",
+                    "--port",
+                    str(args.port),
+                ],
+                cwd=directory_path,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+        )
+        wait_until_ready(base_url, processes[1], 120)
+
+        # Starts the flood, & the light workflow clients once the warmup has built up a backlog.
+        flood_images = [generate_image("workflow_001", seed) for seed in range(16)]
+        counts = {"accepted": 0, "rejected": 0}
+        records: List[Dict[str, Any]] = list()
+        measure_time = time.time() + args.warmup
+        stop_time = measure_time + args.duration
+        threads = [
+            threading.Thread(
+                target=run_flood,
+                args=(
+                    base_url,
+                    flood_images,
+                    args.flood_rate,
+                    args.flood_batch_size,
+                    stop_time,
+                    counts,
+                ),
+            )
+        ]
+        threads[0].start()
+        time.sleep(args.warmup)
+        backlog_start = fetch_queue_depth(base_url)
+        threads.extend(
+            threading.Thread(
+                target=run_probe,
+                args=(base_url, index + 1, stop_time, args.timeout, records),
+            )
+            for index in range(args.n_clients)
+        )
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        backlog_end = fetch_queue_depth(base_url)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        log_file.close()
+
+    return {
+        "weights": parse_weights(args.weights),
+        "n_clients": args.n_clients,
+        "flood_rate": args.flood_rate,
+        "flood_batch_size": args.flood_batch_size,
+        "duration": args.duration,
+        "latency": args.latency,
+        "item_latency": args.item_latency,
+        "flood": {
+            **counts,
+            "backlog_at_measure_start": backlog_start,
+            "backlog_at_end": backlog_end,
+        },
+        "workflow_000": summarize(records),
+    }
+
+
+if __name__ == "__main__":
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-w",
+        "--weights",
+        type=str,
+        default="workflow_000=4,workflow_001=1",
+        help="Scheduling weight of each workflow, as comma separated '<workflow_name>=<weight>' pairs.",
+    )
+    parser.add_argument(
+        "-c",
+        "--n_clients",
+        type=int,
+        default=2,
+        help="Number of concurrent clients of the light workflow.",
+    )
+    parser.add_argument(
+        "-fr",
+        "--flood_rate",
+        type=float,
+        default=30.0,
+        help="Number of heavy workflow submissions per second.",
+    )
+    parser.add_argument(
+        "-fb",
+        "--flood_batch_size",
+        type=int,
+        default=16,
+        help="Number of heavy workflow images in each bulk submission.",
+    )
+    parser.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=20.0,
+        help="Number of seconds the light workflow submissions are measured for.",
+    )
+    parser.add_argument(
+        "-wu",
+        "--warmup",
+        type=float,
+        default=5.0,
+        help="Number of seconds the flood runs for before the light workflow is measured.",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.02,
+        help="Number of seconds each prediction of the fake TensorFlow Serving takes.",
+    )
+    parser.add_argument(
+        "-il",
+        "--item_latency",
+        type=float,
+        default=0.02,
+        help="Number of seconds added to each prediction for each input in the batch.",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Maximum number of seconds to wait for each result.",
+    )
+    parser.add_argument("-p", "--port", type=int, default=8140, help="Port of the API.")
+    parser.add_argument(
+        "-sp",
+        "--serving_port",
+        type=int,
+        default=8531,
+        help="Port of the fake TensorFlow Serving REST endpoints.",
+    )
+    args = parser.parse_args()
+
+    # Runs the API in a temporary working directory, which holds its database & data directory.
+    with tempfile.TemporaryDirectory() as directory_path:
+        result = run_benchmark(directory_path, args)
+
+    # Prints the results as JSON, so that runs can be compared.
+    print(json.dumps(result, indent=4))
@@ -0,0 +1,157 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_PATH)
+
+from PIL import Image
+import numpy as np
+
+from src.utils import validate_image_header, load_image
+
+from typing import Callable, Dict, Any
+
+
+def time_function(function: Callable[[], Any], n_iterations: int) -> float:
+    """Computes the median CPU time taken by a function over a number of iterations.
+
+    Computes the median CPU time taken by a function over a number of iterations.
+
+    Args:
+        function: A function which takes no arguments.
+        n_iterations: An integer for the number of times the function is called.
+
+    Returns:
+        A floating point value for the median number of milliseconds of CPU time taken by the function.
+    """
+    durations = list()
+    for _ in range(n_iterations):
+        start_time = time.process_time()
+        function()
+        durations.append(time.process_time() - start_time)
+    return float(np.median(durations)) * 1000
+
+
+def save_legacy(image_content: bytes, directory_path: str) -> None:
+    """Saves an upload as the submit path did before, by decoding it & re-encoding it as a PNG image.
+
+    Saves an upload as the submit path did before, by decoding it & re-encoding it as a PNG image.
+
+    Args:
+        image_content: A bytes object for the content of the uploaded file.
+        directory_path: A string for the directory where the image is saved.
+
+    Returns:
+        None.
+    """
+    Image.open(io.BytesIO(image_content)).save(
+        os.path.join(directory_path, "legacy.png")
+    )
+
+
+def save_original(
+    image_content: bytes, file_extension: str, directory_path: str
+) -> None:
+    """Saves an upload as the submit path does now, by validating its header & writing its bytes.
+
+    Saves an upload as the submit path does now, by validating its header & writing its bytes.
+
+    Args:
+        image_content: A bytes object for the content of the uploaded file.
+        file_extension: A string for the extension of the uploaded file.
+        directory_path: A string for the directory where the image is saved.
+
+    Returns:
+        None.
+    """
+    validate_image_header(image_content, file_extension)
+    with open(
+        os.path.join(directory_path, f"original.{file_extension}"), "wb"
+    ) as image_file:
+        image_file.write(image_content)
+
+
+def benchmark_size(size: int, n_iterations: int, directory_path: str) -> Dict[str, Any]:
+    """Benchmarks the submit & worker load paths for a JPEG slice & a NumPy array of the given size.
+
+    Benchmarks the submit & worker load paths for a JPEG slice & a NumPy array of the given size.
+
+    Args:
+        size: An integer for the height & width of the image.
+        n_iterations: An integer for the number of iterations for each measurement.
+        directory_path: A string for the directory where the images are saved.
+
+    Returns:
+        A dictionary for the CPU time of each path in milliseconds.
+    """
+    # Creates a smooth RGB image, so that its JPEG & PNG encodings have realistic sizes.
+    x, y = np.meshgrid(np.linspace(0, 1, size), np.linspace(0, 1, size))
+    image = np.stack(
+        [np.sin(x * 8) * np.cos(y * 8), x * y, np.sin(x * y * 16)], axis=-1
+    )
+    image = ((image - image.min()) / (image.max() - image.min()) * 255).astype(np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="JPEG", quality=95)
+    jpeg_content = buffer.getvalue()
+    buffer = io.BytesIO()
+    np.save(buffer, image)
+    npy_content = buffer.getvalue()
+
+    # Checks that the new paths load the same pixels as the legacy path.
+    save_legacy(jpeg_content, directory_path)
+    save_original(jpeg_content, "jpg", directory_path)
+    save_original(npy_content, "npy", directory_path)
+    legacy_path = os.path.join(directory_path, "legacy.png")
+    jpeg_path = os.path.join(directory_path, "original.jpg")
+    npy_path = os.path.join(directory_path, "original.npy")
+    assert np.array_equal(load_image(legacy_path), load_image(jpeg_path))
+    assert np.array_equal(load_image(npy_path), image)
+    return {
+        "size": size,
+        "submit_legacy_png_ms": time_function(
+            lambda: save_legacy(jpeg_content, directory_path), n_iterations
+        ),
+        "submit_original_jpeg_ms": time_function(
+            lambda: save_original(jpeg_content, "jpg", directory_path), n_iterations
+        ),
+        "submit_npy_ms": time_function(
+            lambda: save_original(npy_content, "npy", directory_path), n_iterations
+        ),
+        "load_legacy_png_ms": time_function(
+            lambda: load_image(legacy_path), n_iterations
+        ),
+        "load_original_jpeg_ms": time_function(
+            lambda: load_image(jpeg_path), n_iterations
+        ),
+        "load_npy_ms": time_function(
+            lambda: np.asarray(load_image(npy_path)).sum(), n_iterations
+        ),
+    }
+
+
+if __name__ == "__main__":
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--n_iterations",
+        type=int,
+        default=10,
+        help="Number of iterations for each measurement.",
+    )
+    args = parser.parse_args()
+
+    # Benchmarks the size of the MRI slices used by the models, & larger slices.
+    with tempfile.TemporaryDirectory() as directory_path:
+        results = [
+            benchmark_size(size, args.n_iterations, directory_path)
+            for size in (256, 1024, 2048)
+        ]
+
+    # Prints the results as JSON, so that runs can be compared.
+    print(json.dumps(results, indent=4))
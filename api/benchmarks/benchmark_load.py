@@ -0,0 +1,421 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import threading
+import subprocess
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_PATH)
+
+from PIL import Image
+import numpy as np
+import requests
+
+from typing import Dict, Any, List
+
+# Shape of the random images submitted to each workflow, similar to the sample images of the frontends.
+IMAGE_SHAPES = {"workflow_000": (64, 64), "workflow_001": (256, 256, 3)}
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parses the mix of workflows submitted by the clients.
+
+    Parses the mix of workflows submitted by the clients, given as comma separated '<workflow_name>=<weight>' pairs,
+    into a dictionary of the share of submissions for each workflow.
+
+    Args:
+        mix: A string for the mix of workflows, for example 'workflow_000=0.7,workflow_001=0.3'.
+
+    Returns:
+        A dictionary for the share of submissions for each workflow name.
+    """
+    weights = dict()
+    for pair in mix.split(","):
+        workflow_name, weight = pair.split("=")
+        assert (
+            workflow_name in IMAGE_SHAPES
+        ), f"Workflow '{workflow_name}' should be one of {sorted(IMAGE_SHAPES)}."
+        weights[workflow_name] = float(weight)
+    total_weight = sum(weights.values())
+    assert total_weight > 0, "Weights of the mix should add up to more than 0."
+    return {
+        workflow_name: weight / total_weight
+        for workflow_name, weight in weights.items()
+    }
+
+
+def create_configuration(directory_path: str, args: argparse.Namespace) -> None:
+    """Copies the configuration files into the working directory of the API, & adjusts them for the run.
+
+    Copies the configuration files into the working directory of the API, & adjusts them so that the API reaches the
+    fake TensorFlow Serving over REST, & predicts every submission instead of serving it from the cache.
+
+    Args:
+        directory_path: A string for the working directory of the API.
+        args: An object for the parsed arguments of the benchmark.
+
+    Returns:
+        None.
+    """
+    shutil.copytree(
+        os.path.join(BASE_PATH, "configs"), os.path.join(directory_path, "configs")
+    )
+    configuration_file_path = os.path.join(
+        directory_path, "configs", "api", "configuration.json"
+    )
+    with open(configuration_file_path) as configuration_file:
+        api_configuration = json.load(configuration_file)
+    api_configuration["serving"]["transport"] = "rest"
+    api_configuration["serving"]["rest_port"] = args.serving_port
+    api_configuration["cache"]["enabled"] = False
+    with open(configuration_file_path, "w") as configuration_file:
+        json.dump(api_configuration, configuration_file, indent=2)
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    """Waits until the API is ready to accept traffic.
+
+    Waits until the API is ready to accept traffic, which it reports on '/readyz' once its first workflow
+    is loaded.
+
+    Args:
+        base_url: A string for the URL of the API.
+        process: A subprocess.Popen object for the process of the API.
+        timeout: A floating point value for the maximum number of seconds to wait.
+
+    Returns:
+        None.
+
+    Exceptions:
+        RuntimeError: If the API exits before answering.
+        TimeoutError: If the API does not answer before the timeout.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API at {base_url} exited while starting.")
+        try:
+            if requests.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"API at {base_url} did not start in {timeout} sec.")
+
+
+def generate_image(workflow_name: str, seed: int) -> bytes:
+    """Generates a random PNG image for a workflow.
+
+    Generates a random PNG image with the shape of the images submitted to the workflow.
+
+    Args:
+        workflow_name: A string for the name of the workflow.
+        seed: An integer for the seed of the random pixels.
+
+    Returns:
+        A bytes object for the content of the PNG image.
+    """
+    pixels = np.random.default_rng(seed).integers(
+        0, 256, IMAGE_SHAPES[workflow_name], dtype=np.uint8
+    )
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def parse_seconds(duration: str) -> float:
+    """Parses a duration reported in a result, such as '0.123 sec.', into seconds.
+
+    Parses a duration reported in a result, such as '0.123 sec.', into seconds.
+
+    Args:
+        duration: A string for the duration reported in the result.
+
+    Returns:
+        A floating point value for the number of seconds.
+    """
+    return float(duration.split()[0])
+
+
+def run_client(
+    base_url: str,
+    mix: Dict[str, float],
+    seed: int,
+    stop_time: float,
+    timeout: float,
+    records: List[Dict[str, Any]],
+) -> None:
+    """Submits images & long-polls for their results one after another, until the stop time.
+
+    Submits an image to a workflow picked from the mix, & long-polls for its result before submitting the next
+    one, as a closed-loop client does, until the stop time. The latencies of each submission are appended to the
+    records.
+
+    Args:
+        base_url: A string for the URL of the API.
+        mix: A dictionary for the share of submissions for each workflow name.
+        seed: An integer for the seed of the workflows picked & the random images.
+        stop_time: A floating point value for the time after which no more images are submitted.
+        timeout: A floating point value for the maximum number of seconds to wait for each result.
+        records: A list to which a dictionary for the latencies of each submission is appended.
+
+    Returns:
+        None.
+    """
+    generator = random.Random(seed)
+    index = 0
+    while time.time() < stop_time:
+        workflow_name = generator.choices(list(mix), weights=list(mix.values()))[0]
+        image = generate_image(workflow_name, seed * 1000000 + index)
+        index += 1
+
+        # Submits the image.
+        start_time = time.time()
+        response = requests.post(
+            f"{base_url}/api/v1/submit_image/",
+            files={"image": (f"{index}.png", image)},
+            data={"workflow_name": workflow_name},
+        )
+        submit_time = time.time()
+        if response.status_code != 200:
+            records.append(
+                {"workflow_name": workflow_name, "start_time": start_time, "ok": False}
+            )
+            continue
+        submission_id = response.json()["submission_id"]
+
+        # Long-polls for the result, until it is completed or the timeout has elapsed.
+        deadline = start_time + timeout
+        result = None
+        while time.time() < deadline:
+            response = requests.get(
+                f"{base_url}/api/v1/fetch_result/{submission_id}",
+                params={"wait": min(5, max(deadline - time.time(), 0))},
+            )
+            if response.status_code == 200:
+                result = response.json()
+                break
+            if response.status_code != 202:
+                break
+        end_time = time.time()
+        if result is None or result.get("status") != "Success":
+            records.append(
+                {"workflow_name": workflow_name, "start_time": start_time, "ok": False}
+            )
+            continue
+        records.append(
+            {
+                "workflow_name": workflow_name,
+                "start_time": start_time,
+                "ok": True,
+                "end_to_end": end_time - start_time,
+                "submit": submit_time - start_time,
+                "queue_wait": parse_seconds(result["queue_wait_time"]),
+                "execution": parse_seconds(result["time_taken"]),
+            }
+        )
+
+
+def summarize(records: List[Dict[str, Any]], duration: float) -> Dict[str, Any]:
+    """Computes the throughput & latency percentiles of the submissions.
+
+    Computes the throughput & the p50, p95 & p99 latencies in milliseconds of the submissions, end to end & broken
+    down into the submit request, the wait in the queue & the execution of the workflow.
+
+    Args:
+        records: A list of dictionaries for the latencies of each submission.
+        duration: A floating point value for the number of seconds over which the submissions were measured.
+
+    Returns:
+        A dictionary for the number of submissions, the throughput & the latency percentiles.
+    """
+    completed = [record for record in records if record["ok"]]
+    summary = {
+        "n_submissions": len(records),
+        "n_completed": len(completed),
+        "n_failed": len(records) - len(completed),
+        "throughput_per_second": len(completed) / duration,
+    }
+    for stage in ["end_to_end", "submit", "queue_wait", "execution"]:
+        latencies = [record[stage] * 1000 for record in completed]
+        summary[f"{stage}_ms"] = {
+            f"p{percentile}": (
+                float(np.percentile(latencies, percentile)) if latencies else None
+            )
+            for percentile in [50, 95, 99]
+        }
+    return summary
+
+
+def run_benchmark(directory_path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Runs the API against the fake TensorFlow Serving, & drives it with closed-loop clients.
+
+    Runs the fake TensorFlow Serving REST endpoints & the API in a temporary working directory, then runs the
+    clients for the warmup & the duration of the benchmark. Only submissions started after the warmup are measured.
+
+    Args:
+        directory_path: A string for the working directory of the API.
+        args: An object for the parsed arguments of the benchmark.
+
+    Returns:
+        A dictionary for the settings of the run, & the summary of all submissions & of each workflow.
+    """
+    mix = parse_mix(args.mix)
+    create_configuration(directory_path, args)
+    processes: List[subprocess.Popen] = list()
+    log_file = open(os.path.join(directory_path, "benchmark.log"), "w")
+    base_url = f"http://localhost:{args.port}"
+    try:
+        # Starts the fake TensorFlow Serving REST endpoints, & the API.
+        processes.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.join(
+                        BASE_PATH, "src", "serving", "fake_prediction_service.py"
+                    ),
+                    "--transport",
+                    "rest",
+                    "--port",
+                    str(args.serving_port),
+                    "--latency",
+                    str(args.latency),
+                    "--item_latency",
+                    str(args.item_latency),
+                ],
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+        )
+        processes.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.join(BASE_PATH, "app.py"),
+                    "--deployment_type",
+                    "dev",
+                    "--port",
+                    str(args.port),
+                ],
+                cwd=directory_path,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+        )
+        wait_until_ready(base_url, processes[1], 120)
+
+        # Runs the clients for the warmup & the duration of the benchmark.
+        records: List[Dict[str, Any]] = list()
+        measure_time = time.time() + args.warmup
+        stop_time = measure_time + args.duration
+        threads = [
+            threading.Thread(
+                target=run_client,
+                args=(base_url, mix, index + 1, stop_time, args.timeout, records),
+            )
+            for index in range(args.n_clients)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        log_file.close()
+
+    # Summarizes the submissions started after the warmup, overall & for each workflow.
+    records = [record for record in records if record["start_time"] >= measure_time]
+    return {
+        "mix": mix,
+        "n_clients": args.n_clients,
+        "duration": args.duration,
+        "latency": args.latency,
+        "item_latency": args.item_latency,
+        "overall": summarize(records, args.duration),
+        "workflows": {
+            workflow_name: summarize(
+                [
+                    record
+                    for record in records
+                    if record["workflow_name"] == workflow_name
+                ],
+                args.duration,
+            )
+            for workflow_name in mix
+        },
+    }
+
+
+if __name__ == "__main__":
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-m",
+        "--mix",
+        type=str,
+        default="workflow_000=0.7,workflow_001=0.3",
+        help="Share of submissions for each workflow, as comma separated '<workflow_name>=<weight>' pairs.",
+    )
+    parser.add_argument(
+        "-c", "--n_clients", type=int, default=8, help="Number of concurrent clients."
+    )
+    parser.add_argument(
+        "-d",
+        "--duration",
+        type=float,
+        default=20.0,
+        help="Number of seconds the submissions are measured for.",
+    )
+    parser.add_argument(
+        "-wu",
+        "--warmup",
+        type=float,
+        default=3.0,
+        help="Number of seconds the clients run for before the submissions are measured.",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.02,
+        help="Number of seconds each prediction of the fake TensorFlow Serving takes.",
+    )
+    parser.add_argument(
+        "-il",
+        "--item_latency",
+        type=float,
+        default=0.005,
+        help="Number of seconds added to each prediction for each input in the batch.",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Maximum number of seconds to wait for each result.",
+    )
+    parser.add_argument("-p", "--port", type=int, default=8120, help="Port of the API.")
+    parser.add_argument(
+        "-sp",
+        "--serving_port",
+        type=int,
+        default=8511,
+        help="Port of the fake TensorFlow Serving REST endpoints.",
+    )
+    args = parser.parse_args()
+
+    # Runs the API in a temporary working directory, which holds its database & data directory.
+    with tempfile.TemporaryDirectory() as directory_path:
+        result = run_benchmark(directory_path, args)
+
+    # Prints the results as JSON, so that runs can be compared.
+    print(json.dumps(result, indent=4))
@@ -0,0 +1,122 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_PATH)
+
+import numpy as np
+
+from src.models.digit_recognizer import DigitRecognizer
+from src.models.bms_flair_abnormality_classification import (
+    FlairAbnormalityClassification,
+)
+from src.models.bms_flair_abnormality_segmentation import FlairAbnormalitySegmentation
+
+from typing import Callable, Dict, Any, List
+
+
+def time_function(function: Callable[[], Any], n_iterations: int) -> float:
+    """Computes the median time taken by a function over a number of iterations.
+
+    Computes the median time taken by a function over a number of iterations.
+
+    Args:
+        function: A function which takes no arguments.
+        n_iterations: An integer for the number of times the function is called.
+
+    Returns:
+        A floating point value for the median number of milliseconds taken by the function.
+    """
+    durations = list()
+    for _ in range(n_iterations):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+    return float(np.median(durations)) * 1000
+
+
+def benchmark_model(
+    name: str, model: Any, images: List[np.ndarray], n_iterations: int
+) -> Dict[str, Any]:
+    """Benchmarks the current per-image preprocessing against the batched kernel for a model.
+
+    Benchmarks the current per-image preprocessing, followed by concatenation into a batch, against the batched
+    kernel which writes into a reusable buffer.
+
+    Args:
+        name: A string for the name of the model.
+        model: An object for the model, whose configuration is loaded.
+        images: A list of NumPy arrays for the uint8 images in the batch.
+        n_iterations: An integer for the number of iterations for each measurement.
+
+    Returns:
+        A dictionary for the timings in milliseconds, & the maximum difference between both paths.
+    """
+
+    def preprocess_per_image() -> np.ndarray:
+        """Preprocesses each image separately, & concatenates them as predict_batch did before."""
+        return np.concatenate([model.preprocess_image(image) for image in images])
+
+    # Checks that both paths produce the same batch.
+    maximum_difference = float(
+        np.abs(preprocess_per_image() - model.preprocess_batch(images)).max()
+    )
+    assert maximum_difference < 1e-6
+    return {
+        "model": name,
+        "batch_size": len(images),
+        "image_shape": list(images[0].shape),
+        "per_image_ms": time_function(preprocess_per_image, n_iterations),
+        "batched_kernel_ms": time_function(
+            lambda: model.preprocess_batch(images), n_iterations
+        ),
+        "maximum_difference": maximum_difference,
+    }
+
+
+if __name__ == "__main__":
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--n_iterations",
+        type=int,
+        default=20,
+        help="Number of iterations for each measurement.",
+    )
+    parser.add_argument(
+        "-b", "--batch_size", type=int, default=8, help="Batch size of the inputs."
+    )
+    args = parser.parse_args()
+
+    # Loads the configuration of the three models, which is used by their preprocessing.
+    os.chdir(BASE_PATH)
+    models = [
+        ("digit_recognizer", DigitRecognizer("1.0.0", None), (28, 28, 3)),
+        (
+            "bms_flair_abnormality_classification",
+            FlairAbnormalityClassification("1.2.0", None),
+            (256, 256, 3),
+        ),
+        (
+            "bms_flair_abnormality_segmentation",
+            FlairAbnormalitySegmentation("1.0.0", None),
+            (256, 256, 3),
+        ),
+    ]
+
+    # Benchmarks each model with a batch of random uint8 images.
+    results = list()
+    for name, model, image_shape in models:
+        model.load_model_configuration()
+        images = [
+            np.random.randint(0, 256, image_shape, dtype=np.uint8)
+            for _ in range(args.batch_size)
+        ]
+        results.append(benchmark_model(name, model, images, args.n_iterations))
+
+    # Prints the results as JSON, so that runs can be compared.
+    print(json.dumps(results, indent=4))
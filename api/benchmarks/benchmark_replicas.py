@@ -0,0 +1,414 @@
+import io
+import os
+import sys
+import json
+import time
+import signal
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_PATH)
+
+from PIL import Image
+import numpy as np
+import requests
+
+from typing import Dict, Any, List
+
+
+def create_configuration(directory_path: str, args: argparse.Namespace) -> None:
+    """Copies the configuration files into the working directory shared by the replicas, & adjusts them for the run.
+
+    Copies the configuration files into the working directory shared by the replicas, & adjusts them so that the
+    replicas reach the fake PredictionService over gRPC, & expire the leases of a killed replica quickly.
+
+    Args:
+        directory_path: A string for the working directory shared by the replicas.
+        args: An object for the parsed arguments of the harness.
+
+    Returns:
+        None.
+    """
+    shutil.copytree(
+        os.path.join(BASE_PATH, "configs"), os.path.join(directory_path, "configs")
+    )
+    configuration_file_path = os.path.join(
+        directory_path, "configs", "api", "configuration.json"
+    )
+    with open(configuration_file_path) as configuration_file:
+        api_configuration = json.load(configuration_file)
+    api_configuration["serving"]["transport"] = "grpc"
+    api_configuration["serving"]["grpc_port"] = args.serving_port
+    api_configuration["queue"]["lease_timeout"] = args.lease_timeout
+    api_configuration["queue"]["renew_interval"] = args.lease_timeout / 3
+    api_configuration["dispatch"]["idle_timeout"] = 1
+    with open(configuration_file_path, "w") as configuration_file:
+        json.dump(api_configuration, configuration_file, indent=2)
+
+
+def wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    """Waits until a replica is ready to accept traffic.
+
+    Waits until a replica is ready to accept traffic, which it reports on '/readyz' once its first workflow
+    is loaded.
+
+    Args:
+        base_url: A string for the URL of the replica.
+        process: A subprocess.Popen object for the process of the replica.
+        timeout: A floating point value for the maximum number of seconds to wait.
+
+    Returns:
+        None.
+
+    Exceptions:
+        RuntimeError: If the replica exits before answering.
+        TimeoutError: If the replica does not answer before the timeout.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Replica at {base_url} exited while starting.")
+        try:
+            if requests.get(f"{base_url}/readyz", timeout=1).status_code == 200:
+                return
+        except requests.ConnectionError:
+            pass
+        time.sleep(0.2)
+    raise TimeoutError(f"Replica at {base_url} did not start in {timeout} sec.")
+
+
+def generate_image(seed: int) -> bytes:
+    """Generates a random grayscale PNG image.
+
+    Generates a random grayscale PNG image.
+
+    Args:
+        seed: An integer for the seed of the random pixels.
+
+    Returns:
+        A bytes object for the content of the PNG image.
+    """
+    pixels = np.random.default_rng(seed).integers(0, 256, (64, 64), dtype=np.uint8)
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def submit(base_url: str, workflow_name: str, seed: int) -> str:
+    """Submits a random image to a replica.
+
+    Submits a random image to a replica.
+
+    Args:
+        base_url: A string for the URL of the replica.
+        workflow_name: A string for the name of the workflow.
+        seed: An integer for the seed of the random image.
+
+    Returns:
+        A string for the unique id of the submission.
+    """
+    response = requests.post(
+        f"{base_url}/api/v1/submit_image/",
+        files={"image": (f"{seed}.png", generate_image(seed))},
+        data={"workflow_name": workflow_name},
+    )
+    assert response.status_code == 200, response.text
+    return response.json()["submission_id"]
+
+
+def fetch(base_url: str, submission_id: str, timeout: float) -> float:
+    """Long-polls a replica for the result of a submission, until it is completed or the timeout has elapsed.
+
+    Long-polls a replica for the result of a submission, until it is completed or the timeout has elapsed.
+
+    Args:
+        base_url: A string for the URL of the replica.
+        submission_id: A string for the unique id of the submission.
+        timeout: A floating point value for the maximum number of seconds to wait.
+
+    Returns:
+        A floating point value for the time at which the result was received, or infinity if it was not.
+    """
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        response = requests.get(
+            f"{base_url}/api/v1/fetch_result/{submission_id}",
+            params={"wait": min(5, max(deadline - time.time(), 0))},
+        )
+        if response.status_code == 200:
+            return time.time()
+        assert response.status_code == 202, response.text
+    return float("inf")
+
+
+def inspect_database(directory_path: str, submission_ids: List[str]) -> Dict[str, Any]:
+    """Checks that each submission was completed exactly once in the database shared by the replicas.
+
+    Checks that each submission was completed exactly once in the database shared by the replicas, once they are
+    stopped. A submission completed by two replicas would fail the primary key of the completion table, which the
+    replicas log as an error.
+
+    Args:
+        directory_path: A string for the working directory shared by the replicas.
+        submission_ids: A list of strings for the unique ids of the submissions.
+
+    Returns:
+        A dictionary for the number of submissions left in the queue, & whether each submission was completed once.
+    """
+    connection = sqlite3.connect(os.path.join(directory_path, "ml_showcase_db.sqlite3"))
+    try:
+        n_pending = connection.execute(
+            "SELECT COUNT(*) FROM submissions_info"
+        ).fetchone()[0]
+        completed_ids = [
+            row[0]
+            for row in connection.execute(
+                "SELECT submission_id FROM submissions_completion_info"
+            )
+        ]
+    finally:
+        connection.close()
+    with open(os.path.join(directory_path, "replicas.log")) as log_file:
+        n_duplicate_completions = log_file.read().count(
+            "UNIQUE constraint failed: submissions_completion_info"
+        )
+    return {
+        "n_pending": n_pending,
+        "completed_once": sorted(completed_ids) == sorted(set(submission_ids))
+        and n_duplicate_completions == 0,
+    }
+
+
+def run_harness(directory_path: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Runs several replicas sharing one queue, submits to & fetches from different replicas, & kills one of them.
+
+    Runs the fake PredictionService & several API replicas which share the database & data directory. Each image is
+    submitted to one replica, & its result is fetched from the next replica. Images are repeated if there are fewer
+    distinct images than submissions, so that identical submissions to different replicas are coalesced. If
+    requested, the first replica is killed right after the images are submitted, while it holds leases on in-flight
+    submissions, which should be re-run by the other replicas once the leases expire.
+
+    Args:
+        directory_path: A string for the working directory shared by the replicas.
+        args: An object for the parsed arguments of the harness.
+
+    Returns:
+        A dictionary for the number of submissions completed, whether each was completed exactly once, the total time,
+        & the latency percentiles.
+    """
+    create_configuration(directory_path, args)
+    processes: List[subprocess.Popen] = list()
+    log_file = open(os.path.join(directory_path, "replicas.log"), "w")
+    try:
+        # Starts the fake PredictionService, & the replicas on consecutive ports.
+        processes.append(
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    os.path.join(
+                        BASE_PATH, "src", "serving", "fake_prediction_service.py"
+                    ),
+                    "--port",
+                    str(args.serving_port),
+                    "--latency",
+                    str(args.latency),
+                ],
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            )
+        )
+        base_urls = [
+            f"http://localhost:{args.base_port + index}"
+            for index in range(args.n_replicas)
+        ]
+        for index in range(args.n_replicas):
+            processes.append(
+                subprocess.Popen(
+                    [
+                        sys.executable,
+                        os.path.join(BASE_PATH, "app.py"),
+                        "--deployment_type",
+                        "dev",
+                        "--port",
+                        str(args.base_port + index),
+                    ],
+                    cwd=directory_path,
+                    stdout=log_file,
+                    stderr=subprocess.STDOUT,
+                )
+            )
+        for base_url, process in zip(base_urls, processes[1:]):
+            wait_until_ready(base_url, process, 120)
+
+        # Submits the images to the replicas in turn.
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=args.n_clients) as executor:
+            submission_ids = list(
+                executor.map(
+                    lambda index: submit(
+                        base_urls[index % args.n_replicas],
+                        args.workflow_name,
+                        index % args.n_distinct_images,
+                    ),
+                    range(args.n_submissions),
+                )
+            )
+        submit_time = time.time()
+
+        # Kills the first replica, without letting it release its leases or complete its submissions.
+        alive_base_urls = base_urls
+        if args.kill_replica:
+            processes[1].send_signal(signal.SIGKILL)
+            processes[1].wait()
+            alive_base_urls = base_urls[1:]
+
+        # Fetches each result from another replica than the one it was submitted to.
+        with ThreadPoolExecutor(max_workers=args.n_clients) as executor:
+            completion_times = list(
+                executor.map(
+                    lambda index: fetch(
+                        alive_base_urls[(index + 1) % len(alive_base_urls)],
+                        submission_ids[index],
+                        args.timeout,
+                    ),
+                    range(args.n_submissions),
+                )
+            )
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+        log_file.close()
+
+    # Checks the database shared by the replicas, once they are stopped.
+    database_result = inspect_database(directory_path, submission_ids)
+
+    latencies = [
+        completion_time - submit_time
+        for completion_time in completion_times
+        if completion_time != float("inf")
+    ]
+    return {
+        "n_replicas": args.n_replicas,
+        "n_submissions": args.n_submissions,
+        "n_distinct_images": args.n_distinct_images,
+        "killed_replica": args.kill_replica,
+        "lease_timeout": args.lease_timeout,
+        "n_completed": len(latencies),
+        "all_completed": len(latencies) == args.n_submissions,
+        "n_pending": database_result["n_pending"],
+        "completed_once": database_result["completed_once"],
+        "submit_time": submit_time - start_time,
+        "total_time": max(latencies, default=0.0) + submit_time - start_time,
+        "fetch_p50_ms": (
+            float(np.percentile(latencies, 50)) * 1000 if latencies else None
+        ),
+        "fetch_p99_ms": (
+            float(np.percentile(latencies, 99)) * 1000 if latencies else None
+        ),
+    }
+
+
+if __name__ == "__main__":
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-r", "--n_replicas", type=int, default=3, help="Number of API replicas."
+    )
+    parser.add_argument(
+        "-n",
+        "--n_submissions",
+        type=int,
+        default=60,
+        help="Number of images submitted.",
+    )
+    parser.add_argument(
+        "-d",
+        "--n_distinct_images",
+        type=int,
+        default=None,
+        help="Number of distinct images submitted. Defaults to the number of submissions.",
+    )
+    parser.add_argument(
+        "-c", "--n_clients", type=int, default=8, help="Number of concurrent clients."
+    )
+    parser.add_argument(
+        "-w",
+        "--workflow_name",
+        type=str,
+        default="workflow_000",
+        help="Workflow the images are submitted to.",
+    )
+    parser.add_argument(
+        "-k",
+        "--kill_replica",
+        action="store_true",
+        help="Kills the first replica right after the images are submitted.",
+    )
+    parser.add_argument(
+        "-lt",
+        "--lease_timeout",
+        type=float,
+        default=3.0,
+        help="Number of seconds after which the leases of a killed replica expire.",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.2,
+        help="Number of seconds each prediction of the fake PredictionService takes.",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=60.0,
+        help="Maximum number of seconds to wait for each result.",
+    )
+    parser.add_argument(
+        "-bp",
+        "--base_port",
+        type=int,
+        default=8110,
+        help="Port of the first replica, the others use the following ports.",
+    )
+    parser.add_argument(
+        "-sp",
+        "--serving_port",
+        type=int,
+        default=8510,
+        help="Port of the fake PredictionService.",
+    )
+    parser.add_argument(
+        "-ck",
+        "--check",
+        action="store_true",
+        help="Exits with a non-zero status unless every submission was completed exactly once & nothing is left "
+        "in the queue.",
+    )
+    args = parser.parse_args()
+    if args.n_distinct_images is None:
+        args.n_distinct_images = args.n_submissions
+
+    # Runs the replicas in a temporary working directory, which holds the shared database & data directory.
+    with tempfile.TemporaryDirectory() as directory_path:
+        result = run_harness(directory_path, args)
+
+    # Prints the results as JSON, so that runs can be compared.
+    print(json.dumps(result, indent=4))
+
+    # Fails the check if a submission was not completed, was completed twice, or was left in the queue.
+    if args.check and not (
+        result["all_completed"]
+        and result["completed_once"]
+        and result["n_pending"] == 0
+    ):
+        print("Check failed.", file=sys.stderr)
+        sys.exit(1)
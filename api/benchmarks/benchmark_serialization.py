@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_PATH)
+
+import numpy as np
+
+from src.utils import load_json_file
+from src.serving import serialization
+
+from typing import Callable, Dict, Any
+
+
+def time_function(function: Callable[[], Any], n_iterations: int) -> float:
+    """Computes the median time taken by a function over a number of iterations.
+
+    Computes the median time taken by a function over a number of iterations.
+
+    Args:
+        function: A function which takes no arguments.
+        n_iterations: An integer for the number of times the function is called.
+
+    Returns:
+        A floating point value for the median number of milliseconds taken by the function.
+    """
+    durations = list()
+    for _ in range(n_iterations):
+        start_time = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start_time)
+    return float(np.median(durations)) * 1000
+
+
+def benchmark_shape(
+    name: str, input_shape: tuple, output_shape: tuple, n_iterations: int
+) -> Dict[str, Any]:
+    """Benchmarks the current & new serialization paths for a model's input & output shapes.
+
+    Benchmarks the current & new serialization paths for a model's input & output shapes. Inputs are images
+    normalized from uint8, & outputs are random float32 values as returned by TensorFlow Serving.
+
+    Args:
+        name: A string for the name of the model.
+        input_shape: A tuple for the shape of the model's input batch.
+        output_shape: A tuple for the shape of the model's output batch.
+        n_iterations: An integer for the number of iterations for each measurement.
+
+    Returns:
+        A dictionary for the timings in milliseconds & the request sizes in bytes.
+    """
+    inputs = np.random.randint(0, 256, input_shape).astype(np.float32) / 255.0
+    outputs = np.random.rand(*output_shape).astype(np.float32)
+    response_content = json.dumps({"outputs": outputs.tolist()}).encode()
+
+    # Checks that both paths produce the same tensors.
+    assert np.array_equal(
+        np.array(
+            json.loads(serialization.encode_predict_request(inputs))["inputs"],
+            dtype=np.float32,
+        ),
+        inputs,
+    )
+    assert np.array_equal(
+        serialization.decode_predict_response(response_content), outputs
+    )
+    return {
+        "model": name,
+        "encode_json_ms": time_function(
+            lambda: json.dumps({"inputs": inputs.tolist()}), n_iterations
+        ),
+        "encode_fast_ms": time_function(
+            lambda: serialization.encode_predict_request(inputs), n_iterations
+        ),
+        "decode_json_ms": time_function(
+            lambda: np.array(json.loads(response_content)["outputs"], dtype=np.float32),
+            n_iterations,
+        ),
+        "decode_fast_ms": time_function(
+            lambda: serialization.decode_predict_response(response_content),
+            n_iterations,
+        ),
+        "request_json_bytes": len(json.dumps({"inputs": inputs.tolist()})),
+        "request_fast_bytes": len(serialization.encode_predict_request(inputs)),
+    }
+
+
+if __name__ == "__main__":
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--n_iterations",
+        type=int,
+        default=10,
+        help="Number of iterations for each measurement.",
+    )
+    parser.add_argument(
+        "-b", "--batch_size", type=int, default=1, help="Batch size of the inputs."
+    )
+    args = parser.parse_args()
+
+    # Extracts the input & output shapes of the three models from their configuration files.
+    results = list()
+    for name, version, output_channels in [
+        ("digit_recognizer", "1.0.0", None),
+        ("bms_flair_abnormality_classification", "1.2.0", None),
+        ("bms_flair_abnormality_segmentation", "1.0.0", 1),
+    ]:
+        model_configuration = load_json_file(
+            f"v{version}", os.path.join(BASE_PATH, "configs", "models", name)
+        )["model"]
+        input_shape = (
+            args.batch_size,
+            model_configuration["final_image_height"],
+            model_configuration["final_image_width"],
+            model_configuration["n_channels"],
+        )
+        if output_channels is None:
+            output_shape = (args.batch_size, model_configuration["n_classes"])
+        else:
+            output_shape = input_shape[:-1] + (output_channels,)
+        results.append(
+            benchmark_shape(name, input_shape, output_shape, args.n_iterations)
+        )
+
+    # Prints the results as JSON, so that runs can be compared.
+    print(json.dumps(results, indent=4))
@@ -0,0 +1,150 @@
+import math
+import time
+import threading
+from collections import deque
+
+from typing import Dict, Any, Optional
+
+
+class AdmissionController(object):
+    """Limits the depth of the queue, & estimates how long submissions take to complete from the observed drain rate.
+
+    The drain rate is the number of submissions completed per second by the prediction workers of this replica, over
+    a sliding window. With several replicas sharing the queue, the estimates of each replica are conservative, as
+    the queue is also drained by the other replicas.
+    """
+
+    def __init__(self, admission_configuration: Dict[str, Any]) -> None:
+        """Creates object attributes for the AdmissionController class.
+
+        Creates object attributes for the AdmissionController class.
+
+        Args:
+            admission_configuration: A dictionary for the maximum depth of the queue, the maximum depth of each
+                workflow's share of the queue, the window over which the drain rate is measured, & the default &
+                maximum number of seconds returned in Retry-After.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            admission_configuration, dict
+        ), "Variable admission_configuration should be of type 'dict'."
+        assert (
+            admission_configuration["max_queue_depth"] > 0
+        ), "Variable max_queue_depth should be greater than 0."
+        assert (
+            admission_configuration["rate_window"] > 0
+        ), "Variable rate_window should be greater than 0."
+        assert (
+            1
+            <= admission_configuration["default_retry_after"]
+            <= admission_configuration["max_retry_after"]
+        ), "Variable default_retry_after should be between 1 and max_retry_after."
+
+        # Initializes class variables.
+        self.max_queue_depth = admission_configuration["max_queue_depth"]
+        self.max_workflow_queue_depth = admission_configuration[
+            "max_workflow_queue_depth"
+        ]
+        self.rate_window = admission_configuration["rate_window"]
+        self.default_retry_after = admission_configuration["default_retry_after"]
+        self.max_retry_after = admission_configuration["max_retry_after"]
+        self.start_time = time.time()
+        self.completions = deque()
+        self.lock = threading.Lock()
+
+    def record_completions(self, n_completed: int) -> None:
+        """Records the number of submissions completed by a prediction worker.
+
+        Records the number of submissions completed by a prediction worker, & forgets the completions older than the
+        window.
+
+        Args:
+            n_completed: An integer for the number of submissions completed.
+
+        Returns:
+            None.
+        """
+        current_time = time.time()
+        with self.lock:
+            if n_completed > 0:
+                self.completions.append((current_time, n_completed))
+            while (
+                len(self.completions) > 0
+                and self.completions[0][0] < current_time - self.rate_window
+            ):
+                self.completions.popleft()
+
+    def fetch_drain_rate(self) -> float:
+        """Computes the number of submissions completed per second over the window.
+
+        Computes the number of submissions completed per second over the window, or since the replica started if it
+        started less than a window ago.
+
+        Args:
+            None.
+
+        Returns:
+            A floating point value for the number of submissions completed per second, or 0 if none were completed.
+        """
+        self.record_completions(0)
+        with self.lock:
+            n_completed = sum(count for _, count in self.completions)
+        elapsed_time = min(time.time() - self.start_time, self.rate_window)
+        return n_completed / max(elapsed_time, 1.0)
+
+    def estimate_completion_time(self, n_queued: int) -> Optional[float]:
+        """Estimates the number of seconds until a new submission is completed.
+
+        Estimates the number of seconds until a new submission is completed, as the time needed to drain the
+        submissions queued before it, & the submission itself.
+
+        Args:
+            n_queued: An integer for the number of submissions queued before the new submission.
+
+        Returns:
+            A floating point value for the estimated number of seconds, or None if no submission was completed
+                recently.
+        """
+        drain_rate = self.fetch_drain_rate()
+        if drain_rate == 0:
+            return None
+        return (n_queued + 1) / drain_rate
+
+    def compute_retry_after(
+        self, workflow_name: str, n_submissions: int, queue_depths: Dict[str, int]
+    ) -> Optional[int]:
+        """Checks if new submissions fit in the queue, & computes when to retry if they do not.
+
+        Checks if new submissions fit in the queue, & in the workflow's share of the queue. If they do not, computes
+        the number of seconds until enough submissions are drained for them to fit, at the observed drain rate.
+
+        Args:
+            workflow_name: A string for the name of the workflow of the new submissions.
+            n_submissions: An integer for the number of new submissions.
+            queue_depths: A dictionary for the number of submissions in the queue, by workflow name.
+
+        Returns:
+            None if the submissions are admitted, else an integer for the number of seconds after which the client
+                should retry.
+        """
+        # Computes by how many submissions the queue & the workflow's share of the queue would exceed their limits.
+        n_excess = sum(queue_depths.values()) + n_submissions - self.max_queue_depth
+        if workflow_name in self.max_workflow_queue_depth:
+            n_excess = max(
+                n_excess,
+                queue_depths.get(workflow_name, 0)
+                + n_submissions
+                - self.max_workflow_queue_depth[workflow_name],
+            )
+        if n_excess <= 0:
+            return None
+
+        # Estimates the time needed to drain the excess submissions, or falls back to the default if the drain rate
+        # is unknown.
+        drain_rate = self.fetch_drain_rate()
+        if drain_rate == 0:
+            return self.default_retry_after
+        return min(max(math.ceil(n_excess / drain_rate), 1), self.max_retry_after)
@@ -0,0 +1,145 @@
+import time
+import threading
+
+from src.submission_signal import SubmissionSignal
+
+from typing import Callable, List, Optional, Tuple
+
+
+class SubmissionBatcher(object):
+    """Groups pending submissions into batches which are sent to TensorFlow Serving as a single request."""
+
+    def __init__(
+        self,
+        max_batch_size: int,
+        max_wait_time: float,
+        submission_signal: SubmissionSignal,
+    ) -> None:
+        """Creates object attributes for the SubmissionBatcher class.
+
+        Creates object attributes for the SubmissionBatcher class.
+
+        Args:
+            max_batch_size: An integer for the maximum number of submissions in a batch.
+            max_wait_time: A floating point value for the maximum number of seconds to wait for a batch to fill up.
+            submission_signal: A SubmissionSignal object which wakes the batcher when new submissions are queued.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert (
+            isinstance(max_batch_size, int) and max_batch_size > 0
+        ), "Variable max_batch_size should be of type 'int' and greater than 0."
+        assert (
+            isinstance(max_wait_time, (int, float)) and max_wait_time >= 0
+        ), "Variable max_wait_time should be of type 'float' and non-negative."
+
+        # Initializes class variables.
+        self.max_batch_size = max_batch_size
+        self.max_wait_time = max_wait_time
+        self.submission_signal = submission_signal
+        self.n_in_flight = 0
+        self.lock = threading.Lock()
+
+    def claim(
+        self,
+        claim_pending_submissions: Callable[[Optional[str], int], List[Tuple]],
+        workflow_name: str,
+        limit: int,
+    ) -> Tuple[List[Tuple], int]:
+        """Claims pending submissions of a workflow, & counts them as in flight.
+
+        Claims pending submissions of a workflow, & counts them as in flight until their batch is completed.
+
+        Args:
+            claim_pending_submissions: A function which accepts an optional workflow name & a limit, and claims &
+                returns the pending submissions.
+            workflow_name: A string for the name of the workflow.
+            limit: An integer for the maximum number of submissions to claim.
+
+        Returns:
+            A tuple for the rows of the claimed submissions, & the number of submissions in flight before the claim.
+        """
+        rows = claim_pending_submissions(workflow_name, limit)
+        with self.lock:
+            n_in_flight = self.n_in_flight
+            self.n_in_flight += len(rows)
+        return rows, n_in_flight
+
+    def complete_batch(self, rows: List[Tuple]) -> None:
+        """Stops counting the submissions of a batch as in flight.
+
+        Stops counting the submissions of a batch as in flight, once the batch is completed or released.
+
+        Args:
+            rows: A list of rows for the submissions of the batch returned by next_batch.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            self.n_in_flight -= len(rows)
+
+    def next_batch(
+        self,
+        claim_pending_submissions: Callable[[Optional[str], int], List[Tuple]],
+        select_workflow: Callable[[], Optional[str]],
+    ) -> List[Tuple]:
+        """Claims the next batch of pending submissions.
+
+        Claims the next batch of pending submissions. The batch is formed from a single workflow, chosen by the
+        scheduler, as each loaded workflow pins the model versions used for its submissions. If the batch is not
+        full & the pending submissions of the workflow are drained, a lone submission is returned at once when no other
+        submission is in flight, as no batch is forming. Otherwise, waits for at most the wait window for more
+        submissions of the same workflow, waking whenever a new submission is signalled. Submissions are claimed as
+        they are added to the batch, so that other workers can claim the remaining submissions concurrently. The
+        caller should pass the batch to complete_batch once it is completed or released.
+
+        Args:
+            claim_pending_submissions: A function which accepts an optional workflow name & a limit, and claims &
+                returns the pending submissions with the highest priority, oldest first, as rows of (submission_id,
+                workflow_name, submission_time_stamp, file_extension, enqueue_time, deadline, cache_key).
+            select_workflow: A function which chooses the workflow of the next batch among the workflows with
+                pending submissions, & returns its name, or None if no submissions are pending.
+
+        Returns:
+            A list of rows for the submissions in the batch. Empty if no submissions are pending.
+        """
+        # Claims the pending submissions of the workflow chosen by the scheduler. Chooses again if another worker
+        # claimed the last pending submissions of the workflow in the meantime. Reads the number of signals sent
+        # before each claim, so that a submission queued after the claim ends the wait below.
+        rows = list()
+        while len(rows) == 0:
+            sequence_number = self.submission_signal.sequence_number()
+            workflow_name = select_workflow()
+            if workflow_name is None:
+                return []
+            rows, n_in_flight = self.claim(
+                claim_pending_submissions, workflow_name, self.max_batch_size
+            )
+
+        # Returns the batch at once if it is full, or if it holds a lone submission while no other submission is in
+        # flight, as no more submissions are expected soon.
+        if len(rows) >= self.max_batch_size or (len(rows) == 1 and n_in_flight == 0):
+            return rows
+
+        # Claims submissions for the workflow as they are signalled, until the batch is full, or the wait window has
+        # elapsed.
+        deadline = time.time() + self.max_wait_time
+        while True:
+            remaining_time = deadline - time.time()
+            if remaining_time <= 0 or not self.submission_signal.wait(
+                sequence_number, remaining_time
+            ):
+                return rows
+            sequence_number = self.submission_signal.sequence_number()
+            rows.extend(
+                self.claim(
+                    claim_pending_submissions,
+                    workflow_name,
+                    self.max_batch_size - len(rows),
+                )[0]
+            )
+            if len(rows) >= self.max_batch_size:
+                return rows
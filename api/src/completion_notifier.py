@@ -0,0 +1,83 @@
+import threading
+
+from typing import List
+
+
+class CompletionNotifier(object):
+    """Wakes request threads waiting for the prediction workers to complete submissions, or publish their stages."""
+
+    def __init__(self) -> None:
+        """Creates object attributes for the CompletionNotifier class.
+
+        Creates object attributes for the CompletionNotifier class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        # Initializes class variables.
+        self.lock = threading.Lock()
+        self.events = dict()
+
+    def subscribe(self, submission_id: str) -> threading.Event:
+        """Registers interest in the completion of a submission.
+
+        Registers interest in the completion of a submission. The caller should subscribe before checking whether
+        the submission is completed, so that a completion in between is not missed, & unsubscribe once done. Each
+        subscriber gets its own event, which it can clear after a stage update to wait for the next one.
+
+        Args:
+            submission_id: A string for the unique id of the submission.
+
+        Returns:
+            A threading.Event object which is set when the submission is completed, or publishes a stage.
+        """
+        # Asserts type of the arguments.
+        assert isinstance(
+            submission_id, str
+        ), "Variable submission_id should be of type 'str'."
+
+        # Adds an event for the subscriber to the events of the submission.
+        event = threading.Event()
+        with self.lock:
+            self.events.setdefault(submission_id, []).append(event)
+        return event
+
+    def unsubscribe(self, submission_id: str, event: threading.Event) -> None:
+        """Removes interest in the completion of a submission.
+
+        Removes interest in the completion of a submission. The events of a submission are dropped once it has no
+        subscribers.
+
+        Args:
+            submission_id: A string for the unique id of the submission.
+            event: A threading.Event object returned by subscribe.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            if submission_id not in self.events:
+                return
+            self.events[submission_id].remove(event)
+            if len(self.events[submission_id]) == 0:
+                del self.events[submission_id]
+
+    def notify(self, submission_ids: List[str]) -> None:
+        """Wakes the subscribers of each completed submission, or submission which published a stage.
+
+        Wakes the subscribers of each completed submission, or submission which published a stage. Submissions
+        without subscribers are ignored.
+
+        Args:
+            submission_ids: A list of strings for the unique ids of the submissions.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            for submission_id in submission_ids:
+                for event in self.events.get(submission_id, []):
+                    event.set()
@@ -0,0 +1,158 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from typing import Dict, Any, Iterator
+
+
+class DatabaseConnectionPool(object):
+    """Lends SQLite3 connections to request & worker threads, so that they do not share a single connection.
+
+    Reads run concurrently on their own connections, while write transactions of the process are serialized by a
+    lock, so that they queue in order instead of retrying on SQLite's busy timeout.
+    """
+
+    def __init__(
+        self, database_path: str, database_configuration: Dict[str, Any]
+    ) -> None:
+        """Creates object attributes for the DatabaseConnectionPool class.
+
+        Creates object attributes for the DatabaseConnectionPool class.
+
+        Args:
+            database_path: A string for the path to the SQLite3 database file.
+            database_configuration: A dictionary for the maximum number of connections in the pool, & the number
+                of seconds a statement waits for the write lock held by another connection.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            database_path, str
+        ), "Variable database_path should be of type 'str'."
+        assert isinstance(
+            database_configuration, dict
+        ), "Variable database_configuration should be of type 'dict'."
+        assert (
+            isinstance(database_configuration["pool_size"], int)
+            and database_configuration["pool_size"] > 0
+        ), "Variable database_configuration['pool_size'] should be a positive integer."
+
+        # Initializes class variables.
+        self.database_path = database_path
+        self.pool_size = database_configuration["pool_size"]
+        self.busy_timeout = database_configuration["busy_timeout"]
+        self.idle_connections = queue.LifoQueue()
+        self.n_connections = 0
+        self.lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+    def create_connection(self) -> sqlite3.Connection:
+        """Opens a new connection to the database.
+
+        Opens a new connection to the database, in autocommit mode so that transactions are started explicitly.
+        Connections are lent to one thread at a time, so they can be used from any thread.
+
+        Args:
+            None.
+
+        Returns:
+            A sqlite3.Connection object for the new connection.
+        """
+        connection = sqlite3.connect(
+            self.database_path,
+            timeout=self.busy_timeout,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def acquire(self) -> sqlite3.Connection:
+        """Takes an idle connection from the pool.
+
+        Takes an idle connection from the pool. A new connection is opened if none is idle & the pool is not full,
+        else waits until another thread returns a connection.
+
+        Args:
+            None.
+
+        Returns:
+            A sqlite3.Connection object for the connection.
+        """
+        # Returns an idle connection, if available.
+        try:
+            return self.idle_connections.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Opens a new connection, if the pool is not full.
+        with self.lock:
+            create = self.n_connections < self.pool_size
+            if create:
+                self.n_connections += 1
+        if create:
+            return self.create_connection()
+        return self.idle_connections.get()
+
+    @contextmanager
+    def cursor(self) -> Iterator[sqlite3.Cursor]:
+        """Lends a cursor on a pooled connection for the read statements in the block.
+
+        Lends a cursor on a pooled connection for the read statements in the block. Each statement reads its own
+        snapshot of the database, & the connection is returned to the pool when the block exits. Writes should be
+        made with writer or transaction.
+
+        Args:
+            None.
+
+        Returns:
+            A generator which yields the cursor.
+        """
+        connection = self.acquire()
+        try:
+            yield connection.cursor()
+        finally:
+            self.idle_connections.put(connection)
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Cursor]:
+        """Lends a cursor on a pooled connection for the write statements in the block.
+
+        Lends a cursor on a pooled connection for the write statements in the block, while holding the write lock
+        of the process. Each statement is committed on its own, which avoids the round trips of an explicit
+        transaction for single statement writes.
+
+        Args:
+            None.
+
+        Returns:
+            A generator which yields the cursor.
+        """
+        with self.write_lock, self.cursor() as cursor:
+            yield cursor
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """Runs the statements in the block as a single write transaction on a pooled connection.
+
+        Runs the statements in the block as a single write transaction on a pooled connection. The write lock of
+        the database is taken when the transaction begins, so that a read followed by a write in the block is
+        atomic. The transaction is rolled back if the block raises an exception.
+
+        Args:
+            None.
+
+        Returns:
+            A generator which yields the cursor of the connection.
+        """
+        with self.writer() as cursor:
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
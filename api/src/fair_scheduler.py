@@ -0,0 +1,133 @@
+import threading
+
+from typing import Dict, Any, Optional
+
+
+class FairScheduler(object):
+    """Chooses the workflow of the next batch, so that workflows share the prediction workers by weight.
+
+    Implements start-time fair queuing across workflows. Each workflow has a virtual time, which advances by the
+    estimated execution time of each of its batches divided by its weight, & the workflow with the smallest virtual
+    time among the workflows with pending submissions is served next. A workflow which was idle starts from the
+    virtual time of the last batch served, so that it cannot save up a share it did not use. Submissions with a
+    higher priority are served first, & workflows are only shared fairly among the highest pending priority. The
+    state is kept per replica, so each replica shares its own workers fairly.
+    """
+
+    def __init__(self, scheduling_configuration: Dict[str, Any]) -> None:
+        """Creates object attributes for the FairScheduler class.
+
+        Creates object attributes for the FairScheduler class.
+
+        Args:
+            scheduling_configuration: A dictionary for the weight of each workflow, the weight of the workflows
+                missing from it, & the smoothing factor of the estimated execution time of a batch.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            scheduling_configuration, dict
+        ), "Variable scheduling_configuration should be of type 'dict'."
+        assert all(
+            weight > 0 for weight in scheduling_configuration["weights"].values()
+        ), "Variable weights should be greater than 0."
+        assert (
+            scheduling_configuration["default_weight"] > 0
+        ), "Variable default_weight should be greater than 0."
+        assert (
+            0 < scheduling_configuration["cost_smoothing"] <= 1
+        ), "Variable cost_smoothing should be between 0 and 1."
+
+        # Initializes class variables.
+        self.weights = scheduling_configuration["weights"]
+        self.default_weight = scheduling_configuration["default_weight"]
+        self.cost_smoothing = scheduling_configuration["cost_smoothing"]
+        self.virtual_time = 0.0
+        self.workflow_virtual_times: Dict[str, float] = dict()
+        self.execution_times: Dict[str, float] = dict()
+        self.lock = threading.Lock()
+
+    def estimate_execution_time(self, workflow_name: str) -> float:
+        """Estimates the number of seconds taken to execute a batch of a workflow.
+
+        Estimates the number of seconds taken to execute a batch of a workflow, from the recent batches of the
+        workflow, or of all workflows if none of its batches were executed yet. Must be called while holding the
+        lock.
+
+        Args:
+            workflow_name: A string for the name of the workflow.
+
+        Returns:
+            A floating point value for the estimated number of seconds.
+        """
+        if workflow_name in self.execution_times:
+            return self.execution_times[workflow_name]
+        if len(self.execution_times) == 0:
+            return 1.0
+        return sum(self.execution_times.values()) / len(self.execution_times)
+
+    def select_workflow(self, pending_priorities: Dict[str, int]) -> Optional[str]:
+        """Chooses the workflow of the next batch among the workflows with pending submissions.
+
+        Chooses the workflow with the smallest virtual time among the workflows whose highest pending priority is
+        the highest of all, & advances its virtual time by the estimated execution time of a batch over its weight.
+
+        Args:
+            pending_priorities: A dictionary for the highest priority of the pending submissions of each workflow,
+                by workflow name.
+
+        Returns:
+            A string for the name of the chosen workflow, or None if no submissions are pending.
+        """
+        if len(pending_priorities) == 0:
+            return None
+
+        # Keeps the workflows with submissions of the highest pending priority.
+        highest_priority = max(pending_priorities.values())
+        workflow_names = [
+            workflow_name
+            for workflow_name, priority in pending_priorities.items()
+            if priority == highest_priority
+        ]
+
+        with self.lock:
+            # Moves the virtual time of the workflows which were idle up to the virtual time of the last batch.
+            for workflow_name in workflow_names:
+                self.workflow_virtual_times[workflow_name] = max(
+                    self.workflow_virtual_times.get(workflow_name, 0.0),
+                    self.virtual_time,
+                )
+
+            # Serves the workflow which is furthest behind its share, & charges it for the batch.
+            workflow_name = min(
+                workflow_names,
+                key=lambda name: (self.workflow_virtual_times[name], name),
+            )
+            self.virtual_time = self.workflow_virtual_times[workflow_name]
+            self.workflow_virtual_times[workflow_name] += self.estimate_execution_time(
+                workflow_name
+            ) / self.weights.get(workflow_name, self.default_weight)
+            return workflow_name
+
+    def record_execution_time(self, workflow_name: str, execution_time: float) -> None:
+        """Updates the estimated execution time of a batch of a workflow.
+
+        Updates the estimated execution time of a batch of a workflow with the execution time of its last batch,
+        as an exponential moving average.
+
+        Args:
+            workflow_name: A string for the name of the workflow.
+            execution_time: A floating point value for the number of seconds taken to execute the batch.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            if workflow_name not in self.execution_times:
+                self.execution_times[workflow_name] = execution_time
+            else:
+                self.execution_times[workflow_name] += self.cost_smoothing * (
+                    execution_time - self.execution_times[workflow_name]
+                )
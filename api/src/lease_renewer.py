@@ -0,0 +1,81 @@
+import threading
+
+from typing import Callable
+
+
+class LeaseRenewer(object):
+    """Periodically extends the leases held by this replica on the submissions it is working on.
+
+    Submissions are leased by a replica for the lease timeout, & become visible to the other replicas again once the
+    lease expires. The leases are renewed as long as the replica is alive, so that slow predictions are not run twice,
+    while the submissions of a crashed replica are re-run by the other replicas.
+    """
+
+    def __init__(self, renew_leases: Callable[[], int], renew_interval: float) -> None:
+        """Creates object attributes for the LeaseRenewer class.
+
+        Creates object attributes for the LeaseRenewer class.
+
+        Args:
+            renew_leases: A function which extends all the leases held by this replica, & returns the number of
+                leases extended.
+            renew_interval: A floating point value for the number of seconds between renewals.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert callable(renew_leases), "Variable renew_leases should be callable."
+        assert (
+            isinstance(renew_interval, (int, float)) and renew_interval > 0
+        ), "Variable renew_interval should be of type 'float' and greater than 0."
+
+        # Initializes class variables.
+        self.renew_leases = renew_leases
+        self.renew_interval = renew_interval
+        self.stop_event = threading.Event()
+
+    def run(self) -> None:
+        """Renews the leases every renew interval until the renewer is stopped.
+
+        Renews the leases every renew interval until the renewer is stopped. A failed renewal, for example when the
+        database is locked for longer than the busy timeout, is retried at the next interval.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        while not self.stop_event.wait(self.renew_interval):
+            try:
+                self.renew_leases()
+            except Exception as e:
+                print(f"Failed to renew leases: {e}")
+                print()
+
+    def start(self) -> None:
+        """Starts the thread which renews the leases.
+
+        Starts the thread which renews the leases.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops renewing the leases, so that they expire after the lease timeout.
+
+        Stops renewing the leases, so that they expire after the lease timeout.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        self.stop_event.set()
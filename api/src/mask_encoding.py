@@ -0,0 +1,122 @@
+import io
+import base64
+
+from PIL import Image
+import numpy as np
+
+from typing import Dict, Any, Union, List
+
+# Formats in which a segmentation mask can be returned. The 'list' format is the legacy nested list of pixels.
+MASK_FORMATS = ("rle", "bitpack", "png", "list")
+
+
+def encode_run_lengths(mask: np.ndarray) -> List[int]:
+    """Encodes a binary mask as the lengths of the runs of background & foreground pixels.
+
+    Encodes a binary mask as the lengths of the runs of background & foreground pixels, in row-major order. The
+    first run is always a background run, so it is 0 when the first pixel is foreground.
+
+    Args:
+        mask: A NumPy array for the binary mask.
+
+    Returns:
+        A list of integers for the lengths of the alternating runs.
+    """
+    # Finds the indices where the pixel value changes, & computes the length of each run from them.
+    pixels = mask.ravel() > 0
+    boundaries = np.concatenate(
+        ([0], np.flatnonzero(pixels[1:] != pixels[:-1]) + 1, [pixels.size])
+    )
+    counts = np.diff(boundaries).tolist()
+
+    # Adds an empty background run if the mask starts with a foreground pixel.
+    if pixels.size > 0 and pixels[0]:
+        counts.insert(0, 0)
+    return counts
+
+
+def decode_run_lengths(counts: List[int], shape: List[int]) -> np.ndarray:
+    """Decodes the lengths of the runs of background & foreground pixels into a mask.
+
+    Decodes the lengths of the runs of background & foreground pixels into a mask.
+
+    Args:
+        counts: A list of integers for the lengths of the alternating runs.
+        shape: A list of integers for the shape of the mask.
+
+    Returns:
+        A NumPy array for the mask with values 0 & 255.
+    """
+    # Repeats the value of each run by its length, starting with background.
+    values = np.where(np.arange(len(counts)) % 2 == 0, 0, 255).astype(np.uint8)
+    return np.repeat(values, counts).reshape(shape)
+
+
+def encode_mask(
+    mask: np.ndarray, mask_format: str
+) -> Union[Dict[str, Any], List[List[int]]]:
+    """Encodes a segmentation mask in the requested format.
+
+    Encodes a segmentation mask in the requested format. The 'rle' & 'bitpack' formats store the mask as binary
+    foreground & background pixels, 'png' stores the base64 encoded bytes of a grayscale PNG image, & 'list'
+    returns the legacy nested list of pixel values.
+
+    Args:
+        mask: A NumPy array for the segmentation mask with values 0 & 255.
+        mask_format: A string for the format in which the mask should be encoded.
+
+    Returns:
+        A dictionary for the format, shape & data of the encoded mask, or a nested list for the 'list' format.
+    """
+    # Asserts type & value of the arguments.
+    assert isinstance(mask, np.ndarray), "Variable mask should be of type 'np.ndarray'."
+    assert (
+        mask_format in MASK_FORMATS
+    ), f"Variable mask_format should be one of {MASK_FORMATS}."
+
+    # Returns the legacy format as it is.
+    if mask_format == "list":
+        return mask.tolist()
+
+    # Encodes the mask based on the requested format.
+    if mask_format == "rle":
+        data = encode_run_lengths(mask)
+    elif mask_format == "bitpack":
+        data = base64.b64encode(np.packbits(mask.ravel() > 0).tobytes()).decode("ascii")
+    else:
+        buffer = io.BytesIO()
+        Image.fromarray(mask.astype(np.uint8)).save(buffer, format="PNG")
+        data = base64.b64encode(buffer.getvalue()).decode("ascii")
+    return {"format": mask_format, "shape": list(mask.shape), "data": data}
+
+
+def decode_mask(encoded_mask: Union[Dict[str, Any], List[List[int]]]) -> np.ndarray:
+    """Decodes a segmentation mask encoded by encode_mask.
+
+    Decodes a segmentation mask encoded by encode_mask.
+
+    Args:
+        encoded_mask: A dictionary for the format, shape & data of the encoded mask, or a nested list.
+
+    Returns:
+        A NumPy array for the segmentation mask.
+    """
+    # Converts the legacy format directly into an array.
+    if isinstance(encoded_mask, list):
+        return np.array(encoded_mask, dtype=np.uint8)
+
+    # Decodes the mask based on its format.
+    shape = encoded_mask["shape"]
+    if encoded_mask["format"] == "rle":
+        return decode_run_lengths(encoded_mask["data"], shape)
+    elif encoded_mask["format"] == "bitpack":
+        bits = np.unpackbits(
+            np.frombuffer(base64.b64decode(encoded_mask["data"]), dtype=np.uint8),
+            count=int(np.prod(shape)),
+        )
+        return (bits * 255).astype(np.uint8).reshape(shape)
+    elif encoded_mask["format"] == "png":
+        return np.asarray(
+            Image.open(io.BytesIO(base64.b64decode(encoded_mask["data"])))
+        )
+    raise ValueError(f"Unsupported mask format '{encoded_mask['format']}'.")
@@ -0,0 +1,242 @@
+import numpy as np
+
+from typing import Dict, Any, List, Optional, Tuple
+
+# Parts of a segmentation result which can be returned: the full mask, its summary, or both.
+MASK_OUTPUTS = ("mask", "summary", "both")
+
+
+def extract_boundary_edges(mask: np.ndarray) -> np.ndarray:
+    """Extracts the directed edges between foreground & background pixels of a binary mask.
+
+    Extracts the directed edges between foreground & background pixels of a binary mask. Edges join the corners of
+    pixels, & are directed so that the foreground is on their right, which makes each boundary a closed loop.
+
+    Args:
+        mask: A NumPy array for the binary mask.
+
+    Returns:
+        A NumPy array of shape (n_edges, 4) for the x & y coordinates of the start & end corner of each edge.
+    """
+    padded_mask = np.pad(mask > 0, 1)
+
+    # Finds the horizontal edges on top & bottom of foreground pixels.
+    above, below = padded_mask[:-1, 1:-1], padded_mask[1:, 1:-1]
+    top_y, top_x = np.nonzero(below & ~above)
+    bottom_y, bottom_x = np.nonzero(above & ~below)
+
+    # Finds the vertical edges on the left & right of foreground pixels.
+    left, right = padded_mask[1:-1, :-1], padded_mask[1:-1, 1:]
+    left_y, left_x = np.nonzero(right & ~left)
+    right_y, right_x = np.nonzero(left & ~right)
+
+    # Stacks the start & end corners of the edges, going clockwise around the foreground.
+    return np.concatenate(
+        [
+            np.stack([top_x, top_y, top_x + 1, top_y], axis=1),
+            np.stack([right_x, right_y, right_x, right_y + 1], axis=1),
+            np.stack([bottom_x + 1, bottom_y, bottom_x, bottom_y], axis=1),
+            np.stack([left_x, left_y + 1, left_x, left_y], axis=1),
+        ]
+    )
+
+
+def link_boundary_edges(edges: np.ndarray, width: int) -> np.ndarray:
+    """Finds the edge which follows each directed boundary edge.
+
+    Finds the edge which follows each directed boundary edge, which is the edge starting at its end corner. Where
+    two regions touch diagonally, two edges start at the corner, & the edge which turns right is followed, so that
+    the regions are traced separately. Each edge then has exactly one successor & one predecessor, so the
+    boundaries are the cycles of the successors.
+
+    Args:
+        edges: A NumPy array of shape (n_edges, 4) for the x & y coordinates of the start & end corner of each edge.
+        width: An integer for the number of corners in each row of the mask.
+
+    Returns:
+        A NumPy array of shape (n_edges,) for the index of the successor of each edge.
+    """
+    # Finds the edges starting at the end corner of each edge, by sorting the edges by the key of their start corner.
+    start_keys = edges[:, 1] * width + edges[:, 0]
+    end_keys = edges[:, 3] * width + edges[:, 2]
+    order = np.argsort(start_keys, kind="stable")
+    first_positions = np.searchsorted(start_keys[order], end_keys, side="left")
+    n_candidates = (
+        np.searchsorted(start_keys[order], end_keys, side="right") - first_positions
+    )
+    successors = order[first_positions]
+
+    # Chooses the edge which turns right, where two regions touch diagonally.
+    ambiguous = np.flatnonzero(n_candidates == 2)
+    if len(ambiguous) > 0:
+        directions = edges[:, 2:] - edges[:, :2]
+        first_candidates = successors[ambiguous]
+        second_candidates = order[first_positions[ambiguous] + 1]
+        dx, dy = directions[ambiguous, 0], directions[ambiguous, 1]
+        first_turns = (
+            dx * directions[first_candidates, 1] - dy * directions[first_candidates, 0]
+        )
+        second_turns = (
+            dx * directions[second_candidates, 1]
+            - dy * directions[second_candidates, 0]
+        )
+        successors[ambiguous] = np.where(
+            second_turns > first_turns, second_candidates, first_candidates
+        )
+    return successors
+
+
+def rank_cycles(successors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Labels each element of a permutation with its cycle, & its distance from the end of the cycle.
+
+    Labels each element of a permutation with its cycle, & its distance from the end of the cycle, by pointer
+    jumping, which takes a logarithmic number of vectorized steps instead of following the cycles one element at a
+    time. Each cycle is labelled by its smallest element, from which it starts, & ends at its predecessor.
+
+    Args:
+        successors: A NumPy array for the successor of each element of the permutation.
+
+    Returns:
+        A tuple of NumPy arrays for the label of the cycle of each element, & the number of elements which follow it
+            in its cycle.
+    """
+    n_steps = int(np.ceil(np.log2(max(len(successors), 2))))
+
+    # Labels each cycle by its smallest element, as the minimum over 2 ** n_steps successors covers the cycle.
+    labels = np.arange(len(successors))
+    jumps = successors
+    for _ in range(n_steps):
+        labels = np.minimum(labels, labels[jumps])
+        jumps = jumps[jumps]
+
+    # Breaks each cycle before its smallest element, & ranks the elements of the resulting lists by list ranking.
+    jumps = np.where(successors == labels, -1, successors)
+    distances = (jumps >= 0).astype(np.int64)
+    for _ in range(n_steps):
+        linked = np.flatnonzero(jumps >= 0)
+        if len(linked) == 0:
+            break
+        distances[linked] += distances[jumps[linked]]
+        jumps[linked] = jumps[jumps[linked]]
+    return labels, distances
+
+
+def trace_contours(
+    mask: np.ndarray, max_contours: Optional[int] = None
+) -> List[np.ndarray]:
+    """Traces the boundaries of a binary mask into closed polygons, largest first.
+
+    Traces the boundaries of a binary mask into closed polygons, by linking the directed boundary edges end to
+    start. Where two regions touch diagonally, the edge which turns right is followed, so that the regions are traced
+    separately. Vertices between collinear edges are removed. The edges are linked & ordered with array operations,
+    & the areas of the polygons are computed from the edges, so that only the largest polygons are extracted.
+
+    Args:
+        mask: A NumPy array for the binary mask.
+        max_contours: An integer for the maximum number of polygons, starting with the largest, or None for all.
+
+    Returns:
+        A list of NumPy arrays of shape (n_vertices, 2) for the x & y coordinates of the vertices of each polygon,
+            sorted by their area, largest first.
+    """
+    edges = extract_boundary_edges(mask)
+    if len(edges) == 0:
+        return list()
+
+    # Links the edges into cycles, & orders the edges of each cycle from its smallest edge.
+    successors = link_boundary_edges(edges, mask.shape[1] + 1)
+    labels, distances = rank_cycles(successors)
+    order = np.lexsort((-distances, labels))
+
+    # Keeps only the vertices where the direction of the boundary changes from the previous edge.
+    directions = edges[:, 2:] - edges[:, :2]
+    predecessors = np.empty_like(successors)
+    predecessors[successors] = np.arange(len(successors))
+    turns = np.any(directions != directions[predecessors], axis=1)
+
+    # Computes the area of each polygon with the shoelace formula, summed over its edges.
+    roots = np.flatnonzero(labels == np.arange(len(labels)))
+    areas = np.abs(
+        np.bincount(
+            labels,
+            weights=edges[:, 0] * edges[:, 3] - edges[:, 1] * edges[:, 2],
+            minlength=len(labels),
+        )[roots]
+    )
+
+    # Extracts the vertices of the largest polygons, whose edges are contiguous in the order.
+    starts = np.searchsorted(labels[order], roots)
+    ends = np.append(starts[1:], len(order))
+    contours = list()
+    for position in np.argsort(-areas, kind="stable")[:max_contours]:
+        indices = order[starts[position] : ends[position]]
+        contours.append(edges[indices[turns[indices]], :2])
+    return contours
+
+
+def summarize_mask(
+    mask: np.ndarray, max_contours: int, max_contour_points: int
+) -> Dict[str, Any]:
+    """Computes the area, bounding box, centroid & contours of the foreground of a segmentation mask.
+
+    Computes the area, bounding box, centroid & contours of the foreground of a segmentation mask. The area &
+    centroid are computed from the row & column sums of the mask, so the size of the summary is bounded by the
+    number of contours & their points, instead of the resolution of the mask. Contours are sorted by their area, &
+    evenly subsampled if they have more than the maximum number of points.
+
+    Args:
+        mask: A NumPy array for the segmentation mask with values 0 & 255.
+        max_contours: An integer for the maximum number of contours, starting with the largest.
+        max_contour_points: An integer for the maximum number of points in each contour.
+
+    Returns:
+        A dictionary for the area in pixels & as a fraction of the mask, the bounding box as [x_min, y_min, x_max,
+            y_max] in pixel indices, the centroid as [x, y], & the contours as lists of [x, y] pixel corners.
+    """
+    # Asserts type of the arguments.
+    assert isinstance(mask, np.ndarray), "Variable mask should be of type 'np.ndarray'."
+    assert (
+        isinstance(max_contours, int) and max_contours >= 0
+    ), "Variable max_contours should be a non-negative integer."
+    assert (
+        isinstance(max_contour_points, int) and max_contour_points >= 3
+    ), "Variable max_contour_points should be an integer of at least 3."
+
+    # Computes the area from the number of foreground pixels in each row & column.
+    foreground = mask > 0
+    row_counts = np.count_nonzero(foreground, axis=1)
+    column_counts = np.count_nonzero(foreground, axis=0)
+    area = int(row_counts.sum())
+    summary = {
+        "area": area,
+        "area_fraction": area / foreground.size,
+        "bounding_box": None,
+        "centroid": None,
+        "contours": list(),
+    }
+    if area == 0:
+        return summary
+
+    # Computes the bounding box & centroid from the rows & columns which contain foreground pixels.
+    rows, columns = np.flatnonzero(row_counts), np.flatnonzero(column_counts)
+    summary["bounding_box"] = [
+        int(columns[0]),
+        int(rows[0]),
+        int(columns[-1]),
+        int(rows[-1]),
+    ]
+    summary["centroid"] = [
+        float(np.dot(column_counts, np.arange(len(column_counts))) / area),
+        float(np.dot(row_counts, np.arange(len(row_counts))) / area),
+    ]
+
+    # Traces the largest contours, with a bounded number of points.
+    for vertices in trace_contours(foreground, max_contours):
+        if len(vertices) > max_contour_points:
+            vertices = vertices[
+                np.linspace(
+                    0, len(vertices), max_contour_points, endpoint=False
+                ).astype(int)
+            ]
+        summary["contours"].append(vertices.tolist())
+    return summary
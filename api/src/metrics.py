@@ -0,0 +1,408 @@
+import time
+import threading
+from contextlib import contextmanager
+
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# Upper bounds in seconds of the histogram buckets, from sub-millisecond serialization up to slow workflows.
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def format_labels(label_names: Sequence[str], label_values: Tuple[str, ...]) -> str:
+    """Formats label names & values as a Prometheus label set.
+
+    Formats label names & values as a Prometheus label set, escaping backslashes, double quotes & new lines in the
+    values.
+
+    Args:
+        label_names: A sequence of strings for the names of the labels.
+        label_values: A tuple of strings for the values of the labels, in the same order as the names.
+
+    Returns:
+        A string for the label set, or an empty string if there are no labels.
+    """
+    if len(label_names) == 0:
+        return ""
+    pairs = list()
+    for name, value in zip(label_names, label_values):
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+class Histogram(object):
+    """Counts observed durations into cumulative buckets, for each combination of label values."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Creates object attributes for the Histogram class.
+
+        Creates object attributes for the Histogram class.
+
+        Args:
+            name: A string for the name of the metric.
+            documentation: A string for the help text of the metric.
+            label_names: A sequence of strings for the names of the labels.
+            buckets: A sequence of floating point values for the upper bounds of the buckets, in increasing order.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(name, str), "Variable name should be of type 'str'."
+        assert isinstance(
+            documentation, str
+        ), "Variable documentation should be of type 'str'."
+        assert list(buckets) == sorted(
+            buckets
+        ), "Variable buckets should be in increasing order."
+
+        # Initializes class variables.
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple[str, ...], List[float]] = dict()
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Adds an observed value to the histogram of the label values.
+
+        Adds an observed value to the histogram of the label values. Each series holds the count of each bucket,
+        followed by the sum & the count of all observations.
+
+        Args:
+            value: A floating point value for the observation, in seconds.
+            labels: Strings for the value of each label of the metric.
+
+        Returns:
+            None.
+        """
+        label_values = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            series = self.series.get(label_values)
+            if series is None:
+                series = [0.0] * (len(self.buckets) + 2)
+                self.series[label_values] = series
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes the number of seconds taken by the block.
+
+        Observes the number of seconds taken by the block, even if it raises an exception.
+
+        Args:
+            labels: Strings for the value of each label of the metric.
+
+        Returns:
+            None.
+        """
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def render(self) -> List[str]:
+        """Renders the histogram in the Prometheus text format.
+
+        Renders the histogram in the Prometheus text format, with cumulative bucket counts.
+
+        Args:
+            None.
+
+        Returns:
+            A list of strings for the lines of the metric.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self.lock:
+            series = {
+                label_values: list(values)
+                for label_values, values in self.series.items()
+            }
+        for label_values, values in sorted(series.items()):
+            # Accumulates the counts of the buckets, the last bucket holding all the observations.
+            cumulative_counts = list()
+            for count in values[: len(self.buckets)]:
+                cumulative_counts.append(count + sum(cumulative_counts[-1:]))
+            for upper_bound, cumulative_count in zip(
+                [str(bound) for bound in self.buckets] + ["+Inf"],
+                cumulative_counts + [values[-1]],
+            ):
+                labels = format_labels(
+                    self.label_names + ("le",), label_values + (upper_bound,)
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative_count:g}")
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {values[-2]:.6f}")
+            lines.append(f"{self.name}_count{labels} {values[-1]:g}")
+        return lines
+
+
+class Gauge(object):
+    """Holds a current value, such as the number of in-flight jobs, for each combination of label values."""
+
+    def __init__(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> None:
+        """Creates object attributes for the Gauge class.
+
+        Creates object attributes for the Gauge class.
+
+        Args:
+            name: A string for the name of the metric.
+            documentation: A string for the help text of the metric.
+            label_names: A sequence of strings for the names of the labels.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(name, str), "Variable name should be of type 'str'."
+        assert isinstance(
+            documentation, str
+        ), "Variable documentation should be of type 'str'."
+
+        # Initializes class variables.
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.values: Dict[Tuple[str, ...], float] = dict()
+        self.lock = threading.Lock()
+
+    def set(self, value: float, **labels: str) -> None:
+        """Sets the value of the gauge for the label values.
+
+        Sets the value of the gauge for the label values.
+
+        Args:
+            value: A floating point value for the gauge.
+            labels: Strings for the value of each label of the metric.
+
+        Returns:
+            None.
+        """
+        label_values = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            self.values[label_values] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Adds an amount to the value of the gauge for the label values.
+
+        Adds an amount to the value of the gauge for the label values. A negative amount decreases the value.
+
+        Args:
+            amount: A floating point value added to the gauge.
+            labels: Strings for the value of each label of the metric.
+
+        Returns:
+            None.
+        """
+        label_values = tuple(str(labels[name]) for name in self.label_names)
+        with self.lock:
+            self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    @contextmanager
+    def track_in_progress(self, amount: float = 1, **labels: str) -> Iterator[None]:
+        """Increases the gauge while the block runs.
+
+        Increases the gauge by the amount while the block runs, & decreases it again once the block exits, even if
+        it raises an exception.
+
+        Args:
+            amount: A floating point value added to the gauge while the block runs.
+            labels: Strings for the value of each label of the metric.
+
+        Returns:
+            None.
+        """
+        self.inc(amount, **labels)
+        try:
+            yield
+        finally:
+            self.inc(-amount, **labels)
+
+    def render(self) -> List[str]:
+        """Renders the gauge in the Prometheus text format.
+
+        Renders the gauge in the Prometheus text format.
+
+        Args:
+            None.
+
+        Returns:
+            A list of strings for the lines of the metric.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+        ]
+        with self.lock:
+            values = dict(self.values)
+        for label_values, value in sorted(values.items()):
+            lines.append(
+                f"{self.name}{format_labels(self.label_names, label_values)} {value:g}"
+            )
+        return lines
+
+
+class MetricsRegistry(object):
+    """Collects the metrics of the API, & renders them for the '/metrics' endpoint."""
+
+    def __init__(self) -> None:
+        """Creates object attributes for the MetricsRegistry class.
+
+        Creates object attributes for the MetricsRegistry class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        # Initializes class variables.
+        self.metrics = list()
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Creates a histogram, & registers it.
+
+        Creates a histogram, & registers it.
+
+        Args:
+            name: A string for the name of the metric.
+            documentation: A string for the help text of the metric.
+            label_names: A sequence of strings for the names of the labels.
+            buckets: A sequence of floating point values for the upper bounds of the buckets, in increasing order.
+
+        Returns:
+            A Histogram object for the metric.
+        """
+        metric = Histogram(name, documentation, label_names, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(
+        self, name: str, documentation: str, label_names: Sequence[str] = ()
+    ) -> Gauge:
+        """Creates a gauge, & registers it.
+
+        Creates a gauge, & registers it.
+
+        Args:
+            name: A string for the name of the metric.
+            documentation: A string for the help text of the metric.
+            label_names: A sequence of strings for the names of the labels.
+
+        Returns:
+            A Gauge object for the metric.
+        """
+        metric = Gauge(name, documentation, label_names)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Renders all the registered metrics in the Prometheus text format.
+
+        Renders all the registered metrics in the Prometheus text format.
+
+        Args:
+            None.
+
+        Returns:
+            A string for the exposition of all the metrics.
+        """
+        lines = list()
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Creates the registry of the API, & the metrics observed by the stages of a prediction.
+registry = MetricsRegistry()
+queue_wait_seconds = registry.histogram(
+    "ml_showcase_queue_wait_seconds",
+    "Seconds a submission waited in the queue before a worker claimed it.",
+    ["workflow"],
+)
+image_decode_seconds = registry.histogram(
+    "ml_showcase_image_decode_seconds",
+    "Seconds taken to load or decode an uploaded image.",
+)
+preprocess_seconds = registry.histogram(
+    "ml_showcase_preprocess_seconds",
+    "Seconds taken to preprocess a batch of images for a model.",
+    ["model", "version"],
+)
+serialize_seconds = registry.histogram(
+    "ml_showcase_serialize_seconds",
+    "Seconds taken to encode a predict request or decode a predict response.",
+    ["transport", "operation"],
+)
+model_round_trip_seconds = registry.histogram(
+    "ml_showcase_model_round_trip_seconds",
+    "Seconds taken by TensorFlow Serving to answer a predict request, excluding serialization.",
+    ["model", "version"],
+)
+postprocess_seconds = registry.histogram(
+    "ml_showcase_postprocess_seconds",
+    "Seconds taken to extract the predictions of a batch from the outputs of a model.",
+    ["model", "version"],
+)
+workflow_execution_seconds = registry.histogram(
+    "ml_showcase_workflow_execution_seconds",
+    "Seconds taken to execute a workflow for a batch of submissions.",
+    ["workflow"],
+)
+result_write_seconds = registry.histogram(
+    "ml_showcase_result_write_seconds",
+    "Seconds taken to write the result of a submission.",
+)
+fetch_seconds = registry.histogram(
+    "ml_showcase_fetch_seconds",
+    "Seconds taken to answer a fetch_result request, including any long-poll wait.",
+    ["status"],
+)
+queue_depth = registry.gauge(
+    "ml_showcase_queue_depth",
+    "Number of submissions waiting in the queue to be claimed.",
+)
+in_flight_jobs = registry.gauge(
+    "ml_showcase_in_flight_jobs",
+    "Number of submissions being predicted by this replica.",
+    ["workflow"],
+)
@@ -1,36 +1,37 @@
 import os
-import json
 
-import requests
 import numpy as np
 
 from src.utils import load_json_file
+from src.preprocessing import BufferPool, normalize_images
+from src.metrics import preprocess_seconds, postprocess_seconds
+from src.serving.transports import ModelServingError
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 
 class FlairAbnormalityClassification(object):
     """Predicts whether is FLAIR abnormality in brain MRI images."""
 
-    def __init__(self, model_version: str, model_api_url: str) -> None:
+    def __init__(self, model_version: str, transport: Any) -> None:
         """Creates object attributes for the FlairAbnormalityClassification class.
 
         Creates object attributes for the FlairAbnormalityClassification class.
 
         Args:
             model_version: A string for the version of the model should be used for prediction.
-            model_api_url: A string for the URL of the model's API.
+            transport: A RESTTransport or GRPCTransport object used to send requests to the model's API.
 
         Returns:
             None.
         """
         # Asserts type & value of the arguments.
         assert isinstance(model_version, str), "Variable model_version of type 'str'."
-        assert isinstance(model_api_url, str), "Variable model_api_url of type 'str'."
 
         # Initalizes class variables.
         self.model_version = model_version
-        self.model_api_url = model_api_url
+        self.transport = transport
+        self.buffer_pool = BufferPool()
         self.id_to_class = {0: "no_abnormality", 1: "abnormality"}
 
     def load_model_configuration(self) -> None:
@@ -58,45 +59,28 @@ class FlairAbnormalityClassification(object):
     def test_model_api(self) -> None:
         """Checks if the model's TensorFlow Serving URL is working as expected.
 
-        Checks if the model's TensorFlow Serving URL is working as expected.
+        Checks if the model's TensorFlow Serving URL is working as expected, using the cheap status or metadata
+        endpoint of the transport instead of a prediction.
 
         Args:
             None.
 
         Returns:
             None.
+
+        Exceptions:
+            ModelServingError: If the model is not available.
         """
         # Checks if the model's TensorFlow Serving URL is working as expected.
         try:
-            response = requests.post(
-                self.model_api_url,
-                data=json.dumps(
-                    {
-                        "inputs": np.zeros(
-                            (
-                                2,
-                                self.model_configuration["model"]["final_image_height"],
-                                self.model_configuration["model"]["final_image_width"],
-                                self.model_configuration["model"]["n_channels"],
-                            )
-                        ).tolist()
-                    }
-                ),
-                headers={"content-type": "application/json"},
-            )
-            print(
-                f"FLAIR Abnormality Classification model v{self.model_version} status: {response.status_code}"
-            )
-
-            # Checks if response code is 200.
-            if response.status_code != 200:
-                print(response.text)
-                exit()
-        except requests.exceptions.ConnectionError:
-            print(
-                f"URL: {self.model_api_url} does not exist. Received 'requests.exceptions.ConnectionError' error."
+            self.transport.check_status()
+        except ModelServingError as error:
+            raise ModelServingError(
+                f"URL: {self.transport.model_api_url} is not working as expected. Received error: {error}"
             )
-            exit()
+        print(
+            f"FLAIR Abnormality Classification model v{self.model_version} status: OK"
+        )
 
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """Preprocesses the image for prediction.
@@ -120,6 +104,72 @@ class FlairAbnormalityClassification(object):
         image = image / 255.0
         return image
 
+    def preprocess_batch(self, images: List[np.ndarray]) -> np.ndarray:
+        """Preprocesses a batch of images based on model requirements.
+
+        Preprocesses a batch of images based on model requirements, by normalizing them in a single pass into a
+        reusable float32 buffer. The result is equal to stacking the output of preprocess_image for each image, but
+        the buffer is overwritten by the next batch preprocessed by the same thread.
+
+        Args:
+            images: A list of NumPy arrays for the images. All images should have the same shape.
+
+        Returns:
+            A NumPy array for the preprocessed batch of images.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(images, list), "Variable images should be of type 'list'."
+        assert len(images) > 0, "Variable images should not be empty."
+
+        # Normalizes the images from [0, 255] range to [0, 1] range into the buffer of the current thread.
+        model_input_images = self.buffer_pool.get(
+            "model_input_images", (len(images),) + images[0].shape
+        )
+        return normalize_images(images, model_input_images)
+
+    def predict_batch(self, images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """Predicts if each brain MRI image in a batch has FLAIR abnormality.
+
+        Predicts if each brain MRI image in a batch has FLAIR abnormality, using one request to the model's API.
+
+        Args:
+            images: A list of NumPy arrays for the images of brain MRI. All images should have the same shape.
+
+        Returns:
+            A list of dictionaries for status of the prediction, along with type of image, and a floating point value
+                for the confidence score of prediction, in the same order as the images.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(images, list), "Variable images should be of type 'list'."
+        assert len(images) > 0, "Variable images should not be empty."
+
+        # Preprocesses the images into a single batch.
+        with preprocess_seconds.time(
+            model="bms_flair_abnormality_classification", version=self.model_version
+        ):
+            model_input_images = self.preprocess_batch(images)
+
+        # Predicts the class for each image in the current input batch.
+        try:
+            predictions = self.transport.predict(model_input_images)
+        except ModelServingError as error:
+            return [{"status": "Failure", "message": str(error)} for _ in images]
+
+        # Computes id of the class predicted by the model, & extracts the confidence score for each image.
+        with postprocess_seconds.time(
+            model="bms_flair_abnormality_classification", version=self.model_version
+        ):
+            predicted_ids = np.argmax(predictions, axis=1)
+            scores = predictions[np.arange(len(images)), predicted_ids]
+            return [
+                {
+                    "status": "Success",
+                    "label": self.id_to_class[int(predicted_id)],
+                    "score": float(score),
+                }
+                for predicted_id, score in zip(predicted_ids, scores)
+            ]
+
     def predict(self, image: np.ndarray) -> Dict[str, Any]:
         """Predicts if the brain MRI image has FLAIR abnormality.
 
@@ -129,23 +179,11 @@ class FlairAbnormalityClassification(object):
             image: A NumPy array for the image of brain MRI.
 
         Returns:
-            A dictionary for type of image, and a floating point value for the confidence score of prediction.
+            A dictionary for status of the prediction, along with type of image, and a floating point value for the
+                confidence score of prediction.
         """
         # Asserts type & value of the arguments.
         assert isinstance(image, np.ndarray), "Variable image of type 'np.ndarray'."
 
-        # Preprocesses the image for prediction.
-        model_input_image = self.preprocess_image(image)
-
-        # Predicts the class for each image in the current input batch.
-        response = requests.post(
-            self.model_api_url,
-            data=json.dumps({"inputs": model_input_image.tolist()}),
-            headers={"content-type": "application/json"},
-        )
-        prediction = json.loads(response.text)["outputs"]
-
-        # Computes id of the class predicted by the model, & extracts the confidence score.
-        predicted_id = int(np.argmax(prediction[0]))
-        score = float(prediction[0][predicted_id])
-        return {"label": self.id_to_class[predicted_id], "score": score}
+        # Predicts if the brain MRI image has FLAIR abnormality as a batch of size 1.
+        return self.predict_batch([image])[0]
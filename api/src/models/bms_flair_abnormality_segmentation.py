@@ -1,34 +1,37 @@
 import os
-import json
 
-import requests
 import numpy as np
 
 from src.utils import load_json_file
+from src.preprocessing import BufferPool, threshold_images
+from src.metrics import preprocess_seconds, postprocess_seconds
+from src.serving.transports import ModelServingError
+
+from typing import Dict, List, Any
 
 
 class FlairAbnormalitySegmentation(object):
     """Predicts segmentation mask for FLAIR abnormality in brain MRI images."""
 
-    def __init__(self, model_version: str, model_api_url: str) -> None:
+    def __init__(self, model_version: str, transport: Any) -> None:
         """Creates object attributes for the FlairAbnormalitySegmentation class.
 
         Creates object attributes for the FlairAbnormalitySegmentation class.
 
         Args:
             model_version: A string for the version of the model should be used for prediction.
-            model_api_url: A string for the URL of the model's API.
+            transport: A RESTTransport or GRPCTransport object used to send requests to the model's API.
 
         Returns:
             None.
         """
         # Asserts type & value of the arguments.
         assert isinstance(model_version, str), "Variable model_version of type 'str'."
-        assert isinstance(model_api_url, str), "Variable model_api_url of type 'str'."
 
         # Initalizes class variables.
         self.model_version = model_version
-        self.model_api_url = model_api_url
+        self.transport = transport
+        self.buffer_pool = BufferPool()
 
     def load_model_configuration(self) -> None:
         """Loads the model configuration file for model version.
@@ -55,45 +58,26 @@ class FlairAbnormalitySegmentation(object):
     def test_model_api(self) -> None:
         """Checks if the model's TensorFlow Serving URL is working as expected.
 
-        Checks if the model's TensorFlow Serving URL is working as expected.
+        Checks if the model's TensorFlow Serving URL is working as expected, using the cheap status or metadata
+        endpoint of the transport instead of a prediction.
 
         Args:
             None.
 
         Returns:
             None.
+
+        Exceptions:
+            ModelServingError: If the model is not available.
         """
         # Checks if the model's TensorFlow Serving URL is working as expected.
         try:
-            response = requests.post(
-                self.model_api_url,
-                data=json.dumps(
-                    {
-                        "inputs": np.zeros(
-                            (
-                                2,
-                                self.model_configuration["model"]["final_image_height"],
-                                self.model_configuration["model"]["final_image_width"],
-                                self.model_configuration["model"]["n_channels"],
-                            )
-                        ).tolist()
-                    }
-                ),
-                headers={"content-type": "application/json"},
-            )
-            print(
-                f"FLAIR Abnormality Segmentation model v{self.model_version} status: {response.status_code}"
-            )
-
-            # Checks if response code is 200.
-            if response.status_code != 200:
-                print(response.text)
-                exit()
-        except requests.exceptions.ConnectionError:
-            print(
-                f"URL: {self.model_api_url} does not exist. Received 'requests.exceptions.ConnectionError' error."
+            self.transport.check_status()
+        except ModelServingError as error:
+            raise ModelServingError(
+                f"URL: {self.transport.model_api_url} is not working as expected. Received error: {error}"
             )
-            exit()
+        print(f"FLAIR Abnormality Segmentation model v{self.model_version} status: OK")
 
     def threshold_image(self, image: np.ndarray) -> np.ndarray:
         """Thresholds image to have better distinction of regions in image.
@@ -163,14 +147,82 @@ class FlairAbnormalitySegmentation(object):
         predicted_image = np.squeeze(predicted_image, axis=-1)
 
         # De-normalizes predicted image from [0, 1] to [0, 255].
-        predicted_image *= 255.0
+        predicted_image = predicted_image * 255.0
 
         # Thresholds the predicted image to convert into black & white image, and type casts it to uint8
         predicted_image = self.threshold_image(predicted_image)
         predicted_image = predicted_image.astype(np.uint8)
         return predicted_image
 
-    def predict(self, image: np.ndarray) -> np.ndarray:
+    def preprocess_batch(self, images: List[np.ndarray]) -> np.ndarray:
+        """Preprocesses a batch of images based on model requirements.
+
+        Preprocesses a batch of images based on model requirements, by thresholding them in a single pass into a
+        reusable float32 buffer. The result is equal to stacking the output of preprocess_image for each image, but
+        the buffer is overwritten by the next batch preprocessed by the same thread.
+
+        Args:
+            images: A list of NumPy arrays for the images. All images should have the same shape.
+
+        Returns:
+            A NumPy array for the preprocessed batch of images.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(images, list), "Variable images should be of type 'list'."
+        assert len(images) > 0, "Variable images should not be empty."
+
+        # Thresholds the images, & normalizes them to [0, 1] range into the buffer of the current thread.
+        model_input_images = self.buffer_pool.get(
+            "model_input_images", (len(images),) + images[0].shape
+        )
+        return threshold_images(
+            images, self.model_configuration["model"]["threshold"], model_input_images
+        )
+
+    def predict_batch(self, images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """Predicts segmentation masks for FLAIR abnormality in a batch of brain MRI images.
+
+        Predicts segmentation masks for FLAIR abnormality in a batch of brain MRI images, using one request to the
+        model's API.
+
+        Args:
+            images: A list of NumPy arrays for the images of brain MRI. All images should have the same shape.
+
+        Returns:
+            A list of dictionaries for status of the prediction, along with a NumPy array for the mask predicted by
+                the model, in the same order as the images.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(images, list), "Variable images should be of type 'list'."
+        assert len(images) > 0, "Variable images should not be empty."
+
+        # Preprocesses the images into a single batch.
+        with preprocess_seconds.time(
+            model="bms_flair_abnormality_segmentation", version=self.model_version
+        ):
+            model_input_images = self.preprocess_batch(images)
+
+        # Predicts the class for each pixel in the current input batch.
+        try:
+            predictions = self.transport.predict(model_input_images)
+        except ModelServingError as error:
+            return [{"status": "Failure", "message": str(error)} for _ in images]
+
+        # Converts the prediction for each image from the segmentation model into an image.
+        with postprocess_seconds.time(
+            model="bms_flair_abnormality_segmentation", version=self.model_version
+        ):
+            return [
+                {
+                    "status": "Success",
+                    "image": self.postprocess_prediction(
+                        predictions[index : index + 1]
+                    ),
+                }
+                for index in range(len(images))
+            ]
+
+    def predict(self, image: np.ndarray) -> Dict[str, Any]:
         """Predicts segmentation mask for FLAIR abnormality in brain MRI images.
 
         Predicts segmentation mask for FLAIR abnormality in brain MRI images.
@@ -179,24 +231,12 @@ class FlairAbnormalitySegmentation(object):
             image: A NumPy array for the current image in the document.
 
         Returns:
-            A NumPy array for the mask predicted by the model.
+            A dictionary for status of the prediction, along with a NumPy array for the mask predicted by the model.
         """
         # Asserts type & value of the arguments.
         assert isinstance(
             image, np.ndarray
         ), "Variable image should be of type 'np.ndarray'."
 
-        # Preprocesses input image based on segmentation model requirements.
-        model_input_image = self.preprocess_image(image)
-
-        # Predicts the class for each pixel in the current input batch.
-        response = requests.post(
-            self.model_api_url,
-            data=json.dumps({"inputs": model_input_image.tolist()}),
-            headers={"content-type": "application/json"},
-        )
-        prediction = np.array(json.loads(response.text)["outputs"])
-
-        # Converts the prediction from the segmentation model into an image.
-        predicted_image = self.postprocess_prediction(prediction)
-        return predicted_image
+        # Predicts segmentation mask for the image as a batch of size 1.
+        return self.predict_batch([image])[0]
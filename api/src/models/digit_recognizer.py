@@ -1,25 +1,26 @@
 import os
-import json
 
-import requests
 import numpy as np
 
 from src.utils import load_json_file
+from src.preprocessing import BufferPool, normalize_images, grayscale_normalize_images
+from src.metrics import preprocess_seconds, postprocess_seconds
+from src.serving.transports import ModelServingError
 
-from typing import Dict, Any
+from typing import Dict, Any, List
 
 
 class DigitRecognizer(object):
     """Recognizes digit in an image."""
 
-    def __init__(self, model_version: str, model_api_url: str) -> None:
+    def __init__(self, model_version: str, transport: Any) -> None:
         """Creates object attributes for DigitRecognizer class.
 
         Creates object attributes for DigitRecognizer class.
 
         Args:
             model_version: A string for the version of the model.
-            model_api_url: A string for the URL of the model's API.
+            transport: A RESTTransport or GRPCTransport object used to send requests to the model's API.
 
         Returns:
             None.
@@ -28,13 +29,11 @@ class DigitRecognizer(object):
         assert isinstance(
             model_version, str
         ), "Variable model_version should be of type 'str'."
-        assert isinstance(
-            model_api_url, str
-        ), "Variable model_api_url should be of type 'str'."
 
         # Initializes class variables.
         self.model_version = model_version
-        self.model_api_url = model_api_url
+        self.transport = transport
+        self.buffer_pool = BufferPool()
 
     def load_model_configuration(self) -> None:
         """Loads the model configuration file for model version.
@@ -58,45 +57,26 @@ class DigitRecognizer(object):
     def test_model_api(self) -> None:
         """Checks if the model's TensorFlow Serving URL is working as expected.
 
-        Checks if the model's TensorFlow Serving URL is working as expected.
+        Checks if the model's TensorFlow Serving URL is working as expected, using the cheap status or metadata
+        endpoint of the transport instead of a prediction.
 
         Args:
             None.
 
         Returns:
             None.
+
+        Exceptions:
+            ModelServingError: If the model is not available.
         """
         # Checks if the model's TensorFlow Serving URL is working as expected.
         try:
-            response = requests.post(
-                self.model_api_url,
-                data=json.dumps(
-                    {
-                        "inputs": np.zeros(
-                            (
-                                2,
-                                self.model_configuration["model"]["final_image_height"],
-                                self.model_configuration["model"]["final_image_width"],
-                                self.model_configuration["model"]["n_channels"],
-                            )
-                        ).tolist()
-                    }
-                ),
-                headers={"content-type": "application/json"},
-            )
-            print(
-                f"Digit Recognizer model v{self.model_version} status: {response.status_code}"
-            )
-
-            # Checks if response code is 200.
-            if response.status_code != 200:
-                print(response.text)
-                exit()
-        except requests.exceptions.ConnectionError:
-            print(
-                f"URL: {self.model_api_url} does not exist. Received 'requests.exceptions.ConnectionError' error."
+            self.transport.check_status()
+        except ModelServingError as error:
+            raise ModelServingError(
+                f"URL: {self.transport.model_api_url} is not working as expected. Received error: {error}"
             )
-            exit()
+        print(f"Digit Recognizer model v{self.model_version} status: OK")
 
     def preprocess_image(self, image: np.ndarray) -> np.ndarray:
         """Preprocesses the image for prediction.
@@ -125,6 +105,80 @@ class DigitRecognizer(object):
         image = image / 255.0
         return image
 
+    def preprocess_batch(self, images: List[np.ndarray]) -> np.ndarray:
+        """Preprocesses a batch of images based on model requirements.
+
+        Preprocesses a batch of images based on model requirements, by converting them to grayscale & normalizing
+        them in a single pass into a reusable float32 buffer. The result is equal to stacking the output of
+        preprocess_image for each image up to float32 rounding, but the buffer is overwritten by the next batch
+        preprocessed by the same thread.
+
+        Args:
+            images: A list of NumPy arrays for the images. All images should have the same shape.
+
+        Returns:
+            A NumPy array for the preprocessed batch of images.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(images, list), "Variable images should be of type 'list'."
+        assert len(images) > 0, "Variable images should not be empty."
+
+        # Converts RGB images to grayscale, & normalizes the images to [0, 1] range into the buffer of the current
+        # thread.
+        height, width = images[0].shape[:2]
+        model_input_images = self.buffer_pool.get(
+            "model_input_images", (len(images), height, width, 1)
+        )
+        if len(images[0].shape) == 3:
+            grayscale_normalize_images(
+                images,
+                model_input_images[..., 0],
+                self.buffer_pool.get("scratch", (height, width)),
+            )
+        else:
+            normalize_images(images, model_input_images[..., 0])
+        return model_input_images
+
+    def predict_batch(self, images: List[np.ndarray]) -> List[Dict[str, Any]]:
+        """Preprocesses images based on model requirements. Predicts digits recognized from a batch of images.
+
+        Preprocesses images based on model requirements, stacks them into a single input tensor, and predicts digits
+        recognized from all the images using one request to the model's API.
+
+        Args:
+            images: A list of NumPy arrays for the images. All images should have the same shape.
+
+        Returns:
+            A list of dictionaries for status of the prediction, along with predicted digit & prediction's confidence
+                score, in the same order as the images.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(images, list), "Variable images should be of type 'list'."
+        assert len(images) > 0, "Variable images should not be empty."
+
+        # Preprocesses the images into a single batch.
+        with preprocess_seconds.time(
+            model="digit_recognizer", version=self.model_version
+        ):
+            model_input_images = self.preprocess_batch(images)
+
+        # Sends model input images as input to Model using the transport.
+        try:
+            predictions = self.transport.predict(model_input_images)
+        except ModelServingError as error:
+            return [{"status": "Failure", "message": str(error)} for _ in images]
+
+        # Computes the digit predicted by the model, & extracts the confidence score for each image.
+        with postprocess_seconds.time(
+            model="digit_recognizer", version=self.model_version
+        ):
+            predicted_digits = np.argmax(predictions, axis=1)
+            scores = predictions[np.arange(len(images)), predicted_digits]
+            return [
+                {"status": "Success", "digit": int(digit), "score": float(score)}
+                for digit, score in zip(predicted_digits, scores)
+            ]
+
     def predict(self, image: np.ndarray) -> Dict[str, Any]:
         """Preprocesses image based on model requirements. Predicts digit recognized from image.
 
@@ -141,33 +195,5 @@ class DigitRecognizer(object):
             image, np.ndarray
         ), "Variable image should be of type 'np.ndarray'."
 
-        # Preprocesses image based on model requirements.
-        model_input_image = self.preprocess_image(image)
-
-        # Sends model input image as input to Model using URL.
-        try:
-            response = requests.post(
-                self.model_api_url,
-                data=json.dumps({"inputs": model_input_image.tolist()}),
-                headers={"content-type": "application/json"},
-            )
-        except requests.exceptions.ConnectionError:
-            return {
-                "status": "Failure",
-                "message": "Serving URL does not exist. Received 'requests.exceptions.ConnectionError' error.",
-            }
-
-        # If status is 200, then extracts the prediction from the response.
-        if response.status_code == 200:
-            prediction = np.array(
-                json.loads(response.text)["outputs"], dtype=np.float32
-            )
-
-            # Computes the digit predicted by the model, & extracts the confidence score.
-            predicted_digit = int(np.argmax(prediction[0]))
-            score = float(prediction[0][predicted_digit])
-            return {"status": "Success", "digit": predicted_digit, "score": score}
-
-        # Else returns the text from response.
-        else:
-            return {"status": "Failure", "message": response.text}
+        # Predicts digit recognized from image as a batch of size 1.
+        return self.predict_batch([image])[0]
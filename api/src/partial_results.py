@@ -0,0 +1,101 @@
+import copy
+import threading
+
+from typing import Dict, Any, List, Optional
+
+
+class PartialResultStore(object):
+    """Keeps the results of the stages published by multi-stage workflows, until the submissions are completed."""
+
+    def __init__(self) -> None:
+        """Creates object attributes for the PartialResultStore class.
+
+        Creates object attributes for the PartialResultStore class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        # Initializes class variables.
+        self.lock = threading.Lock()
+        self.partial_results = dict()
+
+    def publish(
+        self, submission_id: str, stages: Dict[str, str], output: Dict[str, Any]
+    ) -> None:
+        """Stores the status of each stage of a submission, & the output extracted by the completed stages.
+
+        Stores the status of each stage of a submission, & the output extracted by the completed stages. A copy of
+        the output is stored, as the workflow keeps updating it while the remaining stages are running.
+
+        Args:
+            submission_id: A string for the unique id of the submission.
+            stages: A dictionary for the status of each stage, which is one of 'pending', 'completed' or 'skipped'.
+            output: A dictionary for the output extracted by the workflow so far.
+
+        Returns:
+            None.
+        """
+        # Asserts type of the arguments.
+        assert isinstance(
+            submission_id, str
+        ), "Variable submission_id should be of type 'str'."
+        assert isinstance(stages, dict), "Variable stages should be of type 'dict'."
+        assert isinstance(output, dict), "Variable output should be of type 'dict'."
+
+        with self.lock:
+            self.partial_results[submission_id] = {
+                "stages": dict(stages),
+                "prediction": copy.deepcopy(output.get("prediction", {})),
+            }
+
+    def get(self, submission_id: str) -> Optional[Dict[str, Any]]:
+        """Returns the latest partial result of a submission.
+
+        Returns the latest partial result of a submission.
+
+        Args:
+            submission_id: A string for the unique id of the submission.
+
+        Returns:
+            A dictionary for the status of each stage & the prediction extracted so far, or None if no stage has
+                been published.
+        """
+        with self.lock:
+            return self.partial_results.get(submission_id)
+
+    def count_finished_stages(self, submission_id: str) -> int:
+        """Counts the stages of a submission which are no longer pending.
+
+        Counts the stages of a submission which are no longer pending, i.e., completed or skipped.
+
+        Args:
+            submission_id: A string for the unique id of the submission.
+
+        Returns:
+            An integer for the number of finished stages, which is 0 if no stage has been published.
+        """
+        with self.lock:
+            if submission_id not in self.partial_results:
+                return 0
+            return sum(
+                status != "pending"
+                for status in self.partial_results[submission_id]["stages"].values()
+            )
+
+    def discard(self, submission_ids: List[str]) -> None:
+        """Removes the partial results of submissions which are completed or released.
+
+        Removes the partial results of submissions which are completed or released.
+
+        Args:
+            submission_ids: A list of strings for the unique ids of the submissions.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            for submission_id in submission_ids:
+                self.partial_results.pop(submission_id, None)
@@ -0,0 +1,168 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+from typing import Dict, Any, Optional
+
+# Fields of an output which are specific to a submission, & are removed before the output is cached.
+SUBMISSION_FIELDS = ("submission_id", "queue_wait_time", "time_taken")
+
+
+def generate_cache_key(image_content: bytes, workflow_name: str, workflow: Any) -> str:
+    """Generates the cache key for an image submitted to a workflow.
+
+    Generates the cache key for an image submitted to a workflow. The key combines a hash of the image bytes with
+    the workflow name, the workflow version & the versions of its models, so that results are not reused across
+    model updates.
+
+    Args:
+        image_content: A bytes object for the content of the submitted image file.
+        workflow_name: A string for the name of the workflow.
+        workflow: An object for the loaded workflow.
+
+    Returns:
+        A string for the cache key.
+    """
+    # Asserts type of the arguments.
+    assert isinstance(
+        image_content, bytes
+    ), "Variable image_content should be of type 'bytes'."
+    assert isinstance(
+        workflow_name, str
+    ), "Variable workflow_name should be of type 'str'."
+
+    # Hashes the image, & the versions of the models in the workflow.
+    image_hash = hashlib.sha256(image_content).hexdigest()
+    model_versions = {
+        name: value["version"]
+        for name, value in workflow.workflow_configuration.items()
+        if isinstance(value, dict) and "version" in value
+    }
+    configuration_hash = hashlib.sha256(
+        json.dumps(model_versions, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+    return f"{workflow_name}:v{workflow.workflow_version}:{configuration_hash}:{image_hash}"
+
+
+class PredictionCache(object):
+    """Caches workflow outputs by content hash, so that identical submissions are not predicted again."""
+
+    def __init__(self, cache_configuration: Dict[str, Any]) -> None:
+        """Creates object attributes for the PredictionCache class.
+
+        Creates object attributes for the PredictionCache class.
+
+        Args:
+            cache_configuration: A dictionary for the memory budget (in MB) & time to live (in seconds) of the
+                cached outputs, & whether the cache is enabled.
+
+        Returns:
+            None.
+        """
+        # Checks types & values of arguments.
+        assert isinstance(
+            cache_configuration, dict
+        ), "Variable cache_configuration should be of type 'dict'."
+
+        # Initializes class variables.
+        self.enabled = cache_configuration["enabled"]
+        self.max_memory_size = int(cache_configuration["max_memory_mb"] * 1024 * 1024)
+        self.ttl = cache_configuration["ttl"]
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.memory_size = 0
+
+    def evict(self, key: str) -> None:
+        """Removes an entry from the cache.
+
+        Removes an entry from the cache. The caller should hold the lock.
+
+        Args:
+            key: A string for the cache key of the entry.
+
+        Returns:
+            None.
+        """
+        serialized_output, _ = self.entries.pop(key)
+        self.memory_size -= len(serialized_output)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached output for a key, if it exists & has not expired.
+
+        Returns the cached output for a key, if it exists & has not expired. A copy of the output is returned, so
+        that the caller can modify it.
+
+        Args:
+            key: A string for the cache key.
+
+        Returns:
+            A dictionary for the cached output of the workflow, or None if there is no valid entry.
+        """
+        if not self.enabled:
+            return None
+        with self.lock:
+            if key not in self.entries:
+                return None
+
+            # Evicts the entry if its time to live has elapsed.
+            serialized_output, expiry_time = self.entries[key]
+            if time.time() >= expiry_time:
+                self.evict(key)
+                return None
+
+            # Marks the entry as the most recently used.
+            self.entries.move_to_end(key)
+        return json.loads(serialized_output)
+
+    def put(self, key: str, output: Dict[str, Any]) -> None:
+        """Adds the output of a workflow to the cache.
+
+        Adds the output of a workflow to the cache. The least recently used entries are evicted until the cache is
+        within its memory budget. The caller should hold the lock.
+
+        Args:
+            key: A string for the cache key.
+            output: A dictionary for the output of the workflow.
+
+        Returns:
+            None.
+        """
+        # Serializes the output, which also gives an estimate of its memory size.
+        serialized_output = json.dumps(output)
+        if len(serialized_output) > self.max_memory_size:
+            return
+        if key in self.entries:
+            self.evict(key)
+        self.entries[key] = (serialized_output, time.time() + self.ttl)
+        self.memory_size += len(serialized_output)
+
+        # Evicts the least recently used entries until the cache is within its memory budget.
+        while self.memory_size > self.max_memory_size:
+            self.evict(next(iter(self.entries)))
+
+    def add(self, key: str, output: Dict[str, Any]) -> None:
+        """Caches the output of a workflow.
+
+        Caches the output of a workflow for a queued submission or an inline prediction, if the workflow succeeded.
+        The submission specific fields, such as its timings, are removed before caching.
+
+        Args:
+            key: A string for the cache key.
+            output: A dictionary for the output of the workflow.
+
+        Returns:
+            None.
+        """
+        if not self.enabled or output.get("status") != "Success":
+            return
+        with self.lock:
+            self.put(
+                key,
+                {
+                    name: value
+                    for name, value in output.items()
+                    if name not in SUBMISSION_FIELDS
+                },
+            )
@@ -0,0 +1,119 @@
+import threading
+
+import numpy as np
+
+from typing import List, Tuple, Union
+
+# Weights used to convert RGB images to grayscale, as in ITU-R BT.601.
+GRAYSCALE_WEIGHTS = (0.2989, 0.5870, 0.1140)
+
+
+class BufferPool(object):
+    """Keeps reusable float32 buffers per thread, so that preprocessing does not allocate memory for every batch."""
+
+    def __init__(self) -> None:
+        """Creates object attributes for the BufferPool class.
+
+        Creates object attributes for the BufferPool class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        # Initializes class variables.
+        self.local = threading.local()
+
+    def get(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """Returns a float32 buffer of the requested shape for the current thread.
+
+        Returns a float32 buffer of the requested shape for the current thread. The memory behind each named buffer
+        only grows, so it is reused across batches of the same or smaller size. The contents of the buffer are
+        overwritten by the next call with the same name from the same thread.
+
+        Args:
+            name: A string for the name of the buffer.
+            shape: A tuple for the shape of the buffer.
+
+        Returns:
+            A NumPy array for the buffer.
+        """
+        # Creates the dictionary of buffers for the current thread, if it does not exist.
+        if not hasattr(self.local, "buffers"):
+            self.local.buffers = dict()
+
+        # Grows the buffer if it is smaller than the requested shape.
+        size = int(np.prod(shape))
+        if name not in self.local.buffers or self.local.buffers[name].size < size:
+            self.local.buffers[name] = np.empty(size, dtype=np.float32)
+        return self.local.buffers[name][:size].reshape(shape)
+
+
+def normalize_images(
+    images: Union[List[np.ndarray], np.ndarray], out: np.ndarray
+) -> np.ndarray:
+    """Normalizes a stack of images from [0, 255] range to [0, 1] range into a float32 buffer.
+
+    Normalizes a stack of images from [0, 255] range to [0, 1] range into a float32 buffer. Each image is cast &
+    divided in a single pass, without intermediate arrays.
+
+    Args:
+        images: A list or a stack of NumPy arrays for the images. All images should have the same shape.
+        out: A NumPy array of shape (n_images, *image_shape) in which the normalized images are written.
+
+    Returns:
+        A NumPy array for the normalized images, which is the out buffer.
+    """
+    for index, image in enumerate(images):
+        np.divide(image, 255, out=out[index], dtype=np.float32)
+    return out
+
+
+def threshold_images(
+    images: Union[List[np.ndarray], np.ndarray], threshold: float, out: np.ndarray
+) -> np.ndarray:
+    """Thresholds a stack of images into a float32 buffer of 0 & 1 values.
+
+    Thresholds a stack of images into a float32 buffer of 0 & 1 values. This is equal to thresholding the images to
+    0 & 255 values, & then normalizing them to [0, 1] range, in a single pass.
+
+    Args:
+        images: A list or a stack of NumPy arrays for the images. All images should have the same shape.
+        threshold: A floating point value above which pixels are set to 1.
+        out: A NumPy array of shape (n_images, *image_shape) in which the thresholded images are written.
+
+    Returns:
+        A NumPy array for the thresholded images, which is the out buffer.
+    """
+    for index, image in enumerate(images):
+        np.greater(image, threshold, out=out[index])
+    return out
+
+
+def grayscale_normalize_images(
+    images: Union[List[np.ndarray], np.ndarray], out: np.ndarray, scratch: np.ndarray
+) -> np.ndarray:
+    """Converts a stack of RGB images to grayscale & normalizes them to [0, 1] range into a float32 buffer.
+
+    Converts a stack of RGB images to grayscale & normalizes them to [0, 1] range into a float32 buffer. The
+    normalization is folded into the grayscale weights, & the weighted channels are accumulated in float32 using a
+    scratch buffer of the size of one image, instead of a float64 dot product.
+
+    Args:
+        images: A list or a stack of NumPy arrays for the RGB or RGBA images. All images should have the same shape.
+        out: A NumPy array of shape (n_images, height, width) in which the grayscale images are written.
+        scratch: A NumPy array of shape (height, width) used for the weighted channels.
+
+    Returns:
+        A NumPy array for the grayscale images, which is the out buffer.
+    """
+    weights = [np.float32(weight / 255.0) for weight in GRAYSCALE_WEIGHTS]
+    for index, image in enumerate(images):
+        np.multiply(image[..., 0], weights[0], out=out[index], dtype=np.float32)
+        for channel in (1, 2):
+            np.multiply(
+                image[..., channel], weights[channel], out=scratch, dtype=np.float32
+            )
+            np.add(out[index], scratch, out=out[index])
+    return out
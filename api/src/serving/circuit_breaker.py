@@ -0,0 +1,86 @@
+import time
+import threading
+
+
+class CircuitBreaker(object):
+    """Fails requests to a model fast after repeated failures, until the model has had time to recover."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float) -> None:
+        """Creates object attributes for the CircuitBreaker class.
+
+        Creates object attributes for the CircuitBreaker class.
+
+        Args:
+            failure_threshold: An integer for the number of consecutive failures after which the circuit opens.
+            reset_timeout: A floating point value for the number of seconds the circuit stays open before a trial
+                request is allowed.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert (
+            isinstance(failure_threshold, int) and failure_threshold > 0
+        ), "Variable failure_threshold should be of type 'int' and greater than 0."
+        assert (
+            isinstance(reset_timeout, (int, float)) and reset_timeout >= 0
+        ), "Variable reset_timeout should be of type 'float' and non-negative."
+
+        # Initializes class variables.
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.n_failures = 0
+        self.opened_time = None
+        self.lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        """Checks if a request should be sent to the model.
+
+        Checks if a request should be sent to the model. Requests are allowed while the circuit is closed. Once the
+        reset timeout has elapsed after the circuit opened, a single trial request is allowed, & the timeout
+        restarts.
+
+        Args:
+            None.
+
+        Returns:
+            A boolean value for whether the request should be sent.
+        """
+        with self.lock:
+            if self.opened_time is None:
+                return True
+            if time.time() - self.opened_time >= self.reset_timeout:
+                self.opened_time = time.time()
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Records a successful request, which closes the circuit.
+
+        Records a successful request, which closes the circuit.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            self.n_failures = 0
+            self.opened_time = None
+
+    def record_failure(self) -> None:
+        """Records a failed request, which opens the circuit once the failure threshold is reached.
+
+        Records a failed request, which opens the circuit once the failure threshold is reached.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            self.n_failures += 1
+            if self.n_failures >= self.failure_threshold:
+                self.opened_time = time.time()
@@ -0,0 +1,445 @@
+import os
+import sys
+import re
+import json
+import time
+import argparse
+import threading
+from concurrent import futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(BASE_PATH)
+
+import numpy as np
+
+from src.utils import load_json_file
+from src.serving import serialization
+from src.serving.tensor_proto import (
+    decode_predict_request,
+    encode_predict_response,
+    decode_get_model_metadata_request,
+    encode_get_model_metadata_response,
+)
+
+from typing import Any, Dict
+
+
+class FakePredictionService(object):
+    """Imitates TensorFlow Serving's gRPC PredictionService & REST ':predict' endpoints for local testing."""
+
+    def __init__(
+        self,
+        models_configuration_directory_path: str,
+        latency: float = 0.0,
+        item_latency: float = 0.0,
+    ) -> None:
+        """Creates object attributes for the FakePredictionService class.
+
+        Creates object attributes for the FakePredictionService class.
+
+        Args:
+            models_configuration_directory_path: A string for the directory which contains the configuration files
+                of the models, used to decide the shape of the outputs.
+            latency: A floating point value for the number of seconds each prediction should take.
+            item_latency: A floating point value for the number of seconds added to a prediction for each input in
+                the batch, so that larger batches take longer.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            models_configuration_directory_path, str
+        ), "Variable models_configuration_directory_path should be of type 'str'."
+        assert (
+            isinstance(latency, (int, float)) and latency >= 0
+        ), "Variable latency should be of type 'float' and non-negative."
+        assert (
+            isinstance(item_latency, (int, float)) and item_latency >= 0
+        ), "Variable item_latency should be of type 'float' and non-negative."
+
+        # Initializes class variables.
+        self.models_configuration_directory_path = models_configuration_directory_path
+        self.latency = latency
+        self.item_latency = item_latency
+
+    def load_model_configuration(self, model_name: str) -> Dict[str, Any]:
+        """Loads the configuration of a model based on its name in TensorFlow Serving.
+
+        Loads the configuration of a model based on its name in TensorFlow Serving, which is of the format
+        '<model>_v<version>'.
+
+        Args:
+            model_name: A string for the name of the model in TensorFlow Serving.
+
+        Returns:
+            A dictionary for the configuration of the model.
+        """
+        name, version = model_name.rsplit("_v", 1)
+        return load_json_file(
+            f"v{version}", os.path.join(self.models_configuration_directory_path, name)
+        )
+
+    def compute_outputs(self, model_name: str, inputs: np.ndarray) -> np.ndarray:
+        """Computes deterministic outputs for a batch of inputs, with the shape of the model's outputs.
+
+        Computes deterministic outputs for a batch of inputs, with the shape of the model's outputs. Classification
+        models return a probability distribution over the classes, while segmentation models return a mask with the
+        same height & width as the model's input.
+
+        Args:
+            model_name: A string for the name of the model in TensorFlow Serving.
+            inputs: A NumPy array for the batch of inputs.
+
+        Returns:
+            A NumPy array for the outputs of the model.
+        """
+        model_configuration = self.load_model_configuration(model_name)["model"]
+        batch_size = inputs.shape[0]
+
+        # Classification models predict the class from the mean intensity of each input.
+        if "n_classes" in model_configuration:
+            n_classes = model_configuration["n_classes"]
+            means = inputs.reshape(batch_size, -1).mean(axis=1)
+            predicted_ids = (
+                np.floor(means * n_classes * 10).astype(np.int64) % n_classes
+            )
+            outputs = np.full((batch_size, n_classes), 0.1 / max(1, n_classes - 1))
+            outputs[np.arange(batch_size), predicted_ids] = 0.9
+            return outputs.astype(np.float32)
+
+        # Segmentation models predict the mask from the mean intensity across channels of each input.
+        return inputs.mean(axis=-1, keepdims=True).astype(np.float32)
+
+    def predict(self, request: bytes, context: Any) -> bytes:
+        """Handles a Predict call of the PredictionService.
+
+        Handles a Predict call of the PredictionService.
+
+        Args:
+            request: A bytes object for the encoded PredictRequest message.
+            context: A gRPC ServicerContext object for the call.
+
+        Returns:
+            A bytes object for the encoded PredictResponse message.
+        """
+        model_name, _, inputs = decode_predict_request(request)
+        inputs = next(iter(inputs.values()))
+        time.sleep(self.latency + self.item_latency * inputs.shape[0])
+        outputs = self.compute_outputs(model_name, inputs)
+        return encode_predict_response(model_name, {"outputs": outputs})
+
+    def predict_rest(self, model_name: str, content: bytes) -> bytes:
+        """Handles a request to the REST ':predict' endpoint of a model.
+
+        Handles a request to the REST ':predict' endpoint of a model, in the columnar format.
+
+        Args:
+            model_name: A string for the name of the model in TensorFlow Serving.
+            content: A bytes object for the JSON body of the request.
+
+        Returns:
+            A bytes object for the JSON body of the response.
+        """
+        inputs = serialization.decode_predict_request(content)
+        time.sleep(self.latency + self.item_latency * inputs.shape[0])
+        outputs = self.compute_outputs(model_name, inputs)
+        return serialization.encode_predict_response(outputs)
+
+    def fetch_model_status_rest(self, model_name: str) -> bytes:
+        """Handles a request to the REST model status endpoint of a model.
+
+        Handles a request to the REST model status endpoint of a model, reporting its only version as available.
+
+        Args:
+            model_name: A string for the name of the model in TensorFlow Serving.
+
+        Returns:
+            A bytes object for the JSON body of the response.
+
+        Exceptions:
+            FileNotFoundError: If the model has no configuration file.
+        """
+        version = self.load_model_configuration(model_name)["version"]
+        return json.dumps(
+            {
+                "model_version_status": [
+                    {
+                        "version": version,
+                        "state": "AVAILABLE",
+                        "status": {"error_code": "OK", "error_message": ""},
+                    }
+                ]
+            }
+        ).encode()
+
+    def get_model_metadata(self, request: bytes, context: Any) -> bytes:
+        """Handles a GetModelMetadata call of the PredictionService.
+
+        Handles a GetModelMetadata call of the PredictionService.
+
+        Args:
+            request: A bytes object for the encoded GetModelMetadataRequest message.
+            context: A gRPC ServicerContext object for the call.
+
+        Returns:
+            A bytes object for the encoded GetModelMetadataResponse message.
+        """
+        model_name = decode_get_model_metadata_request(request)
+        return encode_get_model_metadata_response(
+            model_name,
+            {"serving_default": {"inputs": ["inputs"], "outputs": ["outputs"]}},
+        )
+
+    def start(self, port: int) -> Any:
+        """Starts a gRPC server for the PredictionService on the port.
+
+        Starts a gRPC server for the PredictionService on the port.
+
+        Args:
+            port: An integer for the port on which the server listens.
+
+        Returns:
+            A gRPC Server object for the started server.
+        """
+        import grpc
+
+        # Registers the methods of the PredictionService, which exchange raw protocol buffer bytes.
+        server = grpc.server(
+            futures.ThreadPoolExecutor(max_workers=8),
+            options=[
+                ("grpc.max_send_message_length", -1),
+                ("grpc.max_receive_message_length", -1),
+            ],
+        )
+        server.add_generic_rpc_handlers(
+            (
+                grpc.method_handlers_generic_handler(
+                    "tensorflow.serving.PredictionService",
+                    {
+                        "Predict": grpc.unary_unary_rpc_method_handler(self.predict),
+                        "GetModelMetadata": grpc.unary_unary_rpc_method_handler(
+                            self.get_model_metadata
+                        ),
+                    },
+                ),
+            )
+        )
+        server.add_insecure_port(f"[::]:{port}")
+        server.start()
+        return server
+
+    def start_rest(self, port: int) -> ThreadingHTTPServer:
+        """Starts an HTTP server for the REST ':predict' & model status endpoints on the port.
+
+        Starts an HTTP server for the REST ':predict' & model status endpoints on the port, which keeps connections
+        alive as TensorFlow Serving does.
+
+        Args:
+            port: An integer for the port on which the server listens.
+
+        Returns:
+            A ThreadingHTTPServer object for the started server.
+        """
+        service = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            """Routes the requests to the ':predict' & model status endpoints of each model."""
+
+            protocol_version = "HTTP/1.1"
+
+            def send_json(self, body: bytes) -> None:
+                """Sends a JSON body with status 200."""
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                """Handles a GET request to '/v1/models/<model_name>'."""
+                match = re.fullmatch(r"/v1/models/([^/:]+)", self.path)
+                if match is None:
+                    self.send_error(404)
+                    return
+                try:
+                    body = service.fetch_model_status_rest(match.group(1))
+                except (ValueError, FileNotFoundError):
+                    self.send_error(404)
+                    return
+                self.send_json(body)
+
+            def do_POST(self) -> None:
+                """Handles a POST request to '/v1/models/<model_name>:predict'."""
+                content = self.rfile.read(int(self.headers["Content-Length"]))
+                match = re.fullmatch(r"/v1/models/([^/:]+):predict", self.path)
+                if match is None:
+                    self.send_error(404)
+                    return
+                self.send_json(service.predict_rest(match.group(1), content))
+
+            def log_message(self, format: str, *args: Any) -> None:
+                """Disables the logging of each request."""
+
+        server = ThreadingHTTPServer(("", port), RequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+    def check_transports(
+        self, grpc_port: int, rest_port: int, batch_size: int = 3
+    ) -> bool:
+        """Checks that the API's gRPC & REST transports return the expected outputs from the running servers.
+
+        Checks that the API's gRPC & REST transports return the expected outputs from the running servers. For each
+        model in the models configuration directory, a batch of random inputs is predicted through both transports,
+        & the outputs should have the model's output shape, & match the outputs computed locally.
+
+        Args:
+            grpc_port: An integer for the port on which the gRPC server listens.
+            rest_port: An integer for the port on which the REST server listens.
+            batch_size: An integer for the number of inputs in the batch predicted for each model.
+
+        Returns:
+            A boolean value for whether the outputs of every model were as expected.
+        """
+        from src.serving.transports import create_transport
+
+        serving_configuration = {
+            "grpc_address": f"localhost:{grpc_port}",
+            "rest_base_url": f"http://localhost:{rest_port}",
+            "connection": {
+                "connect_timeout": 2.0,
+                "read_timeout": 30.0,
+                "max_retries": 0,
+                "backoff_factor": 0.0,
+                "pool_size": 1,
+            },
+            "circuit_breaker": {"failure_threshold": 5, "reset_timeout": 10.0},
+        }
+        random_number_generator = np.random.default_rng(0)
+        passed = True
+        for name in sorted(os.listdir(self.models_configuration_directory_path)):
+            model_directory_path = os.path.join(
+                self.models_configuration_directory_path, name
+            )
+            if not os.path.isdir(model_directory_path):
+                continue
+            for file_name in sorted(os.listdir(model_directory_path)):
+                if not file_name.endswith(".json"):
+                    continue
+                model_name = f"{name}_{os.path.splitext(file_name)[0]}"
+                model_configuration = self.load_model_configuration(model_name)["model"]
+
+                # Predicts a batch of random inputs through both transports.
+                inputs = random_number_generator.random(
+                    (
+                        batch_size,
+                        model_configuration["final_image_height"],
+                        model_configuration["final_image_width"],
+                        model_configuration["n_channels"],
+                    ),
+                    dtype=np.float32,
+                )
+                if "n_classes" in model_configuration:
+                    expected_shape = (batch_size, model_configuration["n_classes"])
+                else:
+                    expected_shape = inputs.shape[:-1] + (1,)
+                outputs = dict()
+                try:
+                    for transport in ["grpc", "rest"]:
+                        serving_configuration["transport"] = transport
+                        model = create_transport(serving_configuration, model_name)
+                        model.check_status()
+                        outputs[transport] = model.predict(inputs)
+                except Exception as error:
+                    print(
+                        f"{model_name}: prediction failed. Received '{type(error).__name__}' error: {error}"
+                    )
+                    passed = False
+                    continue
+
+                # Compares the shape & values of the outputs of both transports with the outputs computed locally.
+                expected_outputs = self.compute_outputs(model_name, inputs)
+                model_passed = all(
+                    output.shape == expected_shape
+                    and np.allclose(output, expected_outputs)
+                    for output in outputs.values()
+                )
+                print(
+                    f"{model_name}: {'passed' if model_passed else 'failed'} (expected shape {expected_shape}, "
+                    f"gRPC {outputs['grpc'].shape}, REST {outputs['rest'].shape})."
+                )
+                passed = passed and model_passed
+        return passed
+
+
+if __name__ == "__main__":
+    # Parses the arguments.
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-t",
+        "--transport",
+        type=str,
+        choices=["grpc", "rest"],
+        default="grpc",
+        help="Transport of the fake TensorFlow Serving.",
+    )
+    parser.add_argument(
+        "-p",
+        "--port",
+        type=int,
+        default=None,
+        help="Port for the server. Defaults to 8500 for gRPC & 8501 for REST.",
+    )
+    parser.add_argument(
+        "-l",
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Number of seconds each prediction should take.",
+    )
+    parser.add_argument(
+        "-il",
+        "--item_latency",
+        type=float,
+        default=0.0,
+        help="Number of seconds added to each prediction for each input in the batch.",
+    )
+    parser.add_argument(
+        "-c",
+        "--check",
+        action="store_true",
+        help="Starts both servers, checks the outputs of every model through the API's gRPC & REST transports, "
+        "& exits.",
+    )
+    parser.add_argument(
+        "-rp",
+        "--rest_port",
+        type=int,
+        default=8501,
+        help="Port for the REST server when checking the transports. The gRPC server uses --port.",
+    )
+    args = parser.parse_args()
+
+    # Starts the fake PredictionService or REST endpoints, & waits until it is terminated.
+    service = FakePredictionService(
+        os.path.join(BASE_PATH, "configs", "models"), args.latency, args.item_latency
+    )
+    if args.check:
+        grpc_server = service.start(args.port or 8500)
+        rest_server = service.start_rest(args.rest_port)
+        passed = service.check_transports(args.port or 8500, args.rest_port)
+        grpc_server.stop(None)
+        rest_server.shutdown()
+        print("Check passed." if passed else "Check failed.")
+        sys.exit(0 if passed else 1)
+    if args.transport == "rest":
+        port = args.port or 8501
+        server = service.start_rest(port)
+        print(f"Fake TensorFlow Serving REST endpoints listening on port {port}.")
+        threading.Event().wait()
+    port = args.port or 8500
+    server = service.start(port)
+    print(f"Fake PredictionService listening on port {port}.")
+    server.wait_for_termination()
@@ -0,0 +1,198 @@
+import json
+
+import numpy as np
+
+from typing import Tuple
+
+# Maximum number of distinct values in an array for which the values are formatted once & reused.
+MAX_LOOKUP_TABLE_SIZE = 65536
+
+# Characters which are removed from a JSON response before its numbers are parsed.
+JSON_WHITESPACE = b" \n\r\t"
+JSON_BRACKETS = b"[]"
+
+
+def format_values(values: np.ndarray) -> np.ndarray:
+    """Formats each value in a flat array as JSON number bytes.
+
+    Formats each value in a flat array as JSON number bytes. If the array has few distinct values, as is the case
+    for images normalized from uint8, each distinct value is formatted once & looked up for every element.
+
+    Args:
+        values: A NumPy array for the flat array of values.
+
+    Returns:
+        A NumPy object array for the formatted bytes of each value.
+    """
+    unique_values, inverse = np.unique(values, return_inverse=True)
+    if len(unique_values) <= MAX_LOOKUP_TABLE_SIZE:
+        tokens = np.array(
+            [str(value).encode() for value in unique_values], dtype=object
+        )
+        return tokens[inverse.ravel()]
+    return np.array([repr(value).encode() for value in values.tolist()], dtype=object)
+
+
+def encode_array(array: np.ndarray) -> bytes:
+    """Encodes a NumPy array as a nested JSON list without creating intermediate Python lists.
+
+    Encodes a NumPy array as a nested JSON list without creating intermediate Python lists. Float32 values are
+    written with their shortest round-trip representation, so the encoded array is also smaller than the float64
+    representation written by json.dumps.
+
+    Args:
+        array: A NumPy array which needs to be encoded.
+
+    Returns:
+        A bytes object for the JSON encoded array.
+    """
+    # Asserts type & value of the arguments.
+    assert isinstance(
+        array, np.ndarray
+    ), "Variable array should be of type 'np.ndarray'."
+
+    # Falls back to json for scalars & empty arrays.
+    if array.ndim == 0 or array.size == 0:
+        return json.dumps(array.tolist()).encode()
+
+    # Computes the nesting level closed after each element, which is the number of sub-array boundaries it ends.
+    n_values = array.size
+    levels = np.zeros(n_values - 1, dtype=np.int64)
+    block_size = 1
+    for size in array.shape[:0:-1]:
+        block_size *= size
+        levels[block_size - 1 :: block_size] += 1
+    separators = np.array(
+        [b"]" * level + b"," + b"[" * level for level in range(array.ndim)],
+        dtype=object,
+    )
+
+    # Interleaves the formatted values with the separators, & joins them in one pass.
+    tokens = np.empty(2 * n_values - 1, dtype=object)
+    tokens[0::2] = format_values(array.ravel())
+    tokens[1::2] = separators[levels]
+    return b"[" * array.ndim + b"".join(tokens) + b"]" * array.ndim
+
+
+def encode_predict_request(inputs: np.ndarray) -> bytes:
+    """Encodes a batch of inputs as the JSON body of a TensorFlow Serving ':predict' request.
+
+    Encodes a batch of inputs as the JSON body of a TensorFlow Serving ':predict' request, in the columnar format.
+
+    Args:
+        inputs: A NumPy array for the batch of inputs to the model.
+
+    Returns:
+        A bytes object for the JSON body of the request.
+    """
+    return b'{"inputs": ' + encode_array(inputs) + b"}"
+
+
+def infer_shape(compact_array: bytes, n_values: int) -> Tuple[int, ...]:
+    """Infers the shape of a rectangular nested JSON list from its separators.
+
+    Infers the shape of a rectangular nested JSON list from its separators. A boundary which closes k nested lists
+    appears as k closing brackets followed by a comma, so counting such boundaries gives the number of sub-lists
+    at each depth.
+
+    Args:
+        compact_array: A bytes object for the JSON list, without whitespace.
+        n_values: An integer for the number of values in the list.
+
+    Returns:
+        A tuple for the shape of the list.
+    """
+    n_dims = len(compact_array) - len(compact_array.lstrip(b"["))
+
+    # Computes the number of sub-lists at each depth, from the innermost to the outermost.
+    n_lists = [
+        compact_array.count(b"]" * level + b",[") + 1 for level in range(1, n_dims)
+    ]
+    n_lists = n_lists[::-1] + [n_values]
+
+    # Divides the number of sub-lists at each depth by the number at the previous depth.
+    shape = [n_lists[0]]
+    for depth in range(1, n_dims):
+        shape.append(n_lists[depth] // n_lists[depth - 1])
+    return tuple(shape)
+
+
+def decode_tensor(
+    content: bytes, tensor_name: str, dtype: np.dtype = np.float32
+) -> np.ndarray:
+    """Decodes a tensor of a TensorFlow Serving ':predict' request or response straight into a typed NumPy array.
+
+    Decodes a tensor of a TensorFlow Serving ':predict' request or response straight into a typed NumPy array, by
+    parsing the numbers in C without creating intermediate Python lists. Falls back to json for bodies which are
+    not a single rectangular tensor.
+
+    Args:
+        content: A bytes object for the JSON body.
+        tensor_name: A string for the name of the tensor in the body, which is 'inputs' or 'outputs'.
+        dtype: A NumPy data type for the decoded array.
+
+    Returns:
+        A NumPy array for the tensor.
+    """
+    # Asserts type & value of the arguments.
+    assert isinstance(content, bytes), "Variable content should be of type 'bytes'."
+
+    # Extracts the tensor from the body, if it contains a single tensor.
+    compact_content = content.translate(None, JSON_WHITESPACE)
+    prefix = b'{"' + tensor_name.encode() + b'":['
+    if compact_content.startswith(prefix) and compact_content.endswith(b"]}"):
+        compact_array = compact_content[len(prefix) - 1 : -1]
+        values = np.fromstring(
+            compact_array.translate(None, JSON_BRACKETS), dtype=dtype, sep=","
+        )
+        shape = infer_shape(compact_array, values.size)
+
+        # Returns the array only if the inferred shape accounts for every value.
+        if int(np.prod(shape)) == values.size and values.size > 0:
+            return values.reshape(shape)
+    return np.asarray(json.loads(content)[tensor_name], dtype=dtype)
+
+
+def decode_predict_request(content: bytes, dtype: np.dtype = np.float32) -> np.ndarray:
+    """Decodes the inputs of a TensorFlow Serving ':predict' request straight into a typed NumPy array.
+
+    Decodes the inputs of a TensorFlow Serving ':predict' request straight into a typed NumPy array, as sent by
+    encode_predict_request.
+
+    Args:
+        content: A bytes object for the body of the request.
+        dtype: A NumPy data type for the decoded array.
+
+    Returns:
+        A NumPy array for the inputs of the model.
+    """
+    return decode_tensor(content, "inputs", dtype)
+
+
+def decode_predict_response(content: bytes, dtype: np.dtype = np.float32) -> np.ndarray:
+    """Decodes the outputs of a TensorFlow Serving ':predict' response straight into a typed NumPy array.
+
+    Decodes the outputs of a TensorFlow Serving ':predict' response straight into a typed NumPy array.
+
+    Args:
+        content: A bytes object for the body of the response.
+        dtype: A NumPy data type for the decoded array.
+
+    Returns:
+        A NumPy array for the outputs of the model.
+    """
+    return decode_tensor(content, "outputs", dtype)
+
+
+def encode_predict_response(outputs: np.ndarray) -> bytes:
+    """Encodes a batch of outputs as the JSON body of a TensorFlow Serving ':predict' response.
+
+    Encodes a batch of outputs as the JSON body of a TensorFlow Serving ':predict' response, in the columnar format.
+
+    Args:
+        outputs: A NumPy array for the batch of outputs of the model.
+
+    Returns:
+        A bytes object for the JSON body of the response.
+    """
+    return b'{"outputs": ' + encode_array(outputs) + b"}"
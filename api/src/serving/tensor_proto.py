@@ -0,0 +1,404 @@
+import struct
+
+import numpy as np
+
+from typing import Dict, List, Tuple, Any
+
+# Mapping between NumPy data types & TensorFlow DataType enum values used in TensorProto.
+NUMPY_TO_TF_DTYPE = {
+    np.dtype(np.float32): 1,
+    np.dtype(np.float64): 2,
+    np.dtype(np.int32): 3,
+    np.dtype(np.uint8): 4,
+    np.dtype(np.int64): 9,
+}
+TF_TO_NUMPY_DTYPE = {value: key for key, value in NUMPY_TO_TF_DTYPE.items()}
+
+# Field numbers of the repeated value fields in TensorProto for each TensorFlow DataType.
+TF_DTYPE_TO_VALUE_FIELD = {1: 5, 2: 6, 3: 7, 4: 7, 9: 10}
+
+
+def encode_varint(value: int) -> bytes:
+    """Encodes an integer as a protocol buffer varint.
+
+    Encodes an integer as a protocol buffer varint. Negative integers are encoded as 64-bit two's complement.
+
+    Args:
+        value: An integer which needs to be encoded.
+
+    Returns:
+        A bytes object for the encoded varint.
+    """
+    if value < 0:
+        value += 1 << 64
+    encoded = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            encoded.append(byte | 0x80)
+        else:
+            encoded.append(byte)
+            return bytes(encoded)
+
+
+def encode_field(field_number: int, value: Any) -> bytes:
+    """Encodes a field of a protocol buffer message.
+
+    Encodes a field of a protocol buffer message. Integers are encoded as varints, while strings & bytes are encoded
+    as length-delimited fields.
+
+    Args:
+        field_number: An integer for the number of the field in the message.
+        value: An integer, string or bytes object for the value of the field.
+
+    Returns:
+        A bytes object for the encoded field.
+    """
+    if isinstance(value, int):
+        return encode_varint(field_number << 3) + encode_varint(value)
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return encode_varint((field_number << 3) | 2) + encode_varint(len(value)) + value
+
+
+def decode_varint(data: bytes, position: int) -> Tuple[int, int]:
+    """Decodes a protocol buffer varint starting at the position.
+
+    Decodes a protocol buffer varint starting at the position.
+
+    Args:
+        data: A bytes object for the encoded message.
+        position: An integer for the position at which the varint starts.
+
+    Returns:
+        A tuple for the decoded integer, & the position after the varint.
+    """
+    value, shift = 0, 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, position
+        shift += 7
+
+
+def parse_message(data: bytes) -> Dict[int, List[Tuple[int, Any]]]:
+    """Parses a protocol buffer message into its fields.
+
+    Parses a protocol buffer message into its fields, without a schema.
+
+    Args:
+        data: A bytes object for the encoded message.
+
+    Returns:
+        A dictionary which maps each field number to a list of tuples for the wire type & raw value of the field.
+    """
+    fields = dict()
+    position = 0
+    while position < len(data):
+        tag, position = decode_varint(data, position)
+        field_number, wire_type = tag >> 3, tag & 0x07
+
+        # Decodes the raw value of the field based on its wire type.
+        if wire_type == 0:
+            value, position = decode_varint(data, position)
+        elif wire_type == 1:
+            value, position = data[position : position + 8], position + 8
+        elif wire_type == 2:
+            length, position = decode_varint(data, position)
+            value, position = data[position : position + length], position + length
+        elif wire_type == 5:
+            value, position = data[position : position + 4], position + 4
+        else:
+            raise ValueError(f"Unsupported protocol buffer wire type: {wire_type}.")
+        fields.setdefault(field_number, []).append((wire_type, value))
+    return fields
+
+
+def encode_tensor_proto(array: np.ndarray) -> bytes:
+    """Encodes a NumPy array as a TensorFlow TensorProto message.
+
+    Encodes a NumPy array as a TensorFlow TensorProto message, with the values stored as raw bytes in
+    tensor_content.
+
+    Args:
+        array: A NumPy array which needs to be encoded.
+
+    Returns:
+        A bytes object for the encoded TensorProto message.
+    """
+    # Asserts type & value of the arguments.
+    assert isinstance(
+        array, np.ndarray
+    ), "Variable array should be of type 'np.ndarray'."
+    assert (
+        array.dtype in NUMPY_TO_TF_DTYPE
+    ), f"Variable array has unsupported dtype '{array.dtype}'."
+
+    # Encodes the shape of the array as a TensorShapeProto message.
+    tensor_shape = b"".join(
+        encode_field(2, encode_field(1, int(size))) for size in array.shape
+    )
+
+    # Encodes the data type, shape & little-endian raw values of the array.
+    return (
+        encode_field(1, NUMPY_TO_TF_DTYPE[array.dtype])
+        + encode_field(2, tensor_shape)
+        + encode_field(
+            4, np.ascontiguousarray(array, array.dtype.newbyteorder("<")).tobytes()
+        )
+    )
+
+
+def decode_tensor_proto(data: bytes) -> np.ndarray:
+    """Decodes a TensorFlow TensorProto message into a NumPy array.
+
+    Decodes a TensorFlow TensorProto message into a NumPy array. Supports values stored as raw bytes in
+    tensor_content, or in the repeated value field for the data type.
+
+    Args:
+        data: A bytes object for the encoded TensorProto message.
+
+    Returns:
+        A NumPy array for the decoded tensor.
+    """
+    fields = parse_message(data)
+    tf_dtype = fields[1][0][1]
+    dtype = TF_TO_NUMPY_DTYPE[tf_dtype]
+
+    # Decodes the shape of the tensor from the TensorShapeProto message.
+    shape = list()
+    if 2 in fields:
+        for _, dimension in parse_message(fields[2][0][1]).get(2, []):
+            shape.append(parse_message(dimension).get(1, [(0, 0)])[0][1])
+
+    # Decodes the values of the tensor from tensor_content if it exists.
+    if 4 in fields:
+        values = np.frombuffer(fields[4][0][1], dtype=dtype.newbyteorder("<"))
+        return values.astype(dtype, copy=False).reshape(shape)
+
+    # Else, decodes the values from the repeated value field, which may be packed or unpacked.
+    values = list()
+    for wire_type, value in fields.get(TF_DTYPE_TO_VALUE_FIELD[tf_dtype], []):
+        if wire_type == 2 and tf_dtype in (1, 2):
+            values.append(np.frombuffer(value, dtype="<f4" if tf_dtype == 1 else "<f8"))
+        elif wire_type == 2:
+            packed_values, position = list(), 0
+            while position < len(value):
+                packed_value, position = decode_varint(value, position)
+                packed_values.append(packed_value)
+            values.append(np.array(packed_values, dtype=np.uint64).astype(dtype))
+        elif wire_type == 5:
+            values.append(np.array(struct.unpack("<f", value), dtype=np.float32))
+        elif wire_type == 1:
+            values.append(np.array(struct.unpack("<d", value), dtype=np.float64))
+        else:
+            values.append(np.array([value], dtype=np.uint64).astype(dtype))
+    values = np.concatenate(values) if len(values) > 0 else np.zeros(0, dtype)
+    values = values.astype(dtype, copy=False)
+
+    # A single value is broadcasted to the full shape of the tensor.
+    if values.size == 1 and int(np.prod(shape)) != 1:
+        values = np.full(int(np.prod(shape)), values[0], dtype=dtype)
+    return values.reshape(shape)
+
+
+def encode_predict_request(
+    model_name: str, signature_name: str, inputs: Dict[str, np.ndarray]
+) -> bytes:
+    """Encodes a TensorFlow Serving PredictRequest message.
+
+    Encodes a TensorFlow Serving PredictRequest message.
+
+    Args:
+        model_name: A string for the name of the model in TensorFlow Serving.
+        signature_name: A string for the name of the signature of the model.
+        inputs: A dictionary which maps the name of each input of the signature to a NumPy array.
+
+    Returns:
+        A bytes object for the encoded PredictRequest message.
+    """
+    model_spec = encode_field(1, model_name) + encode_field(3, signature_name)
+    request = encode_field(1, model_spec)
+    for name, array in inputs.items():
+        request += encode_field(
+            2, encode_field(1, name) + encode_field(2, encode_tensor_proto(array))
+        )
+    return request
+
+
+def decode_predict_request(data: bytes) -> Tuple[str, str, Dict[str, np.ndarray]]:
+    """Decodes a TensorFlow Serving PredictRequest message.
+
+    Decodes a TensorFlow Serving PredictRequest message.
+
+    Args:
+        data: A bytes object for the encoded PredictRequest message.
+
+    Returns:
+        A tuple for the name of the model, the name of the signature, & a dictionary which maps the name of each
+            input to a NumPy array.
+    """
+    fields = parse_message(data)
+    model_spec = parse_message(fields[1][0][1])
+    model_name = model_spec[1][0][1].decode("utf-8")
+    signature_name = (
+        model_spec[3][0][1].decode("utf-8") if 3 in model_spec else "serving_default"
+    )
+    return model_name, signature_name, decode_tensor_map(fields.get(2, []))
+
+
+def encode_predict_response(model_name: str, outputs: Dict[str, np.ndarray]) -> bytes:
+    """Encodes a TensorFlow Serving PredictResponse message.
+
+    Encodes a TensorFlow Serving PredictResponse message.
+
+    Args:
+        model_name: A string for the name of the model in TensorFlow Serving.
+        outputs: A dictionary which maps the name of each output of the signature to a NumPy array.
+
+    Returns:
+        A bytes object for the encoded PredictResponse message.
+    """
+    response = b""
+    for name, array in outputs.items():
+        response += encode_field(
+            1, encode_field(1, name) + encode_field(2, encode_tensor_proto(array))
+        )
+    return response + encode_field(2, encode_field(1, model_name))
+
+
+def decode_predict_response(data: bytes) -> Dict[str, np.ndarray]:
+    """Decodes a TensorFlow Serving PredictResponse message.
+
+    Decodes a TensorFlow Serving PredictResponse message.
+
+    Args:
+        data: A bytes object for the encoded PredictResponse message.
+
+    Returns:
+        A dictionary which maps the name of each output of the signature to a NumPy array.
+    """
+    return decode_tensor_map(parse_message(data).get(1, []))
+
+
+def decode_tensor_map(entries: List[Tuple[int, bytes]]) -> Dict[str, np.ndarray]:
+    """Decodes the entries of a protocol buffer map from string to TensorProto.
+
+    Decodes the entries of a protocol buffer map from string to TensorProto.
+
+    Args:
+        entries: A list of tuples for the wire type & raw value of each map entry.
+
+    Returns:
+        A dictionary which maps each key to the decoded NumPy array.
+    """
+    tensors = dict()
+    for _, entry in entries:
+        entry_fields = parse_message(entry)
+        tensors[entry_fields[1][0][1].decode("utf-8")] = decode_tensor_proto(
+            entry_fields[2][0][1]
+        )
+    return tensors
+
+
+def encode_get_model_metadata_request(model_name: str) -> bytes:
+    """Encodes a TensorFlow Serving GetModelMetadataRequest message for the signature definitions.
+
+    Encodes a TensorFlow Serving GetModelMetadataRequest message for the signature definitions.
+
+    Args:
+        model_name: A string for the name of the model in TensorFlow Serving.
+
+    Returns:
+        A bytes object for the encoded GetModelMetadataRequest message.
+    """
+    return encode_field(1, encode_field(1, model_name)) + encode_field(
+        2, "signature_def"
+    )
+
+
+def decode_get_model_metadata_request(data: bytes) -> str:
+    """Decodes a TensorFlow Serving GetModelMetadataRequest message.
+
+    Decodes a TensorFlow Serving GetModelMetadataRequest message.
+
+    Args:
+        data: A bytes object for the encoded GetModelMetadataRequest message.
+
+    Returns:
+        A string for the name of the model in TensorFlow Serving.
+    """
+    model_spec = parse_message(parse_message(data)[1][0][1])
+    return model_spec[1][0][1].decode("utf-8")
+
+
+def encode_get_model_metadata_response(
+    model_name: str, signatures: Dict[str, Dict[str, List[str]]]
+) -> bytes:
+    """Encodes a TensorFlow Serving GetModelMetadataResponse message with the signature definitions.
+
+    Encodes a TensorFlow Serving GetModelMetadataResponse message with the signature definitions. Only the names
+    of the inputs & outputs of each signature are encoded.
+
+    Args:
+        model_name: A string for the name of the model in TensorFlow Serving.
+        signatures: A dictionary which maps the name of each signature to a dictionary for the names of its
+            'inputs' & 'outputs'.
+
+    Returns:
+        A bytes object for the encoded GetModelMetadataResponse message.
+    """
+    signature_def_map = b""
+    for signature_name, signature in signatures.items():
+        signature_def = b"".join(
+            encode_field(1, encode_field(1, name) + encode_field(2, b""))
+            for name in signature["inputs"]
+        ) + b"".join(
+            encode_field(2, encode_field(1, name) + encode_field(2, b""))
+            for name in signature["outputs"]
+        )
+        signature_def_map += encode_field(
+            1, encode_field(1, signature_name) + encode_field(2, signature_def)
+        )
+    metadata = encode_field(
+        1, "type.googleapis.com/tensorflow.serving.SignatureDefMap"
+    ) + encode_field(2, signature_def_map)
+    return encode_field(1, encode_field(1, model_name)) + encode_field(
+        2, encode_field(1, "signature_def") + encode_field(2, metadata)
+    )
+
+
+def decode_get_model_metadata_response(data: bytes) -> Dict[str, Dict[str, List[str]]]:
+    """Decodes the signature definitions from a TensorFlow Serving GetModelMetadataResponse message.
+
+    Decodes the signature definitions from a TensorFlow Serving GetModelMetadataResponse message.
+
+    Args:
+        data: A bytes object for the encoded GetModelMetadataResponse message.
+
+    Returns:
+        A dictionary which maps the name of each signature to a dictionary for the names of its 'inputs' &
+            'outputs'.
+    """
+    signatures = dict()
+    for _, entry in parse_message(data).get(2, []):
+        entry_fields = parse_message(entry)
+        if entry_fields[1][0][1] != b"signature_def":
+            continue
+
+        # Unpacks the SignatureDefMap message from the Any message.
+        signature_def_map = parse_message(parse_message(entry_fields[2][0][1])[2][0][1])
+        for _, signature_entry in signature_def_map.get(1, []):
+            signature_fields = parse_message(signature_entry)
+            signature_def = parse_message(signature_fields[2][0][1])
+            signatures[signature_fields[1][0][1].decode("utf-8")] = {
+                key: [
+                    parse_message(tensor_info)[1][0][1].decode("utf-8")
+                    for _, tensor_info in signature_def.get(field_number, [])
+                ]
+                for key, field_number in [("inputs", 1), ("outputs", 2)]
+            }
+    return signatures
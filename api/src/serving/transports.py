@@ -0,0 +1,483 @@
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ReadTimeoutError
+from urllib3.util.retry import Retry
+import numpy as np
+
+from src.metrics import serialize_seconds, model_round_trip_seconds
+from src.serving import serialization
+from src.serving.circuit_breaker import CircuitBreaker
+from src.serving.tensor_proto import (
+    encode_predict_request,
+    decode_predict_response,
+    encode_get_model_metadata_request,
+    decode_get_model_metadata_response,
+)
+
+from typing import Dict, Any, Optional
+
+
+class ModelServingError(Exception):
+    """Raised when a model served by TensorFlow Serving could not return a prediction."""
+
+
+def split_model_name(model_name: str) -> Dict[str, str]:
+    """Splits the name of a model in TensorFlow Serving into the labels of its metrics.
+
+    Splits the name of a model in TensorFlow Serving, which is of the format '<model>_v<version>', into the labels
+    of its metrics.
+
+    Args:
+        model_name: A string for the name of the model in TensorFlow Serving.
+
+    Returns:
+        A dictionary for the name & version of the model.
+    """
+    name, version = model_name.rsplit("_v", 1)
+    return {"model": name, "version": version}
+
+
+class TimeoutSafeRetry(Retry):
+    """Retries failed requests like Retry, except read timeouts, which are raised at once."""
+
+    def increment(
+        self,
+        method: Optional[str] = None,
+        url: Optional[str] = None,
+        response: Any = None,
+        error: Optional[Exception] = None,
+        _pool: Any = None,
+        _stacktrace: Any = None,
+    ) -> Retry:
+        """Returns the retry state after a failed attempt, or raises the error if it should not be retried.
+
+        Returns the retry state after a failed attempt, or raises the error if it should not be retried. A read
+        timeout means the server received the request but is slow to answer it, so it is raised at once, while a
+        connection which was reset or closed before the response is retried like a connection error.
+
+        Args:
+            method: A string for the HTTP method of the request.
+            url: A string for the URL of the request.
+            response: A response object for the response received, if any.
+            error: An exception for the error raised by the attempt, if any.
+            _pool: A connection pool object for the pool which sent the request.
+            _stacktrace: A traceback object for the error.
+
+        Returns:
+            A Retry object for the retry state of the next attempt.
+
+        Exceptions:
+            ReadTimeoutError: If the attempt timed out while waiting for the response.
+        """
+        if isinstance(error, ReadTimeoutError):
+            raise error
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class RESTTransport(object):
+    """Sends prediction requests to TensorFlow Serving's REST ':predict' endpoint as JSON."""
+
+    def __init__(
+        self,
+        model_api_url: str,
+        model_name: str,
+        connection_configuration: Dict[str, Any],
+        circuit_breaker: CircuitBreaker,
+    ) -> None:
+        """Creates object attributes for the RESTTransport class.
+
+        Creates object attributes for the RESTTransport class.
+
+        Args:
+            model_api_url: A string for the URL of the model's REST ':predict' endpoint.
+            model_name: A string for the name of the model in TensorFlow Serving.
+            connection_configuration: A dictionary for the connect & read timeouts, the retry policy & the size of
+                the connection pool.
+            circuit_breaker: A CircuitBreaker object for the model's endpoint.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            model_api_url, str
+        ), "Variable model_api_url should be of type 'str'."
+        assert isinstance(
+            model_name, str
+        ), "Variable model_name should be of type 'str'."
+        assert isinstance(
+            connection_configuration, dict
+        ), "Variable connection_configuration should be of type 'dict'."
+        assert isinstance(
+            circuit_breaker, CircuitBreaker
+        ), "Variable circuit_breaker should be of type 'CircuitBreaker'."
+
+        # Initializes class variables.
+        self.model_api_url = model_api_url
+        self.model_status_url = model_api_url.rsplit(":predict", 1)[0]
+        self.model_labels = split_model_name(model_name)
+        self.circuit_breaker = circuit_breaker
+        self.timeout = (
+            connection_configuration["connect_timeout"],
+            connection_configuration["read_timeout"],
+        )
+
+        # Creates a session which keeps connections to the endpoint alive, & retries with backoff the requests which
+        # were not answered, as the connection failed or was reset, or the server was unavailable. Read timeouts are
+        # not retried, so that a slow model holds a batch for at most one read timeout, & counts as a failure of the
+        # endpoint.
+        retry = TimeoutSafeRetry(
+            total=connection_configuration["max_retries"],
+            backoff_factor=connection_configuration["backoff_factor"],
+            status_forcelist=[503],
+            allowed_methods=["GET", "POST"],
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=connection_configuration["pool_size"],
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def check_status(self) -> None:
+        """Checks that a version of the model is available, using the model's REST status endpoint.
+
+        Checks that a version of the model is available, using the model's REST status endpoint, which is much
+        cheaper than a prediction. The connection used is kept alive for the following predictions.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+
+        Exceptions:
+            ModelServingError: If the URL could not be reached in time, or no version of the model is available.
+        """
+        try:
+            response = self.session.get(self.model_status_url, timeout=self.timeout)
+        except requests.exceptions.RequestException as error:
+            raise ModelServingError(
+                f"Serving URL {self.model_status_url} could not be reached. Received '{type(error).__name__}' error."
+            )
+        if response.status_code != 200:
+            raise ModelServingError(response.text)
+        if not any(
+            version_status.get("state") == "AVAILABLE"
+            for version_status in response.json().get("model_version_status", [])
+        ):
+            raise ModelServingError(
+                f"No version of the model at {self.model_status_url} is available."
+            )
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        """Predicts outputs for a batch of inputs using the model's REST endpoint.
+
+        Predicts outputs for a batch of inputs using the model's REST endpoint.
+
+        Args:
+            inputs: A NumPy array for the batch of inputs to the model.
+
+        Returns:
+            A NumPy array for the outputs of the model.
+
+        Exceptions:
+            ModelServingError: If the circuit is open, the request failed, the response status code is not 200, or
+                the response could not be decoded.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            inputs, np.ndarray
+        ), "Variable inputs should be of type 'np.ndarray'."
+
+        # Fails fast if the endpoint has been failing repeatedly.
+        if not self.circuit_breaker.allow_request():
+            raise ModelServingError(
+                f"Serving URL {self.model_api_url} is unavailable after repeated failures. Please try again later."
+            )
+
+        # Sends the inputs as JSON to the model's REST endpoint.
+        with serialize_seconds.time(transport="rest", operation="encode"):
+            request = serialization.encode_predict_request(inputs)
+        try:
+            with model_round_trip_seconds.time(**self.model_labels):
+                response = self.session.post(
+                    self.model_api_url,
+                    data=request,
+                    headers={"content-type": "application/json"},
+                    timeout=self.timeout,
+                )
+        except requests.exceptions.ConnectionError:
+            self.circuit_breaker.record_failure()
+            raise ModelServingError(
+                "Serving URL does not exist. Received 'requests.exceptions.ConnectionError' error."
+            )
+        except requests.exceptions.Timeout:
+            self.circuit_breaker.record_failure()
+            raise ModelServingError(
+                "Serving URL did not respond in time. Received 'requests.exceptions.Timeout' error."
+            )
+        except requests.exceptions.RequestException as error:
+            self.circuit_breaker.record_failure()
+            raise ModelServingError(
+                f"Request to serving URL failed. Received '{type(error).__name__}' error."
+            )
+
+        # If status is not 200, then raises the text from response as an error. Client errors are caused by the
+        # request rather than by the endpoint, so they are not counted as failures of the endpoint.
+        if response.status_code != 200:
+            if not 400 <= response.status_code < 500:
+                self.circuit_breaker.record_failure()
+            raise ModelServingError(response.text)
+
+        # Decodes the outputs, & raises an error if the response is not a valid ':predict' response.
+        try:
+            with serialize_seconds.time(transport="rest", operation="decode"):
+                outputs = serialization.decode_predict_response(response.content)
+        except (ValueError, KeyError, TypeError) as error:
+            self.circuit_breaker.record_failure()
+            raise ModelServingError(
+                f"Serving URL returned an invalid response. Received '{type(error).__name__}' error."
+            )
+        self.circuit_breaker.record_success()
+        return outputs
+
+
+class GRPCTransport(object):
+    """Sends prediction requests to TensorFlow Serving's gRPC PredictionService as binary TensorProtos."""
+
+    def __init__(
+        self,
+        grpc_address: str,
+        model_name: str,
+        connection_configuration: Dict[str, Any],
+        circuit_breaker: CircuitBreaker,
+        signature_name: str = "serving_default",
+    ) -> None:
+        """Creates object attributes for the GRPCTransport class.
+
+        Creates object attributes for the GRPCTransport class.
+
+        Args:
+            grpc_address: A string for the 'host:port' address of TensorFlow Serving's gRPC server.
+            model_name: A string for the name of the model in TensorFlow Serving.
+            connection_configuration: A dictionary for the connect & read timeouts, & the retry policy.
+            circuit_breaker: A CircuitBreaker object for the model.
+            signature_name: A string for the name of the signature of the model.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            grpc_address, str
+        ), "Variable grpc_address should be of type 'str'."
+        assert isinstance(
+            model_name, str
+        ), "Variable model_name should be of type 'str'."
+        assert isinstance(
+            signature_name, str
+        ), "Variable signature_name should be of type 'str'."
+
+        # Imports gRPC only when the gRPC transport is used, as it is an optional dependency.
+        import grpc
+
+        # Initializes class variables.
+        self.grpc_address = grpc_address
+        self.model_name = model_name
+        self.model_labels = split_model_name(model_name)
+        self.signature_name = signature_name
+        self.circuit_breaker = circuit_breaker
+        self.timeout = (
+            connection_configuration["connect_timeout"]
+            + connection_configuration["read_timeout"]
+        )
+        self.max_retries = connection_configuration["max_retries"]
+        self.backoff_factor = connection_configuration["backoff_factor"]
+        self.retryable_codes = [grpc.StatusCode.UNAVAILABLE]
+        self.input_name = None
+        self.model_api_url = f"grpc://{grpc_address}/{model_name}"
+        self.rpc_error = grpc.RpcError
+
+        # Creates a channel without message size limits, as batches of images exceed the default 4 MB limit.
+        self.channel = grpc.insecure_channel(
+            grpc_address,
+            options=[
+                ("grpc.max_send_message_length", -1),
+                ("grpc.max_receive_message_length", -1),
+            ],
+        )
+        self.predict_method = self.channel.unary_unary(
+            "/tensorflow.serving.PredictionService/Predict"
+        )
+        self.get_model_metadata_method = self.channel.unary_unary(
+            "/tensorflow.serving.PredictionService/GetModelMetadata"
+        )
+
+    def call_with_retries(self, method: Any, request: bytes) -> bytes:
+        """Calls a method of the PredictionService, retrying with backoff while the server is unavailable.
+
+        Calls a method of the PredictionService, retrying with backoff while the server is unavailable, & fails fast
+        while the circuit is open.
+
+        Args:
+            method: A gRPC callable for the method of the PredictionService.
+            request: A bytes object for the encoded request message.
+
+        Returns:
+            A bytes object for the encoded response message.
+
+        Exceptions:
+            ModelServingError: If the circuit is open, or the call fails after all retries.
+        """
+        # Fails fast if the model has been failing repeatedly.
+        if not self.circuit_breaker.allow_request():
+            raise ModelServingError(
+                f"Serving URL {self.model_api_url} is unavailable after repeated failures. Please try again later."
+            )
+
+        # Calls the method, retrying with exponential backoff on retryable status codes.
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = method(request, timeout=self.timeout)
+                self.circuit_breaker.record_success()
+                return response
+            except self.rpc_error as error:
+                if (
+                    error.code() not in self.retryable_codes
+                    or attempt == self.max_retries
+                ):
+                    self.circuit_breaker.record_failure()
+                    raise ModelServingError(f"{error.code()}: {error.details()}")
+                time.sleep(self.backoff_factor * (2**attempt))
+
+    def fetch_input_name(self) -> str:
+        """Fetches the name of the signature's input using the model's gRPC metadata method.
+
+        Fetches the name of the signature's input using the model's gRPC metadata method.
+
+        Args:
+            None.
+
+        Returns:
+            A string for the name of the signature's input.
+
+        Exceptions:
+            ModelServingError: If the gRPC call fails, or the signature does not exist.
+        """
+        response = self.call_with_retries(
+            self.get_model_metadata_method,
+            encode_get_model_metadata_request(self.model_name),
+        )
+        signatures = decode_get_model_metadata_response(response)
+        if self.signature_name not in signatures:
+            raise ModelServingError(
+                f"Signature '{self.signature_name}' does not exist for model '{self.model_name}'."
+            )
+        return signatures[self.signature_name]["inputs"][0]
+
+    def check_status(self) -> None:
+        """Checks that the model is available, using the model's gRPC metadata method.
+
+        Checks that the model is available, using the model's gRPC metadata method, which is much cheaper than a
+        prediction. The name of the signature's input is kept for the following predictions.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+
+        Exceptions:
+            ModelServingError: If the gRPC call fails, or the signature does not exist.
+        """
+        self.input_name = self.fetch_input_name()
+
+    def predict(self, inputs: np.ndarray) -> np.ndarray:
+        """Predicts outputs for a batch of inputs using the model's gRPC PredictionService.
+
+        Predicts outputs for a batch of inputs using the model's gRPC PredictionService.
+
+        Args:
+            inputs: A NumPy array for the batch of inputs to the model.
+
+        Returns:
+            A NumPy array for the outputs of the model.
+
+        Exceptions:
+            ModelServingError: If the gRPC call fails.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            inputs, np.ndarray
+        ), "Variable inputs should be of type 'np.ndarray'."
+
+        # Looks up the name of the signature's input, if it was not provided.
+        if self.input_name is None:
+            self.input_name = self.fetch_input_name()
+
+        # Sends the inputs as a binary TensorProto to the model's gRPC PredictionService.
+        with serialize_seconds.time(transport="grpc", operation="encode"):
+            request = encode_predict_request(
+                self.model_name,
+                self.signature_name,
+                {self.input_name: np.ascontiguousarray(inputs, dtype=np.float32)},
+            )
+        with model_round_trip_seconds.time(**self.model_labels):
+            response = self.call_with_retries(self.predict_method, request)
+
+        # Extracts the only output of the signature.
+        with serialize_seconds.time(transport="grpc", operation="decode"):
+            outputs = decode_predict_response(response)
+            return next(iter(outputs.values())).astype(np.float32, copy=False)
+
+
+def create_transport(serving_configuration: Dict[str, Any], model_name: str) -> Any:
+    """Creates the transport used by a model client to reach TensorFlow Serving.
+
+    Creates the transport used by a model client to reach TensorFlow Serving, based on the transport selected in
+    the serving configuration.
+
+    Args:
+        serving_configuration: A dictionary for the selected transport, the REST base URL & the gRPC address of
+            TensorFlow Serving, & the connection & circuit breaker parameters.
+        model_name: A string for the name of the model in TensorFlow Serving.
+
+    Returns:
+        A RESTTransport or GRPCTransport object for the model.
+    """
+    # Asserts type & value of the arguments.
+    assert isinstance(
+        serving_configuration, dict
+    ), "Variable serving_configuration should be of type 'dict'."
+    assert isinstance(model_name, str), "Variable model_name should be of type 'str'."
+    assert serving_configuration["transport"] in [
+        "rest",
+        "grpc",
+    ], "Variable transport should be 'rest' or 'grpc'."
+
+    # Creates a circuit breaker for the model, which is shared by all requests sent to it.
+    circuit_breaker = CircuitBreaker(
+        serving_configuration["circuit_breaker"]["failure_threshold"],
+        serving_configuration["circuit_breaker"]["reset_timeout"],
+    )
+
+    # Creates the transport for the model.
+    if serving_configuration["transport"] == "grpc":
+        return GRPCTransport(
+            serving_configuration["grpc_address"],
+            model_name,
+            serving_configuration["connection"],
+            circuit_breaker,
+        )
+    return RESTTransport(
+        f"{serving_configuration['rest_base_url']}/v1/models/{model_name}:predict",
+        model_name,
+        serving_configuration["connection"],
+        circuit_breaker,
+    )
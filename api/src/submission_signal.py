@@ -0,0 +1,71 @@
+import threading
+
+from typing import Optional
+
+
+class SubmissionSignal(object):
+    """Wakes the prediction workers waiting for new submissions, without losing a signal to another worker."""
+
+    def __init__(self) -> None:
+        """Creates object attributes for the SubmissionSignal class.
+
+        Creates object attributes for the SubmissionSignal class.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        # Initializes class variables.
+        self.condition = threading.Condition()
+        self.sequence = 0
+
+    def sequence_number(self) -> int:
+        """Returns the number of signals sent so far.
+
+        Returns the number of signals sent so far. A worker should read it before checking the queue, & pass it to
+        wait, so that a submission queued after the check wakes the worker.
+
+        Args:
+            None.
+
+        Returns:
+            An integer for the number of signals sent so far.
+        """
+        with self.condition:
+            return self.sequence
+
+    def set(self) -> None:
+        """Signals that submissions were queued or released, & wakes every waiting worker.
+
+        Signals that submissions were queued or released, & wakes every waiting worker. Unlike an event, the signal
+        is never cleared, so a worker cannot consume the wakeup of another.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        with self.condition:
+            self.sequence += 1
+            self.condition.notify_all()
+
+    def wait(self, sequence_number: int, timeout: Optional[float]) -> bool:
+        """Waits until a signal is sent after the sequence number was read, or until the timeout.
+
+        Waits until a signal is sent after the sequence number was read, or until the timeout. Returns immediately
+        if a signal was already sent since.
+
+        Args:
+            sequence_number: An integer for the number of signals sent, read before checking the queue.
+            timeout: A floating point value for the maximum number of seconds to wait, or None to wait indefinitely.
+
+        Returns:
+            A boolean value for whether a signal was sent, or False if the timeout elapsed.
+        """
+        with self.condition:
+            return self.condition.wait_for(
+                lambda: self.sequence != sequence_number, timeout
+            )
@@ -1,9 +1,15 @@
+import io
 import os
 import json
 import datetime
 import time
 
-from typing import Dict, Any
+from PIL import Image
+import numpy as np
+
+from src.metrics import image_decode_seconds, result_write_seconds
+
+from typing import Dict, Any, List, Tuple
 
 
 def check_directory_path_existence(directory_path: str) -> str:
@@ -26,7 +32,7 @@ def check_directory_path_existence(directory_path: str) -> str:
     home_directory_path = os.getcwd()
     absolute_directory_path = os.path.join(home_directory_path, directory_path)
     if not os.path.isdir(absolute_directory_path):
-        os.makedirs(absolute_directory_path)
+        os.makedirs(absolute_directory_path, exist_ok=True)
     return absolute_directory_path
 
 
@@ -65,16 +71,21 @@ def load_json_file(file_name: str, directory_path: str) -> Dict[Any, Any]:
 
 
 def save_json_file(
-    dictionary: Dict[Any, Any], file_name: str, directory_path: str
+    dictionary: Dict[Any, Any],
+    file_name: str,
+    directory_path: str,
+    compact: bool = False,
 ) -> None:
     """Saves dictionary as a JSON file.
 
-    Converts a dictionary into a JSON file and saves it for future use.
+    Converts a dictionary into a JSON file and saves it for future use. Compact files are written without
+    indentation or spaces, which keeps result files with long lists, such as run-length encoded masks, small.
 
     Args:
         dictionary: A dictionary which needs to be saved.
         file_name: A string for the name with which the file has to be saved.
         directory_path: A string for the path where the file needs to be saved.
+        compact: A boolean value for whether the JSON file is written without indentation or spaces.
 
     Returns:
         None.
@@ -85,16 +96,19 @@ def save_json_file(
     assert isinstance(
         directory_path, str
     ), "Variable directory_path should be of type 'str'."
+    assert isinstance(compact, bool), "Variable compact should be of type 'bool'."
 
     # Checks if the following path exists.
     directory_path = check_directory_path_existence(directory_path)
 
     # Saves the dictionary or list as a JSON file at the file path location.
     file_path = os.path.join(directory_path, f"{file_name}.json")
-    with open(file_path, "w") as out_file:
-        json.dump(dictionary, out_file, indent=4)
-    out_file.close()
-    print("{} file saved successfully.".format(file_name))
+    with result_write_seconds.time():
+        with open(file_path, "w") as out_file:
+            if compact:
+                json.dump(dictionary, out_file, separators=(",", ":"))
+            else:
+                json.dump(dictionary, out_file, indent=4)
 
 
 def generate_time_stamp() -> str:
@@ -112,3 +126,131 @@ def generate_time_stamp() -> str:
         "%Y-%m-%d %H:%M:%S"
     )
     return time_stamp
+
+
+def split_batch_by_shape(images: List[np.ndarray]) -> List[List[int]]:
+    """Splits a batch of images into groups of indices which share the same shape.
+
+    Splits a batch of images into groups of indices which share the same shape, so that each group can be
+    stacked into a single tensor.
+
+    Args:
+        images: A list of NumPy arrays for the images in the batch.
+
+    Returns:
+        A list of lists for the indices of the images in each group.
+    """
+    # Asserts type of arguments.
+    assert isinstance(images, list), "Variable images should be of type 'list'."
+
+    # Groups the indices of the images by their shape, preserving the order of submission.
+    groups = dict()
+    for index, image in enumerate(images):
+        groups.setdefault(image.shape, []).append(index)
+    return list(groups.values())
+
+
+def validate_image_header(image_content: bytes, file_extension: str) -> Tuple[int, ...]:
+    """Validates an uploaded image by reading only its header.
+
+    Validates an uploaded image by reading only its header, so that the pixels are decoded once, by the prediction
+    worker. PNG & JPEG images are validated using the header parsed by PIL, & NumPy arrays using the '.npy' header,
+    whose shape & data type should also match the size of the content.
+
+    Args:
+        image_content: A bytes object for the content of the uploaded file.
+        file_extension: A string for the extension of the uploaded file.
+
+    Returns:
+        A tuple for the shape of the image.
+
+    Exceptions:
+        ValueError: If the content is not a valid image for the file extension.
+    """
+    # Asserts type of arguments.
+    assert isinstance(
+        image_content, bytes
+    ), "Variable image_content should be of type 'bytes'."
+    assert isinstance(
+        file_extension, str
+    ), "Variable file_extension should be of type 'str'."
+    buffer = io.BytesIO(image_content)
+
+    # Reads the header of the NumPy array, & checks if the size of the content matches it.
+    if file_extension == "npy":
+        try:
+            version = np.lib.format.read_magic(buffer)
+            if version == (1, 0):
+                shape, _, dtype = np.lib.format.read_array_header_1_0(buffer)
+            else:
+                shape, _, dtype = np.lib.format.read_array_header_2_0(buffer)
+        except Exception as e:
+            raise ValueError(f"File is not a valid '.npy' array: {str(e)}")
+        if dtype.hasobject or dtype.kind not in "uif" or len(shape) not in (2, 3):
+            raise ValueError(
+                "Array should be a 2D or 3D array of integers or floating point numbers."
+            )
+        if len(image_content) - buffer.tell() != int(np.prod(shape)) * dtype.itemsize:
+            raise ValueError("Size of the array does not match its header.")
+        return shape
+
+    # Reads the header of the PNG or JPEG image.
+    try:
+        image = Image.open(buffer)
+    except Exception as e:
+        raise ValueError(f"File is not a valid image: {str(e)}")
+    if image.format not in ("PNG", "JPEG"):
+        raise ValueError("Image should be in PNG or JPEG format.")
+    return (image.height, image.width, len(image.getbands()))
+
+
+def load_image(image_file_path: str) -> np.ndarray:
+    """Loads a submitted image as a NumPy array.
+
+    Loads a submitted image as a NumPy array. NumPy arrays are memory-mapped instead of being read into memory, &
+    other images are decoded using PIL.
+
+    Args:
+        image_file_path: A string for the location of the image.
+
+    Returns:
+        A NumPy array for the image.
+    """
+    # Asserts type of arguments.
+    assert isinstance(
+        image_file_path, str
+    ), "Variable image_file_path should be of type 'str'."
+
+    # Memory-maps the array, or decodes the image.
+    with image_decode_seconds.time():
+        if image_file_path.endswith(".npy"):
+            return np.load(image_file_path, mmap_mode="r")
+        return np.asarray(Image.open(image_file_path))
+
+
+def decode_image(image_content: bytes, file_extension: str) -> np.ndarray:
+    """Decodes an uploaded image as a NumPy array, without writing it to disk.
+
+    Decodes an uploaded image as a NumPy array, without writing it to disk. NumPy arrays are read from their '.npy'
+    content, & other images are decoded using PIL.
+
+    Args:
+        image_content: A bytes object for the content of the uploaded file.
+        file_extension: A string for the extension of the uploaded file.
+
+    Returns:
+        A NumPy array for the image.
+    """
+    # Asserts type of arguments.
+    assert isinstance(
+        image_content, bytes
+    ), "Variable image_content should be of type 'bytes'."
+    assert isinstance(
+        file_extension, str
+    ), "Variable file_extension should be of type 'str'."
+
+    # Reads the array, or decodes the image.
+    with image_decode_seconds.time():
+        if file_extension == "npy":
+            return np.load(io.BytesIO(image_content))
+        return np.asarray(Image.open(io.BytesIO(image_content)))
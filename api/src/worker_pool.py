@@ -0,0 +1,196 @@
+import math
+import threading
+
+from typing import Callable, Dict, Any, List
+
+# Number of seconds a prediction worker waits before it is restarted after failing.
+RESTART_INTERVAL = 1.0
+
+
+class PredictionWorkerPool(object):
+    """Runs a pool of prediction workers which drain the submissions queue concurrently."""
+
+    def __init__(
+        self,
+        worker_function: Callable[[threading.Event], None],
+        workers_configuration: Dict[str, Any],
+        fetch_queue_depth: Callable[[], int],
+    ) -> None:
+        """Creates object attributes for the PredictionWorkerPool class.
+
+        Creates object attributes for the PredictionWorkerPool class.
+
+        Args:
+            worker_function: A function which runs a prediction worker until the event passed to it is set.
+            workers_configuration: A dictionary for the number of workers, maximum number of workers, whether the
+                pool size adapts to queue depth, the interval between adaptations, & the number of queued
+                submissions per worker.
+            fetch_queue_depth: A function which returns the number of submissions waiting in the queue.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert callable(worker_function), "Variable worker_function should be callable."
+        assert isinstance(
+            workers_configuration, dict
+        ), "Variable workers_configuration should be of type 'dict'."
+        assert callable(
+            fetch_queue_depth
+        ), "Variable fetch_queue_depth should be callable."
+        assert (
+            1
+            <= workers_configuration["n_workers"]
+            <= workers_configuration["max_workers"]
+        ), "Variable n_workers should be between 1 and max_workers."
+
+        # Initializes class variables.
+        self.worker_function = worker_function
+        self.workers_configuration = workers_configuration
+        self.fetch_queue_depth = fetch_queue_depth
+        self.workers: List[Dict[str, Any]] = list()
+        self.stop_event = threading.Event()
+
+    def run_worker(self, stop_event: threading.Event) -> None:
+        """Runs the worker function until the worker is stopped, restarting it whenever it fails.
+
+        Runs the worker function until the worker is stopped. If the worker function raises an exception, the error
+        is printed, & the worker function is restarted after a short wait, so that the pool does not lose workers.
+
+        Args:
+            stop_event: An event which is set when the worker should stop.
+
+        Returns:
+            None.
+        """
+        while not stop_event.is_set():
+            try:
+                self.worker_function(stop_event)
+            except Exception as e:
+                print(f"Prediction worker failed: {e}")
+                print()
+                stop_event.wait(RESTART_INTERVAL)
+
+    def add_worker(self) -> None:
+        """Starts a new prediction worker thread.
+
+        Starts a new prediction worker thread, along with an event used to stop it.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=self.run_worker, args=(stop_event,), daemon=True
+        )
+        thread.start()
+        self.workers.append({"thread": thread, "stop_event": stop_event})
+
+    def remove_worker(self) -> None:
+        """Stops the most recently started prediction worker.
+
+        Stops the most recently started prediction worker. The worker finishes the batch it is currently working on
+        before exiting.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        worker = self.workers.pop()
+        worker["stop_event"].set()
+
+    def compute_target_size(self, queue_depth: int) -> int:
+        """Computes the number of workers required for the current queue depth.
+
+        Computes the number of workers required for the current queue depth, bounded by the configured minimum &
+        maximum number of workers.
+
+        Args:
+            queue_depth: An integer for the number of submissions waiting in the queue.
+
+        Returns:
+            An integer for the number of workers required.
+        """
+        target_size = math.ceil(
+            queue_depth / self.workers_configuration["submissions_per_worker"]
+        )
+        return max(
+            self.workers_configuration["n_workers"],
+            min(self.workers_configuration["max_workers"], target_size),
+        )
+
+    def adapt(self) -> None:
+        """Resizes the pool based on the number of submissions waiting in the queue.
+
+        Resizes the pool based on the number of submissions waiting in the queue. Workers whose thread exited are
+        dropped first, so that they are replaced.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        self.workers = [
+            worker for worker in self.workers if worker["thread"].is_alive()
+        ]
+        target_size = self.compute_target_size(self.fetch_queue_depth())
+        while len(self.workers) < target_size:
+            self.add_worker()
+        while len(self.workers) > target_size:
+            self.remove_worker()
+
+    def monitor(self) -> None:
+        """Periodically resizes the pool until the pool is stopped.
+
+        Periodically resizes the pool until the pool is stopped. A failed resize is printed & retried at the next
+        interval.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        while not self.stop_event.wait(self.workers_configuration["adapt_interval"]):
+            try:
+                self.adapt()
+            except Exception as e:
+                print(f"Failed to resize prediction worker pool: {e}")
+                print()
+
+    def start(self) -> None:
+        """Starts the configured number of workers, & the monitor thread if the pool size is adaptive.
+
+        Starts the configured number of workers, & the monitor thread if the pool size is adaptive.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        for _ in range(self.workers_configuration["n_workers"]):
+            self.add_worker()
+        if self.workers_configuration["adaptive"]:
+            threading.Thread(target=self.monitor, daemon=True).start()
+
+    def stop(self) -> None:
+        """Stops the monitor thread & all workers in the pool.
+
+        Stops the monitor thread & all workers in the pool.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        self.stop_event.set()
+        while len(self.workers) > 0:
+            self.remove_worker()
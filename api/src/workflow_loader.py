@@ -0,0 +1,214 @@
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from typing import Dict, Any
+
+
+class WorkflowUnavailableError(Exception):
+    """Raised when the models of a workflow could not be loaded."""
+
+
+class WorkflowLoader(object):
+    """Loads the models of the workflows concurrently, in the background or lazily on first use.
+
+    Each workflow's models are loaded at most once at a time, by a thread of a shared pool, so that a slow model only
+    delays its own workflow. A workflow whose models failed to load is loaded again when it is next used, once the
+    retry interval has elapsed, & every retry interval if the workflows are loaded in the background.
+    """
+
+    def __init__(
+        self, workflows: Dict[str, Any], max_workers: int, retry_interval: float
+    ) -> None:
+        """Creates object attributes for the WorkflowLoader class.
+
+        Creates object attributes for the WorkflowLoader class.
+
+        Args:
+            workflows: A dictionary for the workflow objects, whose configuration is loaded, by workflow name.
+            max_workers: An integer for the maximum number of workflows loaded at once.
+            retry_interval: A floating point value for the number of seconds after a failure before a workflow is
+                loaded again.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            workflows, dict
+        ), "Variable workflows should be of type 'dict'."
+        assert (
+            isinstance(max_workers, int) and max_workers > 0
+        ), "Variable max_workers should be of type 'int' and greater than 0."
+        assert (
+            isinstance(retry_interval, (int, float)) and retry_interval > 0
+        ), "Variable retry_interval should be of type 'float' and greater than 0."
+
+        # Initializes class variables.
+        self.workflows = workflows
+        self.retry_interval = retry_interval
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="workflow-loader"
+        )
+        self.states = {workflow_name: "not_loaded" for workflow_name in workflows}
+        self.futures: Dict[str, Future] = dict()
+        self.failure_times: Dict[str, float] = dict()
+        self.errors: Dict[str, str] = dict()
+        self.lock = threading.Lock()
+
+    def run_load(self, workflow_name: str) -> None:
+        """Loads the models of a workflow, & records whether it succeeded.
+
+        Loads the models of a workflow, & records whether it succeeded.
+
+        Args:
+            workflow_name: A string for the name of the workflow.
+
+        Returns:
+            None.
+        """
+        start_time = time.time()
+        try:
+            self.workflows[workflow_name].load_workflow_models()
+        except Exception as error:
+            with self.lock:
+                self.states[workflow_name] = "failed"
+                self.failure_times[workflow_name] = time.time()
+                self.errors[workflow_name] = str(error)
+            print(f"Failed to load {workflow_name}: {error}")
+            print()
+            raise
+        with self.lock:
+            self.states[workflow_name] = "ready"
+            self.errors.pop(workflow_name, None)
+        print(f"Loaded {workflow_name} in {(time.time() - start_time):.3f} sec.")
+        print()
+
+    def submit_load(self, workflow_name: str) -> Future:
+        """Starts loading the models of a workflow, unless it is ready or being loaded.
+
+        Starts loading the models of a workflow in the pool, unless it is ready or being loaded, in which case the
+        existing load is returned. Must be called while holding the lock.
+
+        Args:
+            workflow_name: A string for the name of the workflow.
+
+        Returns:
+            A Future object for the load of the workflow.
+        """
+        future = self.futures.get(workflow_name)
+        if future is not None and self.states[workflow_name] in ("loading", "ready"):
+            return future
+        self.states[workflow_name] = "loading"
+        future = self.executor.submit(self.run_load, workflow_name)
+        self.futures[workflow_name] = future
+        return future
+
+    def retry_failed_loads(self) -> None:
+        """Loads the workflows which failed to load again every retry interval, until all of them are ready.
+
+        Loads the workflows which failed to load again every retry interval, until all of them are ready, so that
+        the API becomes ready once TensorFlow Serving is available, even if it receives no traffic until then.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        while True:
+            time.sleep(self.retry_interval)
+            with self.lock:
+                if all(state == "ready" for state in self.states.values()):
+                    return
+                for workflow_name, state in self.states.items():
+                    if state == "failed":
+                        self.submit_load(workflow_name)
+
+    def start(self) -> None:
+        """Starts loading the models of all the workflows concurrently, in the background.
+
+        Starts loading the models of all the workflows concurrently, in the background, so that each workflow can be
+        used as soon as its own models are available. Workflows which fail to load are retried in the background.
+
+        Args:
+            None.
+
+        Returns:
+            None.
+        """
+        with self.lock:
+            for workflow_name in self.workflows:
+                self.submit_load(workflow_name)
+        threading.Thread(target=self.retry_failed_loads, daemon=True).start()
+
+    def load(self, workflow_name: str) -> Any:
+        """Returns a workflow, loading its models first if they are not loaded yet.
+
+        Returns a workflow, loading its models first if they are not loaded yet, or waiting for the load in progress.
+        If the last load failed less than the retry interval ago, fails without loading the models again.
+
+        Args:
+            workflow_name: A string for the name of the workflow.
+
+        Returns:
+            An object for the loaded workflow.
+
+        Exceptions:
+            WorkflowUnavailableError: If the models of the workflow could not be loaded.
+        """
+        with self.lock:
+            if self.states[workflow_name] == "ready":
+                return self.workflows[workflow_name]
+            if (
+                self.states[workflow_name] == "failed"
+                and time.time() - self.failure_times[workflow_name]
+                < self.retry_interval
+            ):
+                raise WorkflowUnavailableError(
+                    f"Workflow '{workflow_name}' is unavailable: {self.errors[workflow_name]}"
+                )
+            future = self.submit_load(workflow_name)
+        try:
+            future.result()
+        except Exception as error:
+            raise WorkflowUnavailableError(
+                f"Workflow '{workflow_name}' is unavailable: {error}"
+            )
+        return self.workflows[workflow_name]
+
+    def fetch_states(self) -> Dict[str, Dict[str, Any]]:
+        """Returns the state of each workflow, & the error of the workflows which failed to load.
+
+        Returns the state of each workflow, which is 'not_loaded', 'loading', 'ready' or 'failed', & the error of
+        the workflows which failed to load.
+
+        Args:
+            None.
+
+        Returns:
+            A dictionary for the state & error of each workflow, by workflow name.
+        """
+        with self.lock:
+            return {
+                workflow_name: (
+                    {"state": state, "error": self.errors[workflow_name]}
+                    if state == "failed"
+                    else {"state": state}
+                )
+                for workflow_name, state in self.states.items()
+            }
+
+    def is_ready(self) -> bool:
+        """Checks if at least one workflow is ready to serve predictions.
+
+        Checks if at least one workflow is ready to serve predictions.
+
+        Args:
+            None.
+
+        Returns:
+            A boolean value for whether at least one workflow is ready.
+        """
+        with self.lock:
+            return "ready" in self.states.values()
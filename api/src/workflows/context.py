@@ -0,0 +1,80 @@
+import numpy as np
+
+from typing import Callable, Dict, Any, Optional
+
+
+class WorkflowContext(object):
+    """Holds the per-submission state used by a workflow while predicting a result."""
+
+    def __init__(
+        self,
+        submission_id: str,
+        image: np.ndarray,
+        output: Dict[str, Any],
+        save_output: bool = True,
+    ) -> None:
+        """Creates object attributes for the WorkflowContext class.
+
+        Creates object attributes for the WorkflowContext class.
+
+        Args:
+            submission_id: A string for the unique id of the submission.
+            image: A NumPy array for the submitted image.
+            output: A dictionary for storing result extracted by the workflow.
+            save_output: A boolean value for whether the workflow saves the output as a JSON file, which is not
+                needed when the output is returned in the response of an inline prediction.
+
+        Returns:
+            None.
+        """
+        # Asserts type & value of the arguments.
+        assert isinstance(
+            submission_id, str
+        ), "Variable submission_id should be of type 'str'."
+        assert isinstance(
+            image, np.ndarray
+        ), "Variable image should be of type 'np.ndarray'."
+        assert isinstance(output, dict), "Variable output should be of type 'dict'."
+        assert isinstance(
+            save_output, bool
+        ), "Variable save_output should be of type 'bool'."
+
+        # Initializes class variables.
+        self.submission_id = submission_id
+        self.image = image
+        self.output = output
+        self.save_output = save_output
+        self.stages = dict()
+        self.stage_listener = None
+
+    def set_stage_listener(
+        self, stage_listener: Optional[Callable[["WorkflowContext"], None]]
+    ) -> None:
+        """Sets the function which is called whenever the workflow publishes the result of a stage.
+
+        Sets the function which is called whenever the workflow publishes the result of a stage.
+
+        Args:
+            stage_listener: A function which takes the context of the submission, or None to stop publishing.
+
+        Returns:
+            None.
+        """
+        self.stage_listener = stage_listener
+
+    def publish_stages(self, stages: Dict[str, str]) -> None:
+        """Updates the status of the stages of the workflow, & publishes the output extracted so far.
+
+        Updates the status of the stages of the workflow, & publishes the output extracted so far, so that it can be
+        fetched before the remaining stages are finished.
+
+        Args:
+            stages: A dictionary for the status of each updated stage, which is one of 'pending', 'completed' or
+                'skipped'.
+
+        Returns:
+            None.
+        """
+        self.stages.update(stages)
+        if self.stage_listener is not None:
+            self.stage_listener(self)
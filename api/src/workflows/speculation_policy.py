@@ -0,0 +1,76 @@
+import threading
+
+from typing import Dict, Any
+
+
+class SpeculationPolicy(object):
+    """Decides if the second stage of a workflow should be started before the first stage has finished."""
+
+    def __init__(self, speculation_configuration: Dict[str, Any]) -> None:
+        """Creates object attributes for the SpeculationPolicy class.
+
+        Creates object attributes for the SpeculationPolicy class.
+
+        Args:
+            speculation_configuration: A dictionary for the mode of speculation ('always', 'never' or 'adaptive'),
+                & for the adaptive mode, the minimum positive rate at which speculation is enabled, the smoothing
+                factor per image of its moving average, & its initial value.
+
+        Returns:
+            None.
+        """
+        # Checks types & values of arguments.
+        assert isinstance(
+            speculation_configuration, dict
+        ), "Variable speculation_configuration should be of type 'dict'."
+        assert speculation_configuration["mode"] in (
+            "always",
+            "never",
+            "adaptive",
+        ), "Variable speculation_configuration['mode'] should be 'always', 'never' or 'adaptive'."
+
+        # Initializes class variables.
+        self.mode = speculation_configuration["mode"]
+        self.min_positive_rate = speculation_configuration["min_positive_rate"]
+        self.smoothing_factor = speculation_configuration["smoothing_factor"]
+        self.positive_rate = speculation_configuration["initial_positive_rate"]
+        self.lock = threading.Lock()
+
+    def should_speculate(self) -> bool:
+        """Checks if the second stage should be started concurrently with the first stage.
+
+        Checks if the second stage should be started concurrently with the first stage. In the adaptive mode,
+        speculation is enabled while the recent rate of positive first stage results is high enough that the saved
+        round trip is worth the second stage calls which are discarded.
+
+        Args:
+            None.
+
+        Returns:
+            A boolean value for whether the second stage should be started speculatively.
+        """
+        if self.mode != "adaptive":
+            return self.mode == "always"
+        with self.lock:
+            return self.positive_rate >= self.min_positive_rate
+
+    def observe(self, n_positives: int, n_results: int) -> None:
+        """Updates the moving average of the positive rate with the results of the first stage for a batch.
+
+        Updates the moving average of the positive rate with the results of the first stage for a batch. Each
+        result is weighted as if it was observed separately.
+
+        Args:
+            n_positives: An integer for the number of positive results in the batch.
+            n_results: An integer for the number of results in the batch.
+
+        Returns:
+            None.
+        """
+        if n_results == 0:
+            return
+        with self.lock:
+            weight = 1 - (1 - self.smoothing_factor) ** n_results
+            self.positive_rate += weight * (
+                n_positives / n_results - self.positive_rate
+            )
@@ -1,24 +1,31 @@
 import os
 import time
 
-from PIL import Image
 import numpy as np
 
-from src.utils import load_json_file, save_json_file
+from src.utils import load_json_file, save_json_file, load_image, split_batch_by_shape
+from src.serving.transports import create_transport
 from src.models.digit_recognizer import DigitRecognizer
 
+from src.workflows.context import WorkflowContext
+
+from typing import Dict, Any, List
+
 
 class Workflow000(object):
     """Recognizes digit in an image."""
 
-    def __init__(self, workflow_version: str, models_base_url: str) -> None:
+    def __init__(
+        self, workflow_version: str, serving_configuration: Dict[str, Any]
+    ) -> None:
         """Creates object attributes for the Workflow000 class.
 
         Creates object attributes for the Workflow000 class.
 
         Args:
             workflow_version: A string for the version of the workflow.
-            models_base_url: A string for the base URL where the model's in the workflow are served.
+            serving_configuration: A dictionary for the transport & addresses used to reach the models in the
+                workflow served by TensorFlow Serving.
 
         Returns:
             None.
@@ -28,12 +35,12 @@ class Workflow000(object):
             workflow_version, str
         ), "Variable workflow_version should be of type 'str'."
         assert isinstance(
-            models_base_url, str
-        ), "Variable models_base_url should be of type 'str'."
+            serving_configuration, dict
+        ), "Variable serving_configuration should be of type 'dict'."
 
         # Initializes class variables.
         self.workflow_version = workflow_version
-        self.models_base_url = models_base_url
+        self.serving_configuration = serving_configuration
 
     def load_workflow_configuration(self) -> None:
         """Loads the workflow configuration file for current version.
@@ -57,21 +64,26 @@ class Workflow000(object):
     def load_workflow_models(self) -> None:
         """Loads each model & utility files in the workflow.
 
-        Loads each model & utility files in the workflow.
+        Loads each model & utility files in the workflow, & checks that each model is available.
 
         Args:
             None.
 
         Returns:
             None.
+
+        Exceptions:
+            ModelServingError: If a model of the workflow is not available.
         """
         start_time = time.time()
 
         # Creates objects for models in workflow.
         self.digit_recognizer = DigitRecognizer(
             self.workflow_configuration["digit_recognizer"]["version"],
-            f"{self.models_base_url}/v1/models/digit_recognizer_"
-            + f"v{self.workflow_configuration['digit_recognizer']['version']}:predict",
+            create_transport(
+                self.serving_configuration,
+                f"digit_recognizer_v{self.workflow_configuration['digit_recognizer']['version']}",
+            ),
         )
 
         # Loads model configuration as dictionary for all the models.
@@ -89,17 +101,18 @@ class Workflow000(object):
 
     def generate_prediction_parameters(
         self, submission_id: str, image_file_path: str
-    ) -> None:
+    ) -> WorkflowContext:
         """Generates parameters required for workflow result.
 
-        Generates parameters required for workflow result.
+        Generates parameters required for workflow result. The parameters are returned as a context object, so that
+        the workflow can be executed for several submissions concurrently.
 
         Args:
             submission_id: A string for the unique id of the submission.
             image_file_path: A string for the location of the image.
 
         Returns:
-            None.
+            A WorkflowContext object for the submission id, image & output of the submission.
         """
         # Checks types & values of arguments.
         assert isinstance(
@@ -109,76 +122,130 @@ class Workflow000(object):
             image_file_path, str
         ), "Variable image_file_path should be of type 'str'."
 
-        # Adds submission id to the class's variable.
-        self.submission_id = submission_id
+        # Loads the image, & creates a dictionary for storing result extracted by the workflow.
+        return WorkflowContext(
+            submission_id,
+            load_image(image_file_path),
+            {
+                "submission_id": submission_id,
+                "workflow_id": "workflow_000",
+                "configuration_version": f"v{self.workflow_version}",
+            },
+        )
 
-        # Adds image to the class's variable.
-        self.image = np.asarray(Image.open(image_file_path))
+    def generate_inline_prediction_parameters(
+        self, submission_id: str, image: np.ndarray
+    ) -> WorkflowContext:
+        """Generates parameters required for workflow result, for an image decoded in memory.
 
-        # A dictionary for storing result extracted by the workflow.
-        self.output = {
-            "submission_id": submission_id,
-            "workflow_id": "workflow_000",
-            "configuration_version": f"v{self.workflow_version}",
-        }
+        Generates parameters required for workflow result, for an image decoded in memory by an inline prediction.
+        The output is returned in the response instead of being saved as a JSON file.
 
-    def save_results(self) -> None:
+        Args:
+            submission_id: A string for the unique id of the submission.
+            image: A NumPy array for the decoded image.
+
+        Returns:
+            A WorkflowContext object for the submission id, image & output of the submission.
+        """
+        # Checks types & values of arguments.
+        assert isinstance(
+            submission_id, str
+        ), "Variable submission_id should be of type 'str'."
+        assert isinstance(
+            image, np.ndarray
+        ), "Variable image should be of type 'np.ndarray'."
+
+        # Creates a dictionary for storing result extracted by the workflow, which is not saved.
+        return WorkflowContext(
+            submission_id,
+            image,
+            {
+                "submission_id": submission_id,
+                "workflow_id": "workflow_000",
+                "configuration_version": f"v{self.workflow_version}",
+            },
+            save_output=False,
+        )
+
+    def save_results(self, context: WorkflowContext) -> None:
         """Saves extracted result as a JSON file.
 
-        Saves extracted result as a JSON file.
+        Saves extracted result as a JSON file, unless the context is for an inline prediction.
 
         Args:
-            None.
+            context: A WorkflowContext object for the submission.
 
         Returns:
             None.
         """
-        # Saves the extracted document dictionary as a JSON file.
+        # Saves the extracted document dictionary as a JSON file, unless it is returned by an inline prediction.
+        if not context.save_output:
+            return
         save_json_file(
-            self.output,
-            self.submission_id,
+            context.output,
+            context.submission_id,
             "data/out",
+            compact=True,
         )
-        print()
 
-    def workflow_prediction(self) -> None:
+    def workflow_prediction(self, context: WorkflowContext) -> None:
         """Executes workflow to recognize digit in an image.
 
         Executes workflow to recognize digit in an image.
 
         Args:
+            context: A WorkflowContext object for the submission.
+
+        Returns:
             None.
+        """
+        # Checks types & values of arguments.
+        assert isinstance(
+            context, WorkflowContext
+        ), "Variable context should be of type 'WorkflowContext'."
+
+        # Executes the workflow for the submission as a batch of size 1.
+        self.workflow_batch_prediction([context])
+
+    def workflow_batch_prediction(self, contexts: List[WorkflowContext]) -> None:
+        """Executes workflow to recognize digits in a batch of images.
+
+        Executes workflow to recognize digits in a batch of images. Images with the same shape are sent to the model
+        as a single input tensor, and the outputs are split back per submission id.
+
+        Args:
+            contexts: A list of WorkflowContext objects for the submissions in the batch.
 
         Returns:
             None.
         """
+        # Checks types & values of arguments.
+        assert isinstance(contexts, list), "Variable contexts should be of type 'list'."
         start_time = time.time()
-        print()
 
-        # Recognizes digit in the image.
-        task_start_time = time.time()
-        prediction = self.digit_recognizer.predict(self.image)
-        print(
-            f"Finished recognizing digit in image for submission id "
-            + f"{self.submission_id} in {(time.time() - task_start_time):.3f} sec."
-        )
-        print()
+        # Extracts the images from the context of each submission.
+        images = [context.image for context in contexts]
 
-        # Adds prediction to the output.
-        if prediction["status"] == "Success":
-            self.output["status"] = "Success"
-            self.output["prediction"] = {
-                "digit": prediction["digit"],
-                "score": prediction["score"],
-            }
-        else:
-            self.output["status"] = "Failure"
-            self.output["message"] = prediction["message"]
-
-        # Saves extracted result as a JSON file.
-        self.save_results()
-        print(
-            f"Finished predicting output for submission id {self.submission_id} in "
-            + f"{(time.time() - start_time):.3f} sec."
-        )
-        print()
+        # Recognizes digits in each group of images with the same shape.
+        for indices in split_batch_by_shape(images):
+            predictions = self.digit_recognizer.predict_batch(
+                [images[index] for index in indices]
+            )
+
+            # Adds prediction to the output of corresponding submission.
+            for index, prediction in zip(indices, predictions):
+                if prediction["status"] == "Success":
+                    contexts[index].output["status"] = "Success"
+                    contexts[index].output["prediction"] = {
+                        "digit": prediction["digit"],
+                        "score": prediction["score"],
+                    }
+                else:
+                    contexts[index].output["status"] = "Failure"
+                    contexts[index].output["message"] = prediction["message"]
+
+        # Saves extracted result for each submission as a JSON file.
+        for context in contexts:
+            context.output["time_taken"] = f"{(time.time() - start_time):.3f} sec."
+            self.save_results(context)
@@ -1,27 +1,43 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 
-from PIL import Image
 import numpy as np
 
-from src.utils import load_json_file, save_json_file
+from src.utils import load_json_file, save_json_file, load_image, split_batch_by_shape
+from src.mask_encoding import encode_mask
+from src.mask_summary import summarize_mask
+from src.serving.transports import create_transport
 from src.models.bms_flair_abnormality_classification import (
     FlairAbnormalityClassification,
 )
 from src.models.bms_flair_abnormality_segmentation import FlairAbnormalitySegmentation
 
+from src.workflows.context import WorkflowContext
+from src.workflows.speculation_policy import SpeculationPolicy
+
+from typing import Dict, Any, List
+
 
 class Workflow001(object):
     """Predicts if a brain MRI image has FLAIR abnormality and predicts the segmentation mask."""
 
-    def __init__(self, workflow_version: str, models_base_url: str) -> None:
+    def __init__(
+        self,
+        workflow_version: str,
+        serving_configuration: Dict[str, Any],
+        summary_configuration: Dict[str, int],
+    ) -> None:
         """Creates object attributes for the Workflow001 class.
 
         Creates object attributes for the Workflow001 class.
 
         Args:
             workflow_version: A string for the version of the workflow.
-            models_base_url: A string for the base URL where the model's in the workflow are served.
+            serving_configuration: A dictionary for the transport & addresses used to reach the models in the
+                workflow served by TensorFlow Serving.
+            summary_configuration: A dictionary for the maximum number of contours, & points per contour, in the
+                summary stored with each segmentation mask.
 
         Returns:
             None.
@@ -31,12 +47,16 @@ class Workflow001(object):
             workflow_version, str
         ), "Variable workflow_version should be of type 'str'."
         assert isinstance(
-            models_base_url, str
-        ), "Variable models_base_url should be of type 'str'."
+            serving_configuration, dict
+        ), "Variable serving_configuration should be of type 'dict'."
+        assert isinstance(
+            summary_configuration, dict
+        ), "Variable summary_configuration should be of type 'dict'."
 
         # Initializes class variables.
         self.workflow_version = workflow_version
-        self.models_base_url = models_base_url
+        self.serving_configuration = serving_configuration
+        self.summary_configuration = summary_configuration
 
     def load_workflow_configuration(self) -> None:
         """Loads the workflow configuration file for current version.
@@ -57,16 +77,28 @@ class Workflow001(object):
             f"v{self.workflow_version}", workflow_configuration_directory_path
         )
 
+        # Creates the policy which decides if segmentation is started speculatively, & the threads which run it.
+        self.speculation_policy = SpeculationPolicy(
+            self.workflow_configuration["speculation"]
+        )
+        self.speculation_executor = ThreadPoolExecutor(
+            max_workers=self.workflow_configuration["speculation"]["n_threads"],
+            thread_name_prefix="workflow_001_speculation",
+        )
+
     def load_workflow_models(self) -> None:
         """Loads each model & utility files in the workflow.
 
-        Loads each model & utility files in the workflow.
+        Loads each model & utility files in the workflow, & checks that each model is available.
 
         Args:
             None.
 
         Returns:
             None.
+
+        Exceptions:
+            ModelServingError: If a model of the workflow is not available.
         """
         start_time = time.time()
 
@@ -75,24 +107,39 @@ class Workflow001(object):
             self.workflow_configuration["bms_flair_abnormality_classification"][
                 "version"
             ],
-            f"{self.models_base_url}/v1/models/bms_flair_abnormality_classification_"
-            + f"v{self.workflow_configuration['bms_flair_abnormality_classification']['version']}:predict",
+            create_transport(
+                self.serving_configuration,
+                "bms_flair_abnormality_classification_"
+                + f"v{self.workflow_configuration['bms_flair_abnormality_classification']['version']}",
+            ),
         )
         self.flair_abnormality_segmentation = FlairAbnormalitySegmentation(
             self.workflow_configuration["bms_flair_abnormality_segmentation"][
                 "version"
             ],
-            f"{self.models_base_url}/v1/models/bms_flair_abnormality_segmentation_"
-            + f"v{self.workflow_configuration['bms_flair_abnormality_segmentation']['version']}:predict",
+            create_transport(
+                self.serving_configuration,
+                "bms_flair_abnormality_segmentation_"
+                + f"v{self.workflow_configuration['bms_flair_abnormality_segmentation']['version']}",
+            ),
         )
 
         # Loads model configuration as dictionary for all the models.
         self.flair_abnormality_classification.load_model_configuration()
         self.flair_abnormality_segmentation.load_model_configuration()
 
-        # Checks if the model's TensorFlow Serving URL is working as expected.
-        self.flair_abnormality_classification.test_model_api()
-        self.flair_abnormality_segmentation.test_model_api()
+        # Checks if the models' TensorFlow Serving URLs are working as expected, concurrently so that a slow model
+        # does not delay the check of the other.
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            checks = [
+                executor.submit(model.test_model_api)
+                for model in [
+                    self.flair_abnormality_classification,
+                    self.flair_abnormality_segmentation,
+                ]
+            ]
+            for check in checks:
+                check.result()
         print()
         print(
             "Finished loading serialized models for Workflow001 in {} sec.".format(
@@ -103,17 +150,18 @@ class Workflow001(object):
 
     def generate_prediction_parameters(
         self, submission_id: str, image_file_path: str
-    ) -> None:
+    ) -> WorkflowContext:
         """Generates parameters required for workflow result.
 
-        Generates parameters required for workflow result.
+        Generates parameters required for workflow result. The parameters are returned as a context object, so that
+        the workflow can be executed for several submissions concurrently.
 
         Args:
             submission_id: A string for the unique id of the submission.
             image_file_path: A string for the location of the image.
 
         Returns:
-            None.
+            A WorkflowContext object for the submission id, image & output of the submission.
         """
         # Checks types & values of arguments.
         assert isinstance(
@@ -123,82 +171,236 @@ class Workflow001(object):
             image_file_path, str
         ), "Variable image_file_path should be of type 'str'."
 
-        # Adds submission id to the class's variable.
-        self.submission_id = submission_id
+        # Loads the image, & creates a dictionary for storing result extracted by the workflow.
+        return WorkflowContext(
+            submission_id,
+            load_image(image_file_path),
+            {
+                "submission_id": submission_id,
+                "workflow_id": "workflow_001",
+                "configuration_version": f"v{self.workflow_version}",
+            },
+        )
+
+    def generate_inline_prediction_parameters(
+        self, submission_id: str, image: np.ndarray
+    ) -> WorkflowContext:
+        """Generates parameters required for workflow result, for an image decoded in memory.
 
-        # Adds image to the class's variable.
-        self.image = np.asarray(Image.open(image_file_path))
+        Generates parameters required for workflow result, for an image decoded in memory by an inline prediction.
+        The output is returned in the response instead of being saved as a JSON file.
 
-        # A dictionary for storing result extracted by the workflow.
-        self.output = {
-            "submission_id": submission_id,
-            "workflow_id": "workflow_001",
-            "configuration_version": f"v{self.workflow_version}",
-        }
+        Args:
+            submission_id: A string for the unique id of the submission.
+            image: A NumPy array for the decoded image.
 
-    def save_results(self) -> None:
+        Returns:
+            A WorkflowContext object for the submission id, image & output of the submission.
+        """
+        # Checks types & values of arguments.
+        assert isinstance(
+            submission_id, str
+        ), "Variable submission_id should be of type 'str'."
+        assert isinstance(
+            image, np.ndarray
+        ), "Variable image should be of type 'np.ndarray'."
+
+        # Creates a dictionary for storing result extracted by the workflow, which is not saved.
+        return WorkflowContext(
+            submission_id,
+            image,
+            {
+                "submission_id": submission_id,
+                "workflow_id": "workflow_001",
+                "configuration_version": f"v{self.workflow_version}",
+            },
+            save_output=False,
+        )
+
+    def save_results(self, context: WorkflowContext) -> None:
         """Saves extracted result as a JSON file.
 
-        Saves extracted result as a JSON file.
+        Saves extracted result as a JSON file, unless the context is for an inline prediction.
 
         Args:
-            None.
+            context: A WorkflowContext object for the submission.
 
         Returns:
             None.
         """
-        # Saves the extracted document dictionary as a JSON file.
+        # Saves the extracted document dictionary as a JSON file, unless it is returned by an inline prediction.
+        if not context.save_output:
+            return
         save_json_file(
-            self.output,
-            self.submission_id,
+            context.output,
+            context.submission_id,
             "data/out",
+            compact=True,
         )
-        print()
 
-    def workflow_prediction(self) -> None:
+    def add_classification_result(
+        self, context: WorkflowContext, result: Dict[str, Any]
+    ) -> None:
+        """Adds the result of the FLAIR abnormality classification model to the output of the submission.
+
+        Adds the result of the FLAIR abnormality classification model to the output of the submission.
+
+        Args:
+            context: A WorkflowContext object for the submission.
+            result: A dictionary for the result of the classification model for the submission's image.
+
+        Returns:
+            None.
+        """
+        # Adds the predicted label & score if the model succeeded, else the failure message.
+        if result["status"] == "Success":
+            context.output["status"] = "Success"
+            context.output["prediction"] = {
+                "label": result["label"],
+                "score": result["score"],
+            }
+        else:
+            context.output["status"] = "Failure"
+            context.output["message"] = result["message"]
+
+    def add_segmentation_result(
+        self, context: WorkflowContext, result: Dict[str, Any]
+    ) -> None:
+        """Adds the result of the FLAIR abnormality segmentation model to the output of the submission.
+
+        Adds the result of the FLAIR abnormality segmentation model to the output of the submission, with the
+        summary of the mask. If the segmentation model failed, the whole submission is marked as failed.
+
+        Args:
+            context: A WorkflowContext object for the submission.
+            result: A dictionary for the result of the segmentation model for the submission's image.
+
+        Returns:
+            None.
+        """
+        # Adds the run-length encoded mask & its summary if the model succeeded, else marks the submission as failed.
+        # The API converts the mask to the format requested by the client when the result is fetched, & the summary
+        # is computed once here, instead of on every fetch.
+        if result["status"] == "Success":
+            context.output["prediction"]["image"] = encode_mask(result["image"], "rle")
+            context.output["prediction"]["summary"] = summarize_mask(
+                result["image"],
+                self.summary_configuration["max_contours"],
+                self.summary_configuration["max_contour_points"],
+            )
+        else:
+            context.output["status"] = "Failure"
+            context.output["message"] = result["message"]
+            context.output.pop("prediction", None)
+
+    def workflow_prediction(self, context: WorkflowContext) -> None:
         """Executes workflow to predict FLAIR abnormality in a brain MRI image and generate a segmentation mask.
 
         Executes workflow to predict FLAIR abnormality in a brain MRI image and generate a segmentation mask if
         abnormality is detected.
 
         Args:
+            context: A WorkflowContext object for the submission.
+
+        Returns:
             None.
+        """
+        # Checks types & values of arguments.
+        assert isinstance(
+            context, WorkflowContext
+        ), "Variable context should be of type 'WorkflowContext'."
+
+        # Executes the workflow for the submission as a batch of size 1.
+        self.workflow_batch_prediction([context])
+
+    def workflow_batch_prediction(self, contexts: List[WorkflowContext]) -> None:
+        """Executes workflow to predict FLAIR abnormality & segmentation masks for a batch of brain MRI images.
+
+        Executes workflow to predict FLAIR abnormality for a batch of brain MRI images, and generates segmentation
+        masks for the images where abnormality is detected. Images with the same shape are sent to each model as a
+        single input tensor, and the outputs are split back per submission id. When the speculation policy allows
+        it, segmentation is predicted for all the images concurrently with classification, & the masks of the
+        images without abnormality are discarded. The classification result of each image is published as soon as
+        it is known, while its segmentation is pending.
+
+        Args:
+            contexts: A list of WorkflowContext objects for the submissions in the batch.
 
         Returns:
             None.
         """
+        # Checks types & values of arguments.
+        assert isinstance(contexts, list), "Variable contexts should be of type 'list'."
         start_time = time.time()
-        print()
 
-        # Predicts if the brain MRI image has FLAIR abnormality.
-        task_start_time = time.time()
-        result = self.flair_abnormality_classification.predict(self.image)
-        self.output["prediction"] = result
-        print(
-            f"Finished predicting if FLAIR abnormality is present in brain MRI image for submission id "
-            + f"{self.submission_id} in {(time.time() - task_start_time):.3f} sec."
-        )
-        print()
-
-        # If abnormality is detected, then predicts segmentation mask for FLAIR abnormality in brain MRI images.
-        if result["label"] == "abnormality":
-            task_start_time = time.time()
-            predicted_image = self.flair_abnormality_segmentation.predict(self.image)
-
-            # Converts the array to a list.
-            predicted_image_list = predicted_image.tolist()
-            self.output["prediction"]["image"] = predicted_image_list
-            print(
-                f"Finished predicting segmentation mask for FLAIR abnormality for submission id {self.submission_id}"
-                + f" in {(time.time() - task_start_time):.3f} sec."
+        # Extracts the images from the context of each submission.
+        images = [context.image for context in contexts]
+
+        # Iterates across each group of images with the same shape.
+        for indices in split_batch_by_shape(images):
+            group_images = [images[index] for index in indices]
+
+            # Starts predicting segmentation masks for all the images in the group concurrently with the
+            # classification, if the recent abnormality rate makes it worthwhile.
+            speculate = self.speculation_policy.should_speculate()
+            if speculate:
+                segmentation_future = self.speculation_executor.submit(
+                    self.flair_abnormality_segmentation.predict_batch, group_images
+                )
+
+            # Predicts if each brain MRI image in the group has FLAIR abnormality.
+            results = self.flair_abnormality_classification.predict_batch(group_images)
+            for index, result in zip(indices, results):
+                self.add_classification_result(contexts[index], result)
+
+            # Finds the images in which abnormality is detected, & updates the abnormality rate.
+            abnormal_positions = [
+                position
+                for position, result in enumerate(results)
+                if result["status"] == "Success" and result["label"] == "abnormality"
+            ]
+            self.speculation_policy.observe(
+                len(abnormal_positions),
+                sum(result["status"] == "Success" for result in results),
             )
-            print()
-        self.output["time_taken"] = f"{(time.time() - start_time):.3f} sec."
 
-        # Saves extracted result as a JSON file.
-        self.save_results()
-        print(
-            f"Finished predicting output for submission id {self.submission_id} in "
-            + f"{(time.time() - start_time):.3f} sec."
-        )
-        print()
+            # Publishes the classification result of each image, so that it can be fetched before segmentation.
+            for position, result in enumerate(results):
+                if result["status"] == "Success":
+                    contexts[indices[position]].publish_stages(
+                        {
+                            "classification": "completed",
+                            "segmentation": (
+                                "pending"
+                                if position in abnormal_positions
+                                else "skipped"
+                            ),
+                        }
+                    )
+
+            # Discards the speculative segmentation if no abnormality is detected.
+            if len(abnormal_positions) == 0:
+                if speculate:
+                    segmentation_future.cancel()
+                continue
+
+            # Predicts segmentation masks for the images in which abnormality is detected, or waits for the
+            # speculative segmentation, & keeps only the masks of abnormal images.
+            if speculate:
+                segmentation_results = segmentation_future.result()
+                segmentation_results = [
+                    segmentation_results[position] for position in abnormal_positions
+                ]
+            else:
+                segmentation_results = (
+                    self.flair_abnormality_segmentation.predict_batch(
+                        [group_images[position] for position in abnormal_positions]
+                    )
+                )
+            for position, result in zip(abnormal_positions, segmentation_results):
+                self.add_segmentation_result(contexts[indices[position]], result)
+
+        # Saves extracted result for each submission as a JSON file.
+        for context in contexts:
+            context.output["time_taken"] = f"{(time.time() - start_time):.3f} sec."
+            self.save_results(context)
@@ -1,5 +1,7 @@
 import os
+import io
 import time
+import base64
 import argparse
 
 from flask import (
@@ -14,10 +16,17 @@ import requests
 from PIL import Image
 import numpy as np
 
+from typing import Dict, Any, Optional
+
 
 # Creates a flask application.
 app = Flask(__name__)
 
+# Sets the maximum time (in seconds) to wait for a result, & the time each long-poll request blocks for. The API
+# does not predict a submission still queued after the maximum time.
+RESULT_TIMEOUT = 60
+LONG_POLL_WAIT_TIME = 20
+
 
 @app.route("/send_image/")
 def send_image():
@@ -68,7 +77,8 @@ def error() -> str:
 def positive() -> str:
     """Renders template for viewing positive result.
 
-    Renders template for viewing positive esult.
+    Renders template for viewing positive esult. If the segmentation mask is not ready yet, the page fetches it
+    using the submission ID.
 
     Args:
         None.
@@ -79,11 +89,13 @@ def positive() -> str:
     # Extracts the query parameters from the request
     input_file_path = request.args.get("input_file_path")
     output_file_path = request.args.get("output_file_path")
+    submission_id = request.args.get("submission_id")
     score = request.args.get("score")
     return render_template(
         "positive.html",
         input_file_path=input_file_path,
         output_file_path=output_file_path,
+        submission_id=submission_id,
         score=round(float(score) * 100, 3),
     )
 
@@ -110,10 +122,137 @@ def negative() -> str:
     )
 
 
+def decode_mask(encoded_mask: Any) -> np.ndarray:
+    """Decodes the segmentation mask returned by the API into a NumPy array.
+
+    Decodes the segmentation mask returned by the API into a NumPy array. The mask is requested as base64 encoded
+    PNG bytes, & the legacy nested list format is also supported.
+
+    Args:
+        encoded_mask: A dictionary for the format, shape & data of the encoded mask, or a nested list.
+
+    Returns:
+        A NumPy array for the segmentation mask.
+    """
+    # Converts the legacy format directly into an array.
+    if isinstance(encoded_mask, list):
+        return np.array(encoded_mask)
+
+    # Decodes the PNG bytes into an array.
+    if encoded_mask["format"] == "png":
+        return np.asarray(
+            Image.open(io.BytesIO(base64.b64decode(encoded_mask["data"])))
+        )
+    raise ValueError(f"Unsupported mask format '{encoded_mask['format']}'.")
+
+
+def count_finished_stages(result: Dict[str, Any]) -> int:
+    """Counts the stages of the workflow which are no longer pending in an in-progress result.
+
+    Counts the stages of the workflow which are no longer pending in an in-progress result.
+
+    Args:
+        result: A dictionary for the in-progress result returned by the API.
+
+    Returns:
+        An integer for the number of completed or skipped stages.
+    """
+    return sum(status != "pending" for status in result.get("stages", {}).values())
+
+
+def cancel_submission(submission_id: str) -> None:
+    """Cancels a submission whose result is no longer awaited.
+
+    Cancels a submission whose result is no longer awaited, so that the API does not predict it if it is still
+    queued. Errors are ignored, as the API also skips the submission once its deadline has passed.
+
+    Args:
+        submission_id: A string for the submission ID of the image.
+
+    Returns:
+        None.
+    """
+    try:
+        requests.delete(f"{API_HOST}/api/v1/submissions/{submission_id}", timeout=10)
+    except requests.RequestException:
+        pass
+
+
+def long_poll_result(
+    submission_id: str, seen_stages: Optional[int], deadline: float
+) -> Optional[requests.Response]:
+    """Long-polls the API until the result is ready, or a stage not seen yet is finished.
+
+    Long-polls the API, which returns as soon as the result is ready, until the deadline is reached. If the number
+    of stages already seen is given, also returns as soon as the workflow finishes a later stage.
+
+    Args:
+        submission_id: A string for the submission ID of the image.
+        seen_stages: An integer for the number of finished stages already seen, or None to wait for the result.
+        deadline: A floating point value for the time after which polling is stopped.
+
+    Returns:
+        A Response object for the completed, missing or partial result, or None if the deadline is reached.
+    """
+    fetch_result_api_url = (
+        f"{API_HOST}/api/v1/fetch_result/{submission_id}?mask_format=png"
+    )
+    params = dict() if seen_stages is None else {"seen_stages": seen_stages}
+    while time.time() < deadline:
+        wait_time = min(LONG_POLL_WAIT_TIME, max(deadline - time.time(), 0))
+        result_response = requests.get(
+            fetch_result_api_url,
+            params={"wait": wait_time, **params},
+            timeout=wait_time + 10,
+        )
+
+        # Returns the response if the result is completed or missing, or if a later stage is finished.
+        if result_response.status_code in (200, 404):
+            return result_response
+        if result_response.status_code == 202:
+            if (
+                seen_stages is not None
+                and count_finished_stages(result_response.json()) > seen_stages
+            ):
+                return result_response
+
+        # Waits before retrying if the API returned an unexpected error.
+        else:
+            time.sleep(1)
+    return None
+
+
+def save_predicted_mask(submission_id: str, encoded_mask: Any) -> str:
+    """Saves the segmentation mask returned by the API as a PNG image.
+
+    Saves the segmentation mask returned by the API as a PNG image.
+
+    Args:
+        submission_id: A string for the submission ID of the image.
+        encoded_mask: A dictionary for the format, shape & data of the encoded mask, or a nested list.
+
+    Returns:
+        A string for the file path of the saved mask.
+    """
+    # Converts the predicted image data to a NumPy array.
+    predicted_image = decode_mask(encoded_mask)
+
+    # Ensures the predicted image is in the correct format for saving.
+    if predicted_image.max() <= 1:
+        predicted_image = (predicted_image * 255).astype("uint8")
+    predicted_image = predicted_image.astype("uint8")
+
+    # Converts NumPy array to a PIL image, saves it to a file.
+    output_file_path = os.path.join("data", "out", f"{submission_id}.png")
+    Image.fromarray(predicted_image).save(output_file_path)
+    return output_file_path
+
+
 def process_result(image_file_path: str, submission_id: str) -> str:
     """Processes the result of the prediction.
 
-    Processes the result of the prediction.
+    Processes the result of the prediction. As soon as the API publishes the classification result, a positive
+    result is rendered with its score, & the page fetches the segmentation mask once it is ready.
 
     Args:
         image_file_path: A string for the file path to the image.
@@ -122,79 +261,120 @@ def process_result(image_file_path: str, submission_id: str) -> str:
     Returns:
         A string for the rendered template for the result or error.
     """
-    fetch_result_api_url = f"{API_HOST}/api/v1/fetch_result/{submission_id}"
-
-    # Sets polling interval (in seconds) and maximum iterations for polling.
-    polling_interval = 2
-    max_iterations = 30
-
-    # Iterates over the maximum iterations to fetch the result.
-    for _ in range(max_iterations):
-        result_response = requests.get(fetch_result_api_url)
-
-        # Based on the status code of response, redirects to appropriate page.
-        if result_response.status_code == 200:
-            result = result_response.json()
-
-            # If the prediction is an abnormality, saves the predicted image.
-            if result["prediction"]["label"] == "abnormality":
-                # Converts the predicted image data to a NumPy array.
-                predicted_image = np.array(result["prediction"]["image"])
-                print(predicted_image.shape)
-
-                # Ensures the predicted image is in the correct format for saving.
-                if predicted_image.max() <= 1:
-                    predicted_image = (predicted_image * 255).astype("uint8")
-                predicted_image = predicted_image.astype("uint8")
-
-                # Converts NumPy array to a PIL image, saves it to a file.
-                predicted_image = Image.fromarray(predicted_image)
-                predicted_image.save(
-                    os.path.join("data", "out", f"{submission_id}.png")
-                )
-                return redirect(
-                    url_for(
-                        "positive",
-                        input_file_path=image_file_path,
-                        output_file_path=os.path.join(
-                            "data", "out", f"{submission_id}.png"
-                        ),
-                        score=result["prediction"]["score"],
-                    )
-                )
-
-            # If the prediction is not an abnormality, redirects to negative result page.
-            else:
-                return redirect(
-                    url_for(
-                        "negative",
-                        input_file_path=image_file_path,
-                        score=result["prediction"]["score"],
-                    )
-                )
-
-        # If the result is not found, redirects to error page.
-        elif result_response.status_code == 404:
+    # Waits for the classification stage, or the whole result, until the timeout is reached.
+    deadline = time.time() + RESULT_TIMEOUT
+    result_response = long_poll_result(submission_id, 0, deadline)
+
+    # If abnormality is detected before segmentation is finished, renders the positive result without the mask.
+    if result_response is not None and result_response.status_code == 202:
+        result = result_response.json()
+        if result["prediction"]["label"] == "abnormality":
             return redirect(
                 url_for(
-                    "error",
-                    message=result_response.text,
-                    image_file_path=image_file_path,
+                    "positive",
+                    input_file_path=image_file_path,
+                    submission_id=submission_id,
+                    score=result["prediction"]["score"],
                 )
             )
 
-        # Wait before the next polling attempt
-        time.sleep(polling_interval)
+        # Else waits for the result, which no longer needs segmentation.
+        result_response = long_poll_result(submission_id, None, deadline)
+
+    # If processing is still not completed after timeout, cancels the submission, & returns timeout as error message.
+    if result_response is None:
+        cancel_submission(submission_id)
+        return redirect(
+            url_for(
+                "error",
+                message="Timeout. Server is busy. Please try again after some time.",
+                image_file_path=image_file_path,
+            )
+        )
+
+    # If the result is not found, redirects to error page.
+    if result_response.status_code == 404:
+        return redirect(
+            url_for(
+                "error",
+                message=result_response.text,
+                image_file_path=image_file_path,
+            )
+        )
+    result = result_response.json()
+
+    # If the workflow failed, redirects to error page.
+    if result["status"] == "Failure":
+        return redirect(
+            url_for(
+                "error",
+                message=result["message"],
+                image_file_path=image_file_path,
+            )
+        )
+
+    # If the prediction is an abnormality, saves the predicted image.
+    elif result["prediction"]["label"] == "abnormality":
+        return redirect(
+            url_for(
+                "positive",
+                input_file_path=image_file_path,
+                output_file_path=save_predicted_mask(
+                    submission_id, result["prediction"]["image"]
+                ),
+                score=result["prediction"]["score"],
+            )
+        )
 
-    # If processing is still not completed after timeout, returns timeout as error message.
-    return redirect(
-        url_for(
-            "error",
-            message="Timeout. Server is busy. Please try again after some time.",
-            image_file_path=image_file_path,
+    # If the prediction is not an abnormality, redirects to negative result page.
+    else:
+        return redirect(
+            url_for(
+                "negative",
+                input_file_path=image_file_path,
+                score=result["prediction"]["score"],
+            )
         )
+
+
+@app.route("/mask/<submission_id>")
+def mask(submission_id: str) -> Dict[str, str]:
+    """Waits for the segmentation mask of a positive result, & returns the path of the saved mask.
+
+    Waits for the segmentation mask of a positive result, & returns the path of the saved mask. Called by the
+    positive page, which is rendered as soon as the classification result is known.
+
+    Args:
+        submission_id: A string for the submission ID of the image.
+
+    Returns:
+        A dictionary for the status, & the URL of the saved mask or the error message.
+    """
+    result_response = long_poll_result(
+        submission_id, None, time.time() + RESULT_TIMEOUT
     )
 
+    # Returns an error message if the result is not ready, missing, or has failed. Cancels the submission if it is
+    # not ready.
+    if result_response is None:
+        cancel_submission(submission_id)
+        return {
+            "status": "Failure",
+            "message": "Timeout. Server is busy. Please try again after some time.",
+        }
+    if result_response.status_code == 404:
+        return {"status": "Failure", "message": result_response.text}
+    result = result_response.json()
+    if result["status"] == "Failure":
+        return {"status": "Failure", "message": result["message"]}
+
+    # Saves the predicted mask, & returns its URL.
+    output_file_path = save_predicted_mask(submission_id, result["prediction"]["image"])
+    return {
+        "status": "Success",
+        "output_file_path": url_for("send_image", file_path=output_file_path),
+    }
+
 
 @app.route("/upload", methods=["GET", "POST"])
 def upload() -> str:
@@ -223,13 +403,22 @@ def upload() -> str:
                 submission_response = requests.post(
                     submit_image_api_url,
                     files={"image": image_file},
-                    data={"workflow_name": "workflow_001"},
+                    data={"workflow_name": "workflow_001", "deadline": RESULT_TIMEOUT},
                 )
 
             # Based on the status code of response, redirects to appropriate page.
             if submission_response.status_code == 200:
                 submission_id = submission_response.json().get("submission_id")
                 return process_result(image_file_path, submission_id)
+            elif submission_response.status_code == 429:
+                retry_after = submission_response.headers.get("Retry-After", "a few")
+                return redirect(
+                    url_for(
+                        "error",
+                        message=f"Server is busy. Please retry in {retry_after} seconds.",
+                        input_file_path=image_file_path,
+                    )
+                )
             else:
                 return redirect(
                     url_for(
@@ -16,6 +16,11 @@ import requests
 # Creates a flask application.
 app = Flask(__name__)
 
+# Sets the maximum time (in seconds) to wait for a result, & the time each long-poll request blocks for. The API
+# does not predict a submission still queued after the maximum time.
+RESULT_TIMEOUT = 60
+LONG_POLL_WAIT_TIME = 20
+
 
 @app.route("/send_image")
 def send_image():
@@ -86,6 +91,24 @@ def result() -> str:
     )
 
 
+def cancel_submission(submission_id: str) -> None:
+    """Cancels a submission whose result is no longer awaited.
+
+    Cancels a submission whose result is no longer awaited, so that the API does not predict it if it is still
+    queued. Errors are ignored, as the API also skips the submission once its deadline has passed.
+
+    Args:
+        submission_id: A string for the submission ID of the image.
+
+    Returns:
+        None.
+    """
+    try:
+        requests.delete(f"{API_HOST}/api/v1/submissions/{submission_id}", timeout=10)
+    except requests.RequestException:
+        pass
+
+
 def process_result(image_file_path: str, submission_id: str) -> str:
     """Processes the result of the prediction.
 
@@ -100,13 +123,15 @@ def process_result(image_file_path: str, submission_id: str) -> str:
     """
     fetch_result_api_url = f"{API_HOST}/api/v1/fetch_result/{submission_id}"
 
-    # Sets polling interval (in seconds) and maximum iterations for polling.
-    polling_interval = 2
-    max_iterations = 30
-
-    # Iterates over the maximum iterations to fetch the result.
-    for _ in range(max_iterations):
-        result_response = requests.get(fetch_result_api_url)
+    # Long-polls the API, which returns as soon as the result is ready, until the timeout is reached.
+    deadline = time.time() + RESULT_TIMEOUT
+    while time.time() < deadline:
+        wait_time = min(LONG_POLL_WAIT_TIME, max(deadline - time.time(), 0))
+        result_response = requests.get(
+            fetch_result_api_url,
+            params={"wait": wait_time},
+            timeout=wait_time + 10,
+        )
 
         # Based on the status code of response, redirects to appropriate page.
         if result_response.status_code == 200:
@@ -140,10 +165,12 @@ def process_result(image_file_path: str, submission_id: str) -> str:
                 )
             )
 
-        # Wait before the next polling attempt
-        time.sleep(polling_interval)
+        # Waits before retrying if the API returned an unexpected error.
+        elif result_response.status_code != 202:
+            time.sleep(1)
 
-    # If processing is still not completed after timeout, returns timeout as error message.
+    # If processing is still not completed after timeout, cancels the submission, & returns timeout as error message.
+    cancel_submission(submission_id)
     return redirect(
         url_for(
             "error",
@@ -180,13 +207,22 @@ def upload() -> str:
                 submission_response = requests.post(
                     submit_image_api_url,
                     files={"image": image_file},
-                    data={"workflow_name": "workflow_000"},
+                    data={"workflow_name": "workflow_000", "deadline": RESULT_TIMEOUT},
                 )
 
             # Based on the status code of response, redirects to appropriate page.
             if submission_response.status_code == 200:
                 submission_id = submission_response.json().get("submission_id")
                 return process_result(image_file_path, submission_id)
+            elif submission_response.status_code == 429:
+                retry_after = submission_response.headers.get("Retry-After", "a few")
+                return redirect(
+                    url_for(
+                        "error",
+                        message=f"Server is busy. Please retry in {retry_after} seconds.",
+                        input_file_path=image_file_path,
+                    )
+                )
             else:
                 return redirect(
                     url_for(